@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Alinea progresiones casi duplicadas entre generaciones (2023-2026 ↔ 2025-2028)
+y entre UACs, sobre las extracciones DGB (data/extraccion/json/*.json).
+
+Cada progresión se reduce a su conjunto de shingles (pares de palabras
+consecutivas, normalizadas y sin palabras vacías, como en indice_busqueda.py)
+y a una firma MinHash. Con LSH por bandas solo se comparan los pares que
+comparten alguna banda completa: tiempo casi lineal en el número de
+progresiones en lugar de todos contra todos. Los candidatos se confirman con
+la similitud de Jaccard exacta de sus shingles.
+
+Salidas:
+  data/extraccion/_alineacion.json
+    pares       [{a, b, tipo: "generacion" | "uac", similitud}] de mayor a menor
+    migracion   "slug#id" de la generación origen → progresión más parecida
+                de la generación destino (para migrar planeaciones)
+
+Uso:
+  python3 scripts/alinear_generaciones.py
+  python3 scripts/alinear_generaciones.py --umbral 0.35 --mostrar 20
+  python3 scripts/alinear_generaciones.py --origen 2023-2026 --destino 2025-2028
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import DIR_EXTRACCION, RAIZ, cargar_extracciones  # noqa: E402
+from indice_busqueda import tokenizar  # noqa: E402
+
+SALIDA = RAIZ / "data" / "extraccion" / "_alineacion.json"
+MASCARA_64 = (1 << 64) - 1
+# 2 filas por banda: umbral efectivo de LSH ≈ (1/64)^(1/2) ≈ 0.13, muy por debajo de --umbral
+PERMUTACIONES, BANDAS = 128, 64
+
+
+def shingles(texto: str, k: int = 2) -> frozenset[int]:
+    """Hashes (crc32, estables entre corridas) de los k-gramas de palabras del texto."""
+    tokens = tokenizar(texto)
+    if len(tokens) < k:
+        return frozenset(zlib.crc32(t.encode()) for t in tokens)
+    return frozenset(zlib.crc32(" ".join(tokens[i:i + k]).encode()) for i in range(len(tokens) - k + 1))
+
+
+class MinHash:
+    """
+    Firmas MinHash con `permutaciones` funciones multiply-shift ((a·x + b) mod 2⁶⁴,
+    bits altos), reproducibles por semilla. Sin módulo primo ni enteros de más de
+    64 bits: el doble de rápido que (a·x + b) mod p en Python puro.
+    """
+
+    def __init__(self, permutaciones: int = PERMUTACIONES, semilla: int = 1):
+        rng = random.Random(semilla)
+        self.funciones = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(permutaciones)]
+
+    def firma(self, conjunto: frozenset[int]) -> tuple[int, ...]:
+        if not conjunto:
+            return ()
+        # el mínimo de 64 bits tiene también los bits altos mínimos: se desplaza una sola vez
+        return tuple(min([(a * x + b) & MASCARA_64 for x in conjunto]) >> 32 for a, b in self.funciones)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def candidatos(firmas: list[tuple[int, ...]], bandas: int = BANDAS) -> set[tuple[int, int]]:
+    """Pares (i, j), i < j, cuyas firmas coinciden por completo en al menos una banda."""
+    pares = set()
+    for banda in range(bandas):
+        cubetas: dict[tuple, list[int]] = {}
+        for i, f in enumerate(firmas):
+            if f:
+                filas = len(f) // bandas
+                cubetas.setdefault(f[banda * filas:(banda + 1) * filas], []).append(i)
+        for indices in cubetas.values():
+            for n, i in enumerate(indices):
+                pares.update((i, j) for j in indices[n + 1:])
+    return pares
+
+
+def alinear(docs: list[dict], umbral: float = 0.5, permutaciones: int = PERMUTACIONES,
+            bandas: int = BANDAS) -> list[dict]:
+    """
+    docs[i] = {"slug", "generacion", "id", "descripcion"}. Devuelve los pares de
+    progresiones de UACs distintas con Jaccard ≥ umbral, de mayor a menor.
+    """
+    conjuntos = [shingles(d["descripcion"]) for d in docs]
+    minhash = MinHash(permutaciones)
+    firmas = [minhash.firma(c) for c in conjuntos]
+    pares = []
+    for i, j in candidatos(firmas, bandas):
+        a, b = docs[i], docs[j]
+        if a["slug"] == b["slug"]:
+            continue
+        similitud = jaccard(conjuntos[i], conjuntos[j])
+        if similitud >= umbral:
+            pares.append({"a": {k: a[k] for k in ("slug", "generacion", "id")},
+                          "b": {k: b[k] for k in ("slug", "generacion", "id")},
+                          "tipo": "generacion" if a["generacion"] != b["generacion"] else "uac",
+                          "similitud": round(similitud, 3)})
+    pares.sort(key=lambda p: (-p["similitud"], p["a"]["slug"], p["a"]["id"], p["b"]["slug"], p["b"]["id"]))
+    return pares
+
+
+def migracion(pares: list[dict], origen: str, destino: str) -> dict:
+    """'slug#id' de `origen` → su progresión más parecida de `destino` (pares ya ordenados por similitud)."""
+    mapa = {}
+    for p in pares:
+        for de, a in ((p["a"], p["b"]), (p["b"], p["a"])):
+            if de["generacion"] == origen and a["generacion"] == destino:
+                mapa.setdefault(f"{de['slug']}#{de['id']}", {"slug": a["slug"], "id": a["id"],
+                                                             "similitud": p["similitud"]})
+    return mapa
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--umbral", type=float, default=0.5, help="Jaccard mínimo de shingles para reportar un par")
+    ap.add_argument("--permutaciones", type=int, default=PERMUTACIONES)
+    ap.add_argument("--bandas", type=int, default=BANDAS, help="Bandas LSH (más bandas = más candidatos)")
+    ap.add_argument("--origen", default="2023-2026", help="Generación de la que se migra")
+    ap.add_argument("--destino", default="2025-2028", help="Generación a la que se migra")
+    ap.add_argument("--mostrar", type=int, default=10, help="Pares a imprimir")
+    ap.add_argument("--extracciones", default=str(DIR_EXTRACCION))
+    ap.add_argument("--salida", default=str(SALIDA))
+    args = ap.parse_args()
+    if args.permutaciones % args.bandas:
+        sys.exit("❌ --permutaciones debe ser múltiplo de --bandas")
+
+    t0 = time.perf_counter()
+    docs = [{"slug": e["slug"], "generacion": e["generacion"], "id": p["id"], "descripcion": p["descripcion"]}
+            for e in cargar_extracciones(Path(args.extracciones)) for p in e.get("progresiones") or []]
+    pares = alinear(docs, args.umbral, args.permutaciones, args.bandas)
+    mapa = migracion(pares, args.origen, args.destino)
+    seg = time.perf_counter() - t0
+
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps({
+        "parametros": {"umbral": args.umbral, "permutaciones": args.permutaciones, "bandas": args.bandas,
+                       "origen": args.origen, "destino": args.destino},
+        "pares": pares,
+        "migracion": mapa,
+    }, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    por_tipo = {t: sum(1 for p in pares if p["tipo"] == t) for t in ("generacion", "uac")}
+    por_gen = {}
+    for d in docs:
+        por_gen[d["generacion"]] = por_gen.get(d["generacion"], 0) + 1
+    print(f"🔗 {len(docs)} progresiones ({', '.join(f'{g}: {n}' for g, n in sorted(por_gen.items()))}) "
+          f"en {seg:.2f}s")
+    print(f"   {por_tipo['generacion']} pares entre generaciones, {por_tipo['uac']} entre UACs "
+          f"(Jaccard ≥ {args.umbral}); {len(mapa)} progresiones {args.origen} con destino en {args.destino}")
+    for p in pares[:args.mostrar]:
+        print(f"   {p['similitud']:.2f} [{p['tipo']}] {p['a']['slug']}#{p['a']['id']} ↔ {p['b']['slug']}#{p['b']['id']}")
+    print(f"💾 {salida}")
+
+
+if __name__ == "__main__":
+    main()
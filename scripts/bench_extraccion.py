@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las rutas calientes de extraer_progresiones.py.
+
+Genera un corpus sintético con cada formato de programa DGB (progresiones
+numeradas, tablas METAS/CATEGORÍA, formato "Tema:" de Humanidades y el
+respaldo "Progresión N", más un caso patológico con tramos largos de líneas
+vacías) a varios tamaños, mide limpiar(), extraer_numerados(),
+los extractores de tabla/tema y parsear(), y compara contra una base guardada.
+No necesita los PDFs reales ni red.
+
+Salidas:
+  data/extraccion/_bench_base.json   (base de comparación, con --guardar-base)
+
+Uso:
+  python3 scripts/bench_extraccion.py                      # compara contra la base
+  python3 scripts/bench_extraccion.py --guardar-base       # fija la base actual
+  python3 scripts/bench_extraccion.py --tamanos 8,64 --repeticiones 7
+  python3 scripts/bench_extraccion.py --filtro parsear --tolerancia 0.10
+
+Devuelve código 1 si alguna medición queda más lenta que la base por encima
+de la tolerancia (para usarlo antes de un commit que toque el parser).
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import extraer_progresiones as ep  # noqa: E402
+
+RAIZ = Path(__file__).resolve().parent.parent
+BASE = RAIZ / "data" / "extraccion" / "_bench_base.json"
+
+PALABRAS = (
+    "analiza comprende sistema energía materia sociedad proceso digital datos modelo "
+    "comunidad historia identidad aprendizaje situación problema contexto estudiante "
+    "relación cambio fenómeno argumenta reconoce interpreta información ciudadanía "
+    "territorio lenguaje cultura transformación pensamiento crítico"
+).split()
+
+# formato sintético -> estrategia que parsear() debe elegir
+FORMATOS = {
+    "numerada": "numerada",
+    "tabla": "tabla",
+    "tema": "tema",
+    "progresion_n": "progresion_n",
+    "vacias": "numerada",
+}
+
+# Tramos de líneas vacías (páginas en blanco, tablas sin texto) que el
+# formato "vacias" mete entre secciones: con una regex r"\n\s*…" sin cuidado
+# cada salto re-barre el tramo entero y parsear() se vuelve cuadrático.
+TRAMOS_VACIOS = ("\n" * 20000, "\n \n" * 22500)
+
+
+# ============================================================
+# CORPUS SINTÉTICO
+# ============================================================
+
+def frase(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(PALABRAS) for _ in range(n)).capitalize() + "."
+
+
+def parrafo(rng: random.Random, n: int = 40) -> str:
+    """Párrafo cortado en líneas de ~9 palabras, como sale de PyPDF2."""
+    palabras = [rng.choice(PALABRAS) for _ in range(n)]
+    return "\n".join(" ".join(palabras[i:i + 9]) for i in range(0, n, 9)) + "."
+
+
+def generar_documento(rng: random.Random, formato: str, n_progresiones: int) -> str:
+    """Texto de un programa con el formato dado (páginas unidas con \\n, como extraer_texto)."""
+    paginas = [
+        "SUBSECRETARÍA DE EDUCACIÓN MEDIA SUPERIOR\nPrograma de estudio\n",
+        "PROPÓSITO FORMATIVO\n" + parrafo(rng, 60) + "\n",
+    ]
+    if formato == "vacias":
+        texto = generar_documento(rng, "numerada", n_progresiones)
+        for tramo, encabezado in zip(TRAMOS_VACIOS, ("METAS DE APRENDIZAJE", "CONTENIDOS FORMATIVOS")):
+            texto = texto.replace(f"\n{encabezado}", tramo + encabezado, 1)
+        return texto
+    if formato == "numerada":
+        paginas.append("PROGRESIONES DE APRENDIZAJE\n" + "".join(
+            f"{k}. {parrafo(rng, 25)}\n" for k in range(1, n_progresiones + 1)))
+        paginas.append("METAS DE APRENDIZAJE\n" + "".join(
+            f"{k}) {frase(rng, 12)}\n" for k in range(1, 5)))
+    elif formato == "tabla":
+        cuerpo = "PROGRESIONES DE APRENDIZAJE\n"
+        for k in range(1, n_progresiones + 1):
+            cuerpo += parrafo(rng, 30) + "\nMETAS CATEGORÍA SUBCATEGORÍA\n"
+            cuerpo += "".join(f"M{j} {frase(rng, 10)}\n" for j in range(1, 4))
+            cuerpo += "C1 Categoría uno\n" + "".join(f"S{j} {frase(rng, 3)}\n" for j in range(1, 3))
+            cuerpo += f"\n{10 + k}\n"
+        paginas.append(cuerpo)
+    elif formato == "tema":
+        cuerpo = ""
+        for k in range(1, n_progresiones + 1):
+            cuerpo += "\n\n" + parrafo(rng, 30) + f"\nTema: {k}/{n_progresiones}\nMETAS\n"
+            cuerpo += "\n\n".join(frase(rng, 10) for _ in range(3))
+            cuerpo += "\nCATEGORÍA SUBCATEGORÍAS DIMENSIONES\n1. dimensión de la categoría\n"
+        paginas.append(cuerpo)
+    elif formato == "progresion_n":
+        paginas.append("".join(
+            f"Progresión {k}. {parrafo(rng, 20)}\n" for k in range(1, n_progresiones + 1)))
+    else:
+        raise ValueError(f"formato desconocido: {formato}")
+    paginas.append("CONTENIDOS FORMATIVOS\n" + "".join(f"{k}. {frase(rng, 6)}\n" for k in range(1, 6)))
+    paginas.append("ORIENTACIONES PARA LA EVALUACIÓN\n" + parrafo(rng, 40))
+    return "\n".join(paginas)
+
+
+def generar_corpus(formato: str, n_progresiones: int, n_docs: int, semilla: int = 0) -> list[str]:
+    rng = random.Random(f"{semilla}-{formato}-{n_progresiones}")
+    return [generar_documento(rng, formato, n_progresiones) for _ in range(n_docs)]
+
+
+# ============================================================
+# MEDICIÓN
+# ============================================================
+
+def fragmento_progresiones(texto: str) -> str:
+    return ep.buscar_seccion(texto, *ep.SECCION_PROGRESIONES)
+
+
+# función -> (formatos en los que tiene sentido, preparación de la entrada, llamada)
+FUNCIONES = {
+    "limpiar": (tuple(FORMATOS), lambda t: t, ep.limpiar),
+    "extraer_numerados": (("numerada", "vacias"), fragmento_progresiones, ep.extraer_numerados),
+    "extraer_formato_tabla_metas": (("tabla",), lambda t: t, ep.extraer_formato_tabla_metas),
+    "extraer_formato_tema_metas": (("tema",), lambda t: t, ep.extraer_formato_tema_metas),
+    "parsear": (tuple(FORMATOS), lambda t: t, ep.parsear),
+}
+
+
+def medir(fn, entradas: list[str], minimo_s: float = 0.05) -> float:
+    """
+    Segundos por pasada de todo el corpus por fn. Como timeit: repite el
+    corpus hasta durar al menos minimo_s y apaga el GC durante la muestra.
+    """
+    def pasada(vueltas: int) -> float:
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            for _ in range(vueltas):
+                for entrada in entradas:
+                    fn(entrada)
+            return time.perf_counter() - t0
+        finally:
+            gc.enable()
+
+    vueltas = 1
+    while (seg := pasada(vueltas)) < minimo_s:
+        vueltas *= 2
+    return seg / vueltas
+
+
+def carga_referencia(texto: str):
+    """Trabajo fijo de regex + str, ajeno al parser: mide qué tan rápida va la máquina ahora."""
+    re.findall(r"\w+", texto)
+    re.sub(r"\s+", " ", texto).lower().split()
+
+
+def correr(tamanos: list[int], n_docs: int, repeticiones: int, filtro: str = "") -> dict:
+    # La velocidad de la máquina varía entre corridas (frecuencia, vecinos en
+    # la VM): cada medición va junto a una de referencia y se compara la razón.
+    referencia = generar_corpus("numerada", 32, n_docs, semilla=-1)
+    resultados = {}
+    for nombre, (formatos, preparar, fn) in FUNCIONES.items():
+        if filtro and filtro not in nombre:
+            continue
+        for formato in formatos:
+            for n in tamanos:
+                corpus = generar_corpus(formato, n, n_docs)
+                if nombre == "parsear":
+                    obtenida = ep.parsear(corpus[0])["estrategia"]
+                    if obtenida != FORMATOS[formato]:
+                        print(f"  ⚠️  {formato}/{n}: parsear() eligió '{obtenida}', "
+                              f"se esperaba '{FORMATOS[formato]}'")
+                entradas = [preparar(t) for t in corpus]
+                # muestras intercaladas (un bache de la máquina afecta a las dos);
+                # se queda el mínimo de cada una: el ruido del sistema solo suma tiempo
+                refs, tiempos = [], []
+                for _ in range(repeticiones):
+                    refs.append(medir(carga_referencia, referencia))
+                    tiempos.append(medir(fn, entradas))
+                ref, segundos = min(refs), min(tiempos)
+                chars = sum(len(e) for e in entradas)
+                resultados[f"{nombre}/{formato}/{n}"] = {
+                    "docs": len(entradas),
+                    "chars": chars,
+                    "seg": round(segundos, 6),
+                    "relativo": round(segundos / ref, 4),
+                    "chars_s": round(chars / segundos) if segundos else None,
+                    "docs_s": round(len(entradas) / segundos, 2) if segundos else None,
+                }
+    return resultados
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> tuple[list[str], int]:
+    """Tabla markdown actual vs base y número de mediciones más lentas que la tolerancia."""
+    filas = [
+        "| Medición | chars | chars/s | docs/s | base chars/s | Δ |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    lentas = 0
+    for clave, m in actual.items():
+        b = base.get(clave)
+        if b and b.get("relativo"):
+            # Δ de velocidad descontando la de la máquina: >0 más rápido que la base
+            delta = b["relativo"] / m["relativo"] - 1
+            marca = ""
+            if delta < -tolerancia:
+                marca, lentas = " 🔴", lentas + 1
+            elif delta > tolerancia:
+                marca = " 🟢"
+            cols = f"{b['chars_s']:,} | {delta:+.1%}{marca}"
+        else:
+            cols = "— | —"
+        filas.append(f"| {clave} | {m['chars']:,} | {m['chars_s']:,} | {m['docs_s']:,} | {cols} |")
+    return filas, lentas
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tamanos", default="8,32,128",
+                    help="progresiones por documento, separadas por coma")
+    ap.add_argument("--docs", type=int, default=5, help="documentos por medición")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--filtro", default="", help="solo funciones cuyo nombre contenga esto")
+    ap.add_argument("--base", default=str(BASE))
+    ap.add_argument("--guardar-base", action="store_true",
+                    help="guarda esta corrida como base de comparación")
+    ap.add_argument("--tolerancia", type=float, default=0.25,
+                    help="fracción de caída de velocidad (relativa a la referencia) que cuenta como regresión")
+    args = ap.parse_args()
+
+    tamanos = [int(x) for x in args.tamanos.split(",") if x.strip()]
+    print(f"🏁 Benchmark extracción  (tamaños {tamanos}, {args.docs} docs × {args.repeticiones} repeticiones)")
+    actual = correr(tamanos, args.docs, args.repeticiones, args.filtro)
+
+    ruta_base = Path(args.base)
+    base = json.loads(ruta_base.read_text(encoding="utf-8")).get("mediciones", {}) if ruta_base.exists() else {}
+    filas, lentas = comparar(actual, base, args.tolerancia)
+    print("\n".join(filas))
+
+    if args.guardar_base:
+        ruta_base.parent.mkdir(parents=True, exist_ok=True)
+        ruta_base.write_text(json.dumps({
+            "python": platform.python_version(),
+            "maquina": platform.machine(),
+            "parser": ep.VERSION_PARSER,
+            "mediciones": actual,
+        }, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n💾 Base guardada en {ruta_base}")
+    elif not base:
+        print(f"\nℹ️  Sin base en {ruta_base}; corre con --guardar-base para fijarla.")
+    elif lentas:
+        print(f"\n🔴 {lentas} mediciones más lentas que la base (tolerancia {args.tolerancia:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de servicio_catalogo.py: N conexiones keep-alive concurrentes
+piden una mezcla de rutas (listas por semestre/modelo, materias completas,
+extracciones) y se reporta la latencia de cada petición (p50, p90, p99, máx),
+peticiones por segundo y los estados HTTP.
+
+La mezcla se arma pidiendo /programas y /extracciones al arrancar. Por
+defecto cada conexión recuerda el ETag de cada ruta y lo manda en
+If-None-Match, como el navegador al revalidar (la mayoría son 304);
+--sin-etag pide siempre el cuerpo completo.
+
+Uso:
+  python3 scripts/servicio_catalogo.py &
+  python3 scripts/carga_servicio.py
+  python3 scripts/carga_servicio.py --conexiones 64 --peticiones 50000 --sin-etag
+  python3 scripts/carga_servicio.py --url http://127.0.0.1:9000 --gzip
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from servicio_catalogo import PUERTO  # noqa: E402
+
+
+class Conexion:
+    """Una conexión HTTP/1.1 keep-alive mínima (respuestas con Content-Length)."""
+
+    def __init__(self, host: str, puerto: int, gzip: bool):
+        self.host, self.puerto, self.gzip = host, puerto, gzip
+        self.lector = self.escritor = None
+
+    async def pedir(self, ruta: str, etag: str | None = None) -> tuple[int, dict, bytes]:
+        if self.escritor is None:
+            self.lector, self.escritor = await asyncio.open_connection(self.host, self.puerto)
+        encabezados = [f"GET {ruta} HTTP/1.1", f"Host: {self.host}:{self.puerto}"]
+        if etag:
+            encabezados.append(f"If-None-Match: {etag}")
+        if self.gzip:
+            encabezados.append("Accept-Encoding: gzip")
+        self.escritor.write(("\r\n".join(encabezados) + "\r\n\r\n").encode("latin-1"))
+        await self.escritor.drain()
+        estado = int((await self.lector.readline()).split()[1])
+        respuesta = {}
+        while (h := await self.lector.readline()) not in (b"\r\n", b""):
+            nombre, _, valor = h.decode("latin-1").partition(":")
+            respuesta[nombre.strip().lower()] = valor.strip()
+        cuerpo = await self.lector.readexactly(int(respuesta.get("content-length", 0)))
+        if respuesta.get("connection") == "close":
+            self.cerrar()
+        return estado, respuesta, cuerpo
+
+    def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            self.lector = self.escritor = None
+
+
+async def mezcla_de_rutas(host: str, puerto: int) -> list[str]:
+    """Rutas realistas a partir del contenido del servicio."""
+    c = Conexion(host, puerto, gzip=False)
+    _, _, cuerpo = await c.pedir("/programas")
+    programas = json.loads(cuerpo)
+    _, _, cuerpo = await c.pedir("/extracciones")
+    extracciones = json.loads(cuerpo)
+    c.cerrar()
+    rutas = ["/programas", "/extracciones"]
+    for sem in sorted({p["semestre"] for p in programas}):
+        rutas.append(f"/programas?semestre={sem}")
+        rutas += [f"/programas?semestre={sem}&modelo={m}" for m in sorted({str(p["modelo"]) for p in programas})]
+        rutas.append(f"/programas?semestre={sem}&campos=*")
+    rutas += sorted({p["ruta"] for p in programas})
+    rutas += [e["ruta"] for e in extracciones]
+    rutas += [f"/extracciones?generacion={g}" for g in sorted({str(e["generacion"]) for e in extracciones})]
+    return [urllib.parse.quote(r, safe="/?=&*,") for r in rutas]
+
+
+def percentil(ordenadas: list[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))]
+
+
+async def cargar(host: str, puerto: int, conexiones: int, peticiones: int, etag: bool, gzip: bool,
+                 semilla: int) -> dict:
+    rutas = await mezcla_de_rutas(host, puerto)
+    rng = random.Random(semilla)
+    # rutas de lista más frecuentes que las de detalle, como en la app
+    pesos = [5 if "?" in r or r in ("/programas", "/extracciones") else 1 for r in rutas]
+    plan = rng.choices(rutas, weights=pesos, k=peticiones)
+    latencias: list[float] = []
+    estados: dict[int, int] = {}
+    bytes_recibidos = 0
+
+    async def cliente(k: int):
+        nonlocal bytes_recibidos
+        c = Conexion(host, puerto, gzip)
+        etags: dict[str, str] = {}
+        for ruta in plan[k::conexiones]:
+            t0 = time.perf_counter()
+            estado, encabezados, cuerpo = await c.pedir(ruta, etags.get(ruta) if etag else None)
+            latencias.append(time.perf_counter() - t0)
+            estados[estado] = estados.get(estado, 0) + 1
+            bytes_recibidos += len(cuerpo)
+            if "etag" in encabezados:
+                etags[ruta] = encabezados["etag"]
+        c.cerrar()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente(k) for k in range(conexiones)))
+    total = time.perf_counter() - t0
+    latencias.sort()
+    return {"rutas": len(rutas), "peticiones": len(latencias), "segundos": total,
+            "por_segundo": len(latencias) / total if total else 0.0, "estados": estados,
+            "bytes": bytes_recibidos,
+            "ms": {f"p{p}": percentil(latencias, p) * 1000 for p in (50, 90, 99)} | {"max": latencias[-1] * 1000}}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default=f"http://127.0.0.1:{PUERTO}")
+    ap.add_argument("--conexiones", type=int, default=16, help="Conexiones keep-alive concurrentes")
+    ap.add_argument("--peticiones", type=int, default=10000, help="Peticiones en total")
+    ap.add_argument("--sin-etag", action="store_true", help="No mandar If-None-Match (siempre cuerpo completo)")
+    ap.add_argument("--gzip", action="store_true", help="Mandar Accept-Encoding: gzip")
+    ap.add_argument("--semilla", type=int, default=1)
+    args = ap.parse_args()
+
+    destino = urllib.parse.urlsplit(args.url)
+    try:
+        r = asyncio.run(cargar(destino.hostname, destino.port or 80, args.conexiones, args.peticiones,
+                               not args.sin_etag, args.gzip, args.semilla))
+    except OSError as e:
+        sys.exit(f"❌ No se pudo conectar a {args.url} ({e}); ¿está corriendo servicio_catalogo.py?")
+
+    print(f"🚀 {r['peticiones']} peticiones sobre {r['rutas']} rutas, {args.conexiones} conexiones, "
+          f"{'con' if not args.sin_etag else 'sin'} ETag: {r['segundos']:.2f}s ({r['por_segundo']:.0f} pet/s)")
+    print("   latencia  " + "  ".join(f"{k} {v:.2f} ms" for k, v in r["ms"].items()))
+    print("   estados   " + "  ".join(f"{k}: {v}" for k, v in sorted(r["estados"].items()))
+          + f"   ({r['bytes'] / 1024 / 1024:.1f} MB de cuerpos)")
+
+
+if __name__ == "__main__":
+    main()
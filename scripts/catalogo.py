@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Rutas y lectura compartida del catálogo (data/programas_sep.json) y de las
+extracciones DGB (data/extraccion/json/*.json) para todos los scripts;
+modelo.py convierte lo que devuelve cargar_catalogo() en objetos Programa.
+
+Las reglas de emparejamiento son las mismas de scripts/integrar_extraccion.cjs:
+nombre normalizado EXACTO (sin acentos ni signos), sin los sufijos "(área)" /
+"(progresiones)" del manifiesto y con los mismos ALIAS.
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+RUTA_CATALOGO = RAIZ / "data" / "programas_sep.json"
+DIR_EXTRACCION = RAIZ / "data" / "extraccion" / "json"
+
+# Nombres oficiales largos → nombre corto usado en el catálogo
+ALIAS = {
+    "reacciones quimicas conservacion de la materia en la formacion de nuevas sustancias cneyt iv":
+        "reacciones quimicas conservacion de la materia cneyt iv",
+    "organismos estructuras y procesos herencia y evolucion biologica cneyt vi":
+        "organismos estructuras y procesos cneyt vi",
+}
+
+
+def normalizar(s: str) -> str:
+    """Minúsculas, sin acentos, solo [a-z0-9] separados por un espacio (como slugify())."""
+    s = unicodedata.normalize("NFD", s.lower())
+    s = "".join(c for c in s if unicodedata.category(c) != "Mn")
+    return re.sub(r"[^a-z0-9]+", " ", s).strip()
+
+
+def clave_extraccion(nombre: str) -> str:
+    """Clave de emparejamiento de un nombre del manifiesto contra las materias del catálogo."""
+    clave = normalizar(re.sub(r"\((área|progresiones)\)", "", nombre, flags=re.IGNORECASE))
+    return ALIAS.get(clave, clave)
+
+
+def generacion_de_modelo(modelo: str) -> str:
+    """modelo del catálogo → generación oficial (la inversa de integrar_extraccion.cjs)."""
+    return "2025-2028" if modelo == "2025" else "2023-2026"
+
+
+def cargar_catalogo(ruta: Path = RUTA_CATALOGO) -> list[dict]:
+    return json.loads(ruta.read_text(encoding="utf-8"))
+
+
+def cargar_extracciones(directorio: Path = DIR_EXTRACCION) -> list[dict]:
+    return [json.loads(f.read_text(encoding="utf-8")) for f in sorted(directorio.glob("*.json"))]
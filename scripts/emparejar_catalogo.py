@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Empareja las extracciones DGB (data/extraccion/json/*.json) con las materias
+del catálogo (data/programas_sep.json) por similitud de nombre, para no
+depender solo del nombre normalizado exacto + ALIAS de integrar_extraccion.cjs.
+
+Los nombres pasan por la misma normalización que slugify()/catalogo.normalizar()
+(y clave_extraccion(): sin "(área)"/"(progresiones)", con los ALIAS). Sobre el
+nombre de cada materia y su metadata.nombre_uac se arman dos índices
+invertidos: trigramas de caracteres y palabras (con peso idf). Todas las
+extracciones se puntúan en una sola pasada por las listas de esos índices:
+solo se comparan las materias que comparten algo con cada nombre.
+
+  puntaje = ½·Dice de trigramas + ½·Jaccard ponderado por idf de palabras
+            × 0.6 si ambos nombres traen numeral (I, II, 3…) y no coincide
+            + 0.05 si la generación coincide con la del modelo del catálogo
+            + 0.05 si el numeral coincide con el semestre
+
+  confianza  exacta  nombre normalizado idéntico (la regla de integrar_extraccion.cjs)
+             alta    puntaje ≥ 0.8 y ≥ 0.1 por encima del siguiente candidato
+                     (incluidas las entradas homónimas de otro semestre o modelo)
+             media   puntaje ≥ 0.55
+             baja    el resto
+
+Salidas:
+  data/extraccion/_emparejamiento.json
+    resumen            extracciones por confianza
+    emparejamientos    slug → nombre, generacion, componente, confianza y
+                       candidatos [{materia, semestre, modelo, puntaje, ...}]
+
+Uso:
+  python3 scripts/emparejar_catalogo.py
+  python3 scripts/emparejar_catalogo.py -k 5 --mostrar 30
+  node scripts/integrar_extraccion.cjs --difuso   # integra también los de confianza alta
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import (DIR_EXTRACCION, RAIZ, RUTA_CATALOGO, cargar_catalogo,  # noqa: E402
+                      cargar_extracciones, clave_extraccion, generacion_de_modelo, normalizar)
+from indice_busqueda import VACIAS  # noqa: E402
+
+SALIDA = RAIZ / "data" / "extraccion" / "_emparejamiento.json"
+
+ROMANOS = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8}
+CASTIGO_NUMERAL = 0.6
+BONO_GENERACION = BONO_SEMESTRE = 0.05
+UMBRAL_ALTA, MARGEN_ALTA, UMBRAL_MEDIA = 0.8, 0.1, 0.55
+
+
+def trigramas(nombre: str) -> frozenset[str]:
+    relleno = f"  {nombre} "
+    return frozenset(relleno[i:i + 3] for i in range(len(relleno) - 2))
+
+
+def palabras(nombre: str) -> tuple[frozenset[str], int | None]:
+    """Palabras con contenido (sin vacías) y el numeral del nombre, si trae."""
+    tokens = nombre.split()
+    numeral = next((ROMANOS.get(t) or int(t) for t in reversed(tokens)
+                    if t in ROMANOS or (t.isdigit() and len(t) == 1)), None)
+    return frozenset(t for t in tokens if t not in VACIAS), numeral
+
+
+def confianza(puntaje: float, margen: float) -> str:
+    if puntaje >= UMBRAL_ALTA and margen >= MARGEN_ALTA:
+        return "alta"
+    return "media" if puntaje >= UMBRAL_MEDIA else "baja"
+
+
+class IndiceCatalogo:
+    """
+    Índices invertidos sobre los nombres del catálogo. Cada materia aporta
+    materia y metadata.nombre_uac (si difiere); nombres[j] = (posición en el
+    catálogo, nombre normalizado).
+    """
+
+    def __init__(self, catalogo: list[dict]):
+        self.catalogo = catalogo
+        self.nombres: list[tuple[int, str]] = []
+        for i, p in enumerate(catalogo):
+            for nombre in {normalizar(p["materia"]), normalizar((p.get("metadata") or {}).get("nombre_uac") or "")}:
+                if nombre:
+                    self.nombres.append((i, nombre))
+        self.trigramas = [trigramas(n) for _, n in self.nombres]
+        self.palabras = [palabras(n) for _, n in self.nombres]
+        self.por_trigrama: dict[str, list[int]] = {}
+        self.por_palabra: dict[str, list[int]] = {}
+        for j, (tri, (pal, _)) in enumerate(zip(self.trigramas, self.palabras)):
+            for t in tri:
+                self.por_trigrama.setdefault(t, []).append(j)
+            for w in pal:
+                self.por_palabra.setdefault(w, []).append(j)
+        n = len(self.nombres)
+        self.idf = {w: math.log(1 + n / len(js)) for w, js in self.por_palabra.items()}
+        self.exactos: dict[str, list[int]] = {}
+        for i, p in enumerate(catalogo):
+            self.exactos.setdefault(normalizar(p["materia"]), []).append(i)
+
+    def puntuar(self, clave: str, generacion: str | None) -> list[dict]:
+        """Candidatos (una entrada del catálogo cada uno) de mayor a menor puntaje."""
+        tri = trigramas(clave)
+        pal, numeral = palabras(clave)
+        comunes: dict[int, int] = {}
+        for t in tri:
+            for j in self.por_trigrama.get(t, ()):
+                comunes[j] = comunes.get(j, 0) + 1
+        idf_default = math.log(1 + len(self.nombres))  # palabra que no está en el catálogo: rara
+        mejores: dict[int, dict] = {}
+        for j, n_comunes in comunes.items():
+            i, nombre = self.nombres[j]
+            dice = 2 * n_comunes / (len(tri) + len(self.trigramas[j]))
+            pal_j, numeral_j = self.palabras[j]
+            union = sum(self.idf.get(w, idf_default) for w in pal | pal_j)
+            jaccard = sum(self.idf[w] for w in pal & pal_j) / union if union else 0.0
+            puntaje = (dice + jaccard) / 2
+            if numeral and numeral_j and numeral != numeral_j:
+                puntaje *= CASTIGO_NUMERAL
+            p = self.catalogo[i]
+            misma_generacion = generacion is not None and generacion_de_modelo(p.get("modelo")) == generacion
+            puntaje += BONO_GENERACION * misma_generacion + BONO_SEMESTRE * (numeral == p["semestre"])
+            if clave in self.exactos and i in self.exactos[clave]:
+                puntaje = max(puntaje, 1.0)
+            if i not in mejores or puntaje > mejores[i]["puntaje"]:
+                mejores[i] = {"materia": p["materia"], "semestre": p["semestre"], "modelo": p.get("modelo"),
+                              "puntaje": round(min(puntaje, 1.0), 3), "trigramas": round(dice, 3),
+                              "palabras": round(jaccard, 3), "misma_generacion": misma_generacion,
+                              "nombre_emparejado": nombre}
+        return sorted(mejores.values(), key=lambda c: (-c["puntaje"], c["semestre"], c["materia"]))
+
+
+def emparejar(extracciones: list[dict], catalogo: list[dict], k: int = 3) -> dict[str, dict]:
+    """slug → emparejamiento (con los k mejores candidatos) de cada extracción."""
+    indice = IndiceCatalogo(catalogo)
+    resultado = {}
+    for e in extracciones:
+        clave = clave_extraccion(e["nombre"])
+        candidatos = indice.puntuar(clave, e.get("generacion"))
+        if not candidatos:
+            nivel = "sin_candidatos"
+        elif clave in indice.exactos:
+            nivel = "exacta"
+        else:
+            # el margen cuenta también las homónimas de otro semestre o generación: --difuso
+            # integra solo la entrada elegida, así que tiene que ganarles con claridad
+            siguiente = candidatos[1]["puntaje"] if len(candidatos) > 1 else 0.0
+            nivel = confianza(candidatos[0]["puntaje"], candidatos[0]["puntaje"] - siguiente)
+        resultado[e["slug"]] = {"nombre": e["nombre"], "generacion": e.get("generacion"),
+                                "componente": e.get("componente"), "clave": clave, "confianza": nivel,
+                                "candidatos": candidatos[:k]}
+    return resultado
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-k", type=int, default=3, help="Candidatos por extracción")
+    ap.add_argument("--mostrar", type=int, default=20, help="Emparejamientos no exactos a imprimir")
+    ap.add_argument("--catalogo", default=str(RUTA_CATALOGO))
+    ap.add_argument("--extracciones", default=str(DIR_EXTRACCION))
+    ap.add_argument("--salida", default=str(SALIDA))
+    args = ap.parse_args()
+
+    catalogo = cargar_catalogo(Path(args.catalogo))
+    extracciones = cargar_extracciones(Path(args.extracciones))
+    t0 = time.perf_counter()
+    emparejamientos = emparejar(extracciones, catalogo, args.k)
+    ms = (time.perf_counter() - t0) * 1000
+
+    niveles = ("exacta", "alta", "media", "baja", "sin_candidatos")
+    resumen = {n: sum(1 for e in emparejamientos.values() if e["confianza"] == n) for n in niveles}
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps({"resumen": resumen, "emparejamientos": emparejamientos},
+                                 ensure_ascii=False, indent=1), encoding="utf-8")
+
+    print(f"🔗 {len(extracciones)} extracciones × {len(catalogo)} materias en {ms:.0f} ms: "
+          + ", ".join(f"{n} {v}" for n, v in resumen.items()))
+    revisar = [(s, e) for s, e in emparejamientos.items() if e["confianza"] not in ("exacta", "sin_candidatos")]
+    revisar.sort(key=lambda par: -par[1]["candidatos"][0]["puntaje"])
+    for slug, e in revisar[:args.mostrar]:
+        c = e["candidatos"][0]
+        print(f"   {c['puntaje']:.2f} [{e['confianza']}] {e['nombre']} [{e['generacion']}] → "
+              f"{c['materia']} (S{c['semestre']}, {c['modelo']})")
+    print(f"💾 {salida}")
+
+
+if __name__ == "__main__":
+    main()
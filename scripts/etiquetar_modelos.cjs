@@ -7,20 +7,27 @@
  *              | "borrador" (esqueletos generados por scripts o vacíos)
  * 2. Corrige typos en nombres de materias.
  * 3. Elimina duplicados dejando cada UAC en su semestre correcto.
- * 4. Guarda respaldo del original antes de escribir.
+ * 4. Versiona el original antes de escribir (delta en data/versiones_catalogo/;
+ *    sin Python, respaldo completo).
  *
  * Uso: node scripts/etiquetar_modelos.cjs
  */
 
 const fs = require('fs');
 const path = require('path');
+const { execFileSync } = require('child_process');
 
 const RUTA = path.join(__dirname, '..', 'data', 'programas_sep.json');
 const RESPALDO = path.join(__dirname, '..', 'data', `programas_sep.backup-${new Date().toISOString().slice(0, 10)}.json`);
 
 const programas = JSON.parse(fs.readFileSync(RUTA, 'utf8'));
-fs.writeFileSync(RESPALDO, JSON.stringify(programas, null, 2));
-console.log(`📦 Respaldo guardado: ${path.basename(RESPALDO)} (${programas.length} programas)`);
+try {
+    execFileSync('python3', [path.join(__dirname, 'versiones_catalogo.py'), '--registrar', '-m', 'antes de etiquetar_modelos'],
+        { stdio: 'inherit' });
+} catch (e) {
+    fs.writeFileSync(RESPALDO, JSON.stringify(programas, null, 2));
+    console.log(`📦 Respaldo guardado: ${path.basename(RESPALDO)} (${programas.length} programas)`);
+}
 
 // ---------------------------------------------------------------
 // 1. TYPOS: nombre incorrecto → nombre correcto
@@ -101,6 +108,10 @@ const finales = transformados.filter(p =>
 );
 
 fs.writeFileSync(RUTA, JSON.stringify(finales, null, 2));
+try {
+    execFileSync('python3', [path.join(__dirname, 'versiones_catalogo.py'), '--registrar', '-m', 'etiquetar_modelos'],
+        { stdio: 'inherit' });
+} catch (e) { /* sin Python: queda el respaldo completo */ }
 
 // ---------------------------------------------------------------
 // 5. Reporte
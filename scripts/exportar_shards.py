@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Exporta el catálogo (data/programas_sep.json) en shards minificados para la
+app web, con nombre direccionado por contenido para caché indefinida:
+
+  <salida>/semestre/<n>.<hash>.json         materias completas de un semestre
+  <salida>/semestre/<n>.lista.<hash>.json   proyección para listas (sin progresiones)
+  <salida>/materia/<slug>.<hash>.json       una materia (todas sus generaciones)
+  <salida>/lista.<hash>.json                proyección de todo el catálogo
+  <salida>/manifiesto.json                  shard → ruta, sha256, bytes (NO cachear)
+
+Cada shard puede llevar variantes precomprimidas .gz (siempre) y .br (si está
+instalado el paquete `brotli`). Los archivos con hash no cambian nunca: una
+exportación nueva solo escribe los shards cuyo contenido cambió y borra los
+que ya no están en el manifiesto. Solo se borran archivos propios: los del
+manifiesto anterior y los que siguen el esquema de nombres de arriba; lo
+demás que haya en --salida no se toca.
+
+Uso:
+  python3 scripts/exportar_shards.py                       # → public/catalogo/
+  python3 scripts/exportar_shards.py --salida /tmp/shards --sin-gz
+  python3 scripts/exportar_shards.py --br                  # exige brotli
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import RAIZ, RUTA_CATALOGO, cargar_catalogo, normalizar  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo hay .gz
+    brotli = None
+
+SALIDA = RAIZ / "public" / "catalogo"
+LARGO_HASH = 12
+
+# Nombres que genera este script (relativos a --salida), con sus variantes comprimidas
+PROPIOS = re.compile(rf"(semestre|materia)/[^/]+\.[0-9a-f]{{{LARGO_HASH}}}\.json(\.gz|\.br)?"
+                     rf"|lista\.[0-9a-f]{{{LARGO_HASH}}}\.json(\.gz|\.br)?")
+
+# Campos de las proyecciones para vistas de lista (+ n_progresiones y shard de la materia)
+CAMPOS_LISTA = ("materia", "semestre", "modelo", "estado", "url_fuente")
+
+
+def minificar(datos) -> bytes:
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def slug_materia(materia: str) -> str:
+    return normalizar(materia).replace(" ", "-")
+
+
+def proyectar(p: dict) -> dict:
+    return {**{k: p.get(k) for k in CAMPOS_LISTA}, "n_progresiones": len(p.get("progresiones") or []),
+            "shard": f"materia/{slug_materia(p['materia'])}"}
+
+
+def escribir_atomico(ruta: Path, datos: bytes):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(datos)
+    os.replace(tmp, ruta)
+
+
+def escribir_shard(salida: Path, clave: str, datos, gz: bool, br: bool) -> tuple[dict, list[Path]]:
+    """Escribe <clave>.<hash>.json (+ .gz/.br) si no existe; devuelve la entrada del manifiesto y los archivos."""
+    crudo = minificar(datos)
+    sha = hashlib.sha256(crudo).hexdigest()
+    ruta = salida / f"{clave}.{sha[:LARGO_HASH]}.json"
+    variantes = {ruta: crudo}
+    if gz:
+        # mtime=0: el .gz sale idéntico byte a byte en cada exportación
+        variantes[ruta.with_name(ruta.name + ".gz")] = lambda: gzip.compress(crudo, compresslevel=9, mtime=0)
+    if br:
+        variantes[ruta.with_name(ruta.name + ".br")] = lambda: brotli.compress(crudo, quality=11)
+    entrada = {"ruta": ruta.relative_to(salida).as_posix(), "sha256": sha, "bytes": len(crudo)}
+    for destino, contenido in variantes.items():
+        if not destino.exists():  # mismo nombre = mismo contenido
+            escribir_atomico(destino, contenido if isinstance(contenido, bytes) else contenido())
+        if destino != ruta:
+            entrada[destino.suffix[1:]] = destino.stat().st_size
+    return entrada, list(variantes)
+
+
+def archivos_propios(salida: Path) -> set[Path]:
+    """Archivos de exportaciones anteriores: los del manifiesto previo y los que siguen el esquema de nombres."""
+    propios = set()
+    try:
+        previo = json.loads((salida / "manifiesto.json").read_text(encoding="utf-8"))
+        for entrada in previo.get("shards", {}).values():
+            ruta = salida / entrada["ruta"]
+            propios.update([ruta, ruta.with_name(ruta.name + ".gz"), ruta.with_name(ruta.name + ".br")])
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        pass  # sin manifiesto previo (o ilegible): queda el esquema de nombres
+    for sub in ("semestre", "materia"):
+        propios.update(f for f in (salida / sub).glob("*.json*")
+                       if PROPIOS.fullmatch(f.relative_to(salida).as_posix()))
+    propios.update(f for f in salida.glob("lista.*.json*") if PROPIOS.fullmatch(f.name))
+    return {f for f in propios if f.is_file()}
+
+
+def shards_de(catalogo: list[dict]) -> dict:
+    """clave de shard → contenido, en orden estable (el del catálogo)."""
+    shards = {"lista": [proyectar(p) for p in catalogo]}
+    for sem in sorted({p["semestre"] for p in catalogo}):
+        del_semestre = [p for p in catalogo if p["semestre"] == sem]
+        shards[f"semestre/{sem}"] = del_semestre
+        shards[f"semestre/{sem}.lista"] = [proyectar(p) for p in del_semestre]
+    por_materia: dict[str, list[dict]] = {}
+    for p in catalogo:
+        por_materia.setdefault(slug_materia(p["materia"]), []).append(p)
+    for slug, programas in por_materia.items():
+        shards[f"materia/{slug}"] = programas
+    return shards
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--catalogo", default=str(RUTA_CATALOGO))
+    ap.add_argument("--salida", default=str(SALIDA))
+    ap.add_argument("--sin-gz", action="store_true", help="No generar variantes .gz")
+    ap.add_argument("--br", action="store_true", help="Generar variantes .br (requiere el paquete brotli)")
+    ap.add_argument("--conservar", action="store_true",
+                    help="No borrar shards de exportaciones anteriores (despliegues con clientes a medio cargar)")
+    args = ap.parse_args()
+    if args.br and brotli is None:
+        sys.exit("❌ --br requiere el paquete brotli (pip install brotli)")
+
+    salida = Path(args.salida)
+    ruta_catalogo = Path(args.catalogo)
+    catalogo = cargar_catalogo(ruta_catalogo)
+
+    anteriores = archivos_propios(salida)
+    manifiesto, vigentes = {}, set()
+    for clave, datos in shards_de(catalogo).items():
+        manifiesto[clave], archivos = escribir_shard(salida, clave, datos, not args.sin_gz, args.br)
+        vigentes.update(archivos)
+
+    version = hashlib.sha256(minificar({k: v["sha256"] for k, v in manifiesto.items()})).hexdigest()[:LARGO_HASH]
+    escribir_atomico(salida / "manifiesto.json", json.dumps({
+        "version": version,
+        "fuente_sha256": hashlib.sha256(ruta_catalogo.read_bytes()).hexdigest(),
+        "shards": manifiesto,
+    }, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    borrados = 0
+    if not args.conservar:
+        for f in anteriores - vigentes:
+            f.unlink()
+            borrados += 1
+
+    total = sum(v["bytes"] for k, v in manifiesto.items() if k.startswith("semestre/") and not k.endswith(".lista"))
+    original = ruta_catalogo.stat().st_size
+    print(f"💾 {len(manifiesto)} shards en {salida}  (versión {version}, {borrados} obsoletos borrados)")
+    print(f"   catálogo {original / 1024:.0f} KB → semestres minificados {total / 1024:.0f} KB en total")
+    for clave in sorted(k for k in manifiesto if k.startswith("semestre/") and not k.endswith(".lista")):
+        e = manifiesto[clave]
+        comp = "  ".join(f"{ext} {e[ext] / 1024:.0f} KB" for ext in ("gz", "br") if ext in e)
+        print(f"   {clave}: {e['bytes'] / 1024:.0f} KB  {comp}")
+
+
+if __name__ == "__main__":
+    main()
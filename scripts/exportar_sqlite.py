@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Exporta el catálogo (data/programas_sep.json) y las extracciones DGB
+(data/extraccion/json/*.json) a una sola base SQLite indexada.
+
+Tablas:
+  programas     una fila por materia del catálogo y por programa extraído
+                (origen = 'catalogo' | 'extraccion'), con nombre normalizado,
+                semestre, generación, componente, estado/calidad y propósito
+  progresiones  (programa_id, numero, descripcion)
+  metas         (programa_id, progresion_id o NULL si es del programa, orden, texto)
+  contenidos    (programa_id, progresion_id o NULL, orden, texto); en el
+                catálogo son las temáticas de cada progresión
+  exportacion   clave/valor: fecha y SHA-256 de las fuentes
+
+Índices por nombre normalizado, (generación, semestre), semestre y componente:
+"todas las progresiones 2025-2028 de 3er semestre" es una consulta indexada.
+
+Uso:
+  python3 scripts/exportar_sqlite.py                        # → data/catalogo.sqlite
+  python3 scripts/exportar_sqlite.py --salida /tmp/cat.sqlite
+  python3 scripts/exportar_sqlite.py --semestre 3 --generacion 2025-2028   # exporta y consulta
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import (DIR_EXTRACCION, RAIZ, RUTA_CATALOGO, cargar_catalogo,  # noqa: E402
+                      cargar_extracciones, clave_extraccion, generacion_de_modelo, normalizar)
+
+SALIDA = RAIZ / "data" / "catalogo.sqlite"
+
+ESQUEMA = """
+CREATE TABLE programas (
+    id INTEGER PRIMARY KEY,
+    origen TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    nombre_norm TEXT NOT NULL,
+    semestre INTEGER,
+    generacion TEXT,
+    componente TEXT,
+    estado TEXT,
+    calidad TEXT,
+    url TEXT,
+    proposito TEXT
+);
+CREATE TABLE progresiones (
+    id INTEGER PRIMARY KEY,
+    programa_id INTEGER NOT NULL REFERENCES programas(id),
+    numero INTEGER,
+    descripcion TEXT NOT NULL
+);
+CREATE TABLE metas (
+    id INTEGER PRIMARY KEY,
+    programa_id INTEGER NOT NULL REFERENCES programas(id),
+    progresion_id INTEGER REFERENCES progresiones(id),
+    orden INTEGER NOT NULL,
+    texto TEXT NOT NULL
+);
+CREATE TABLE contenidos (
+    id INTEGER PRIMARY KEY,
+    programa_id INTEGER NOT NULL REFERENCES programas(id),
+    progresion_id INTEGER REFERENCES progresiones(id),
+    orden INTEGER NOT NULL,
+    texto TEXT NOT NULL
+);
+CREATE TABLE exportacion (clave TEXT PRIMARY KEY, valor TEXT);
+"""
+
+# Se crean después de cargar los datos (más rápido que mantenerlos fila por fila)
+INDICES = """
+CREATE UNIQUE INDEX ix_programas_clave ON programas(origen, clave);
+CREATE INDEX ix_programas_nombre ON programas(nombre_norm);
+CREATE INDEX ix_programas_gen_sem ON programas(generacion, semestre);
+CREATE INDEX ix_programas_semestre ON programas(semestre);
+CREATE INDEX ix_programas_componente ON programas(componente);
+CREATE INDEX ix_progresiones_programa ON progresiones(programa_id, numero);
+CREATE INDEX ix_metas_programa ON metas(programa_id);
+CREATE INDEX ix_metas_progresion ON metas(progresion_id);
+CREATE INDEX ix_contenidos_programa ON contenidos(programa_id);
+CREATE INDEX ix_contenidos_progresion ON contenidos(progresion_id);
+"""
+
+
+def sha256_de(ruta: Path) -> str:
+    return hashlib.sha256(ruta.read_bytes()).hexdigest()
+
+
+def insertar_programa(db: sqlite3.Connection, fila: dict) -> int:
+    columnas = ", ".join(fila)
+    marcas = ", ".join("?" * len(fila))
+    return db.execute(f"INSERT INTO programas ({columnas}) VALUES ({marcas})", tuple(fila.values())).lastrowid
+
+
+def insertar_textos(db: sqlite3.Connection, tabla: str, programa_id: int, textos: list[str],
+                    progresion_id: int | None = None):
+    db.executemany(f"INSERT INTO {tabla} (programa_id, progresion_id, orden, texto) VALUES (?, ?, ?, ?)",
+                   [(programa_id, progresion_id, i, t) for i, t in enumerate(textos, 1) if t])
+
+
+def exportar(salida: Path, catalogo: list[dict], extracciones: list[dict], fuentes: dict) -> dict:
+    """Escribe la base completa en un archivo temporal y lo renombra al final (los lectores nunca ven una a medias)."""
+    tmp = salida.with_name(f"{salida.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + ESQUEMA)
+
+        # Lo que solo sabe la otra fuente: semestre (catálogo) y componente (manifiesto)
+        por_clave: dict[str, list[dict]] = {}
+        for p in catalogo:
+            por_clave.setdefault(normalizar(p["materia"]), []).append(p)
+        componentes: dict[str, set] = {}
+        for e in extracciones:
+            componentes.setdefault(clave_extraccion(e["nombre"]), set()).add(e["componente"])
+
+        for p in catalogo:
+            clave = normalizar(p["materia"])
+            org = p.get("organizador_curricular") or {}
+            comp = componentes.get(clave, set())
+            pid = insertar_programa(db, {
+                "origen": "catalogo",
+                "clave": f"{clave}|{p['semestre']}|{p.get('modelo', '')}",
+                "nombre": p["materia"],
+                "nombre_norm": clave,
+                "semestre": p["semestre"],
+                "generacion": generacion_de_modelo(p.get("modelo", "")),
+                "componente": next(iter(comp)) if len(comp) == 1 else None,
+                "estado": p.get("estado"),
+                "calidad": None,
+                "url": p.get("url_fuente"),
+                "proposito": "\n\n".join(org.get("propositos_formativos") or []) or None,
+            })
+            insertar_textos(db, "metas", pid, org.get("metas_aprendizaje") or [])
+            for prog in p["progresiones"]:
+                gid = db.execute("INSERT INTO progresiones (programa_id, numero, descripcion) VALUES (?, ?, ?)",
+                                 (pid, prog.get("id"), prog["descripcion"])).lastrowid
+                insertar_textos(db, "metas", pid, prog.get("metas") or [], gid)
+                insertar_textos(db, "contenidos", pid, prog.get("tematicas") or [], gid)
+
+        for e in extracciones:
+            clave = clave_extraccion(e["nombre"])
+            semestres = {p["semestre"] for p in por_clave.get(clave, [])}
+            pid = insertar_programa(db, {
+                "origen": "extraccion",
+                "clave": e["slug"],
+                "nombre": e["nombre"],
+                "nombre_norm": clave,
+                "semestre": next(iter(semestres)) if len(semestres) == 1 else None,
+                "generacion": e["generacion"],
+                "componente": e["componente"],
+                "estado": None,
+                "calidad": e.get("calidad_extraccion"),
+                "url": e.get("url"),
+                "proposito": e.get("proposito") or None,
+            })
+            db.executemany("INSERT INTO progresiones (programa_id, numero, descripcion) VALUES (?, ?, ?)",
+                           [(pid, prog.get("id"), prog["descripcion"]) for prog in e.get("progresiones") or []])
+            insertar_textos(db, "metas", pid, e.get("metas_aprendizaje") or [])
+            insertar_textos(db, "contenidos", pid, e.get("contenidos") or [])
+
+        db.executescript(INDICES)
+        db.executemany("INSERT INTO exportacion VALUES (?, ?)", [
+            ("generado", datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            *fuentes.items(),
+        ])
+        db.commit()
+        db.execute("ANALYZE")
+        conteo = {t: db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                  for t in ("programas", "progresiones", "metas", "contenidos")}
+    finally:
+        db.close()
+    os.replace(tmp, salida)
+    return conteo
+
+
+def progresiones_de(db: sqlite3.Connection, semestre: int | None = None, generacion: str | None = None,
+                    nombre: str | None = None) -> list[tuple]:
+    """(materia, origen, número, descripción) filtrando por semestre, generación y/o nombre normalizado."""
+    filtros, params = [], []
+    if semestre is not None:
+        filtros.append("p.semestre = ?")
+        params.append(semestre)
+    if generacion:
+        filtros.append("p.generacion = ?")
+        params.append(generacion)
+    if nombre:
+        filtros.append("p.nombre_norm = ?")
+        params.append(normalizar(nombre))
+    donde = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    return db.execute(
+        "SELECT p.nombre, p.origen, g.numero, g.descripcion FROM progresiones g "
+        f"JOIN programas p ON p.id = g.programa_id {donde} ORDER BY p.nombre, p.origen, g.numero",
+        params).fetchall()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--salida", default=str(SALIDA))
+    ap.add_argument("--catalogo", default=str(RUTA_CATALOGO))
+    ap.add_argument("--extracciones", default=str(DIR_EXTRACCION))
+    ap.add_argument("--semestre", type=int, help="Tras exportar, listar las progresiones de este semestre")
+    ap.add_argument("--generacion", help="… de esta generación (2023-2026 / 2025-2028)")
+    ap.add_argument("--materia", help="… de esta materia (nombre, se normaliza)")
+    args = ap.parse_args()
+
+    ruta_catalogo, dir_ext = Path(args.catalogo), Path(args.extracciones)
+    t0 = time.perf_counter()
+    catalogo = cargar_catalogo(ruta_catalogo)
+    extracciones = cargar_extracciones(dir_ext)
+    fuentes = {"sha256_catalogo": sha256_de(ruta_catalogo),
+               "sha256_extracciones": hashlib.sha256(b"".join(
+                   hashlib.sha256(f.read_bytes()).digest() for f in sorted(dir_ext.glob("*.json")))).hexdigest()}
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    conteo = exportar(salida, catalogo, extracciones, fuentes)
+    print(f"💾 {salida}  ({', '.join(f'{v} {k}' for k, v in conteo.items())})  en {time.perf_counter() - t0:.2f}s")
+
+    if args.semestre is not None or args.generacion or args.materia:
+        db = sqlite3.connect(f"file:{salida}?mode=ro", uri=True)
+        t0 = time.perf_counter()
+        filas = progresiones_de(db, args.semestre, args.generacion, args.materia)
+        ms = (time.perf_counter() - t0) * 1000
+        for nombre, origen, numero, descripcion in filas:
+            print(f"  [{origen}] {nombre} #{numero}: {descripcion[:100]}")
+        print(f"🔎 {len(filas)} progresiones en {ms:.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
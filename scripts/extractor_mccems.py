@@ -4,12 +4,16 @@ MCCEMS Data Extractor - DGB/SEP Programs (Enhanced)
 Generador de catálogo curricular completo basado en lineamientos oficiales.
 """
 
-import json
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import RAIZ  # noqa: E402
+from modelo import Programa, Progresion, guardar_catalogo  # noqa: E402
+
 class MCCEMSGenerator:
-    OUTPUT_FILE = "data/programas_sep_automatico.json"
+    OUTPUT_FILE = RAIZ / "data" / "programas_sep_automatico.json"
     
     # Definición de semestres y materias
     MATERIAS_POR_SEMESTRE = {
@@ -209,38 +213,32 @@ class MCCEMSGenerator:
                 plantilla = self.PLANTILLAS.get(tipo, self.PLANTILLAS["Sociales"]) # Fallback a Sociales si no encuentra
                 
                 # Generar progresiones especificas
-                progresiones_generadas = []
-                for idx, prog in enumerate(plantilla["progresiones"]):
-                    progresiones_generadas.append({
-                        "id": idx + 1,
-                        "descripcion": prog["desc"],
-                        "metas": [f"Meta: {m}" for m in plantilla.get("metas_generales", [])],
-                        "tematicas": prog["temas"]
-                    })
+                metas = tuple(f"Meta: {m}" for m in plantilla.get("metas_generales", []))
+                progresiones_generadas = tuple(
+                    Progresion(id=idx + 1, descripcion=prog["desc"], metas=metas, tematicas=tuple(prog["temas"]))
+                    for idx, prog in enumerate(plantilla["progresiones"])
+                )
 
-                programa = {
-                    "materia": nombre,
-                    "semestre": semestre,
-                    "metadata": {
+                programa = Programa(
+                    materia=nombre,
+                    semestre=semestre,
+                    metadata={
                         "nombre_uac": nombre.upper(),
                         "semestre": semestre,
                         "creditos": creditos,
                         "horas_semanales": horas
                     },
-                    "organizador_curricular": {
-                        "categorias": plantilla["categorias"],
-                        "metas_aprendizaje": plantilla["metas_generales"]
-                    },
-                    "progresiones": progresiones_generadas,
-                    "url_fuente": "https://dgb.sep.gob.mx/marco-curricular",
-                    "fecha_extraccion": datetime.now().isoformat()
-                }
+                    categorias=tuple(plantilla["categorias"]),
+                    metas_aprendizaje=tuple(plantilla["metas_generales"]),
+                    progresiones=progresiones_generadas,
+                    url_fuente="https://dgb.sep.gob.mx/marco-curricular",
+                    fecha_extraccion=datetime.now().isoformat()
+                )
                 resultados.append(programa)
                 print(f"  ✅ Generado: {nombre} (Sem {semestre})")
 
         # Guardar archivo
-        with open(self.OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        guardar_catalogo(resultados, self.OUTPUT_FILE)
             
         print(f"\n💾 Archivo guardado en: {self.OUTPUT_FILE}")
         print(f"📄 Total materias: {len(resultados)}")
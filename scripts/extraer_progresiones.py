@@ -11,31 +11,79 @@ extrae SOLO lo que alimenta a EduPlan MX:
 
 Salidas:
   data/pdfs_dgb/<slug>.pdf          (crudos, ignorados por git)
+  data/pdfs_dgb/<slug>.pdf.json     (SHA-256 y tamaño calculados al bajarlo; .part = descarga a medias)
+  data/pdfs_dgb/.texto/             (caché de texto extraído, por SHA-256 del PDF)
   data/extraccion/json/<slug>.json  (estructurado, para integrar al catálogo)
   data/extraccion/md/<slug>.md      (legible, para revisión humana)
   data/extraccion/_reporte.md       (tabla de calidad de toda la corrida)
+  data/extraccion/_lock.json        (entradas de cada programa: manifiesto, SHA-256 del PDF, versión del parser)
+  data/extraccion/_metricas.json    (tiempos por etapa, bytes, páginas y estrategia de cada programa)
+  data/extraccion/_backends.json    (--comparar-backends: tiempo y calidad por backend, elegido por programa)
+  data/extraccion/_escaneados.json  (cola de OCR: PDFs solo-imagen detectados antes de extraer su texto)
+  data/extraccion/_diario.jsonl     (etapas terminadas de la corrida en curso; se borra al terminar)
 
 Uso:
   python3 scripts/extraer_progresiones.py                # todo el manifiesto
   python3 scripts/extraer_progresiones.py --filtro "Cultura Digital"
   python3 scripts/extraer_progresiones.py --limite 5
+  python3 scripts/extraer_progresiones.py --desde-cero   # sin esto, una corrida cortada se reanuda donde quedó
   python3 scripts/extraer_progresiones.py --solo-parsear # no descarga, re-parsea PDFs locales
-
-100% local y gratuito: PyPDF2 + regex, sin APIs de pago.
+  python3 scripts/extraer_progresiones.py --solo-parsear --workers 4 --en-vuelo 6
+  python3 scripts/extraer_progresiones.py --limite-s 60 --limite-mb 1500  # tope por documento (TIMEOUT en el reporte)
+  python3 scripts/extraer_progresiones.py --descargas 8 --por-host 4 --reintentos 3
+  python3 scripts/extraer_progresiones.py --verificar    # re-baja los PDFs cuyo SHA-256 no coincide con el registrado
+  python3 scripts/extraer_progresiones.py --solo-parsear --sin-cache  # re-extrae el texto de cada PDF
+  python3 scripts/extraer_progresiones.py --incremental  # solo programas cuyo PDF/manifiesto/parser cambió
+  python3 scripts/extraer_progresiones.py --solo-parsear --perezoso  # extrae solo las páginas necesarias
+  python3 scripts/extraer_progresiones.py --solo-parsear --sin-cache --memoria  # pico de memoria por documento
+  python3 scripts/extraer_progresiones.py --solo-parsear --perfil          # cProfile en data/extraccion/_perfil.prof
+  python3 scripts/extraer_progresiones.py --comparar-backends   # tiempo/página y calidad de cada backend instalado
+  python3 scripts/extraer_progresiones.py --solo-parsear --backend auto   # el backend elegido para cada programa
+  python3 scripts/extraer_progresiones.py --vigilar      # re-procesa lo que cambie en el manifiesto o en data/pdfs_dgb/
+  printf '{"pdf": "/ruta/programa.pdf"}\n' | nc -U data/extraccion/.extractor.sock   # un PDF al parser de --vigilar
+
+100% local y gratuito: PyPDF2 (u otro backend instalado: pypdf, pdfplumber,
+PyMuPDF, pypdfium2) + regex, sin APIs de pago.
 """
 
 import argparse
+import bisect
+import cProfile
+import functools
+import gzip
+import hashlib
+import http.client
+import importlib.metadata
+import importlib.util
 import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import pstats
+import queue
 import re
+import shutil
+import socket
+import socketserver
 import ssl
 import sys
+import tempfile
+import threading
+import time
+import tracemalloc
 import unicodedata
 import urllib.parse
-import urllib.request
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 import certifi
-from PyPDF2 import PdfReader
+from PyPDF2 import PdfReader, __version__ as VERSION_PYPDF2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from modelo import Progresion  # noqa: E402
 
 CTX_SSL = ssl.create_default_context(cafile=certifi.where())
 
@@ -44,6 +92,16 @@ MANIFIESTO = RAIZ / "scripts" / "manifiesto_dgb.json"
 DIR_PDFS = RAIZ / "data" / "pdfs_dgb"
 DIR_JSON = RAIZ / "data" / "extraccion" / "json"
 DIR_MD = RAIZ / "data" / "extraccion" / "md"
+DIR_CACHE_TEXTO = DIR_PDFS / ".texto"
+RUTA_SOCKET = RAIZ / "data" / "extraccion" / ".extractor.sock"
+
+# Identifica al extractor de texto: si cambia la librería o la forma de unir
+# páginas, las entradas viejas de la caché dejan de coincidir.
+BACKEND_TEXTO = f"pypdf2-{VERSION_PYPDF2}-v1"
+BACKEND_DEFAULT = "pypdf2"
+
+# Subir al cambiar parsear()/calidad()/a_markdown(): invalida el --incremental
+VERSION_PARSER = 1
 
 UA = {"User-Agent": "Mozilla/5.0 (EduPlanMX; extractor educativo; contacto: docente BGO Puebla)"}
 
@@ -56,6 +114,10 @@ FIN_SECCION = re.compile(
     r"METAS DE APRENDIZAJE|CONTENIDOS FORMATIVOS|PROGRESIONES DE|PROP[ÓO]SITO FORMATIVO|"
     r"\n\s*[IVX]{1,4}\.\s+[A-ZÁÉÍÓÚ])"
 )
+# Las dos mitades de FIN_SECCION por separado, para buscarla en tiempo lineal
+# (ver _fines_seccion): las palabras clave y el numeral romano tras un salto.
+_FIN_PALABRA = re.compile(FIN_SECCION.pattern.rsplit("|", 1)[0] + ")")
+_FIN_ROMANO = re.compile(r"[IVX]{1,4}\.\s+[A-ZÁÉÍÓÚ]")
 
 
 def slugify(nombre: str) -> str:
@@ -73,60 +135,827 @@ def codificar_url(url: str) -> str:
     return urllib.parse.urlunsplit((partes.scheme, partes.netloc, ruta, partes.query, partes.fragment))
 
 
-def descargar(url: str, destino: Path) -> str:
-    if destino.exists() and destino.stat().st_size > 10_000:
-        return "ya_descargado"
+# Respuestas que vale la pena reintentar (saturación / fallas temporales del servidor)
+HTTP_REINTENTABLES = {429, 500, 502, 503, 504}
+HTTP_REDIRECCION = {301, 302, 303, 307, 308}
+
+
+class PoolConexiones:
+    """
+    Conexiones HTTP(S) persistentes (keep-alive) reutilizadas por host.
+    Cada host tiene un cupo de `por_host` peticiones simultáneas; así no se
+    repite el handshake TLS por cada PDF ni se satura dgb.sep.gob.mx.
+    Acepta http:// para poder probarse contra un servidor local.
+    """
+
+    def __init__(self, por_host: int = 4, timeout: float = 60, contexto_ssl: ssl.SSLContext = CTX_SSL):
+        self.por_host = por_host
+        self.timeout = timeout
+        self.contexto_ssl = contexto_ssl
+        self._libres: dict[tuple[str, str], list] = {}
+        self._cupos: dict[tuple[str, str], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _nueva(self, esquema: str, host: str) -> http.client.HTTPConnection:
+        if esquema == "https":
+            return http.client.HTTPSConnection(host, timeout=self.timeout, context=self.contexto_ssl)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    @contextmanager
+    def conexion(self, esquema: str, host: str):
+        clave = (esquema, host)
+        with self._lock:
+            cupo = self._cupos.setdefault(clave, threading.BoundedSemaphore(self.por_host))
+        with cupo:
+            with self._lock:
+                libres = self._libres.setdefault(clave, [])
+                conn = libres.pop() if libres else None
+            conn = conn or self._nueva(esquema, host)
+            try:
+                yield conn
+            except BaseException:
+                conn.close()  # estado desconocido: no se devuelve al pool
+                raise
+            with self._lock:
+                self._libres[clave].append(conn)
+
+    def get(self, url: str, max_redirecciones: int = 5) -> tuple[int, bytes]:
+        """GET que sigue redirecciones; devuelve (status, cuerpo)."""
+        for _ in range(max_redirecciones + 1):
+            partes = urllib.parse.urlsplit(url)
+            ruta = partes.path or "/"
+            if partes.query:
+                ruta += "?" + partes.query
+            with self.conexion(partes.scheme, partes.netloc) as conn:
+                conn.request("GET", ruta, headers=UA)
+                resp = conn.getresponse()
+                datos = resp.read()  # leer completo para poder reutilizar la conexión
+                if resp.will_close:
+                    conn.close()  # http.client reabre sola en la siguiente petición
+            if resp.status not in HTTP_REDIRECCION:
+                return resp.status, datos
+            url = codificar_url(urllib.parse.urljoin(url, resp.getheader("Location", "")))
+        return resp.status, datos
+
+    @contextmanager
+    def abrir(self, url: str, encabezados: dict | None = None, max_redirecciones: int = 5):
+        """
+        GET que sigue redirecciones y entrega la respuesta SIN leer el cuerpo,
+        para consumirlo por trozos. Si al salir no se leyó completo, la conexión
+        se cierra en lugar de volver al pool.
+        """
+        for intento in range(max_redirecciones + 1):
+            partes = urllib.parse.urlsplit(url)
+            ruta = partes.path or "/"
+            if partes.query:
+                ruta += "?" + partes.query
+            with self.conexion(partes.scheme, partes.netloc) as conn:
+                conn.request("GET", ruta, headers={**UA, **(encabezados or {})})
+                resp = conn.getresponse()
+                if resp.status in HTTP_REDIRECCION and intento < max_redirecciones:
+                    resp.read()
+                    if resp.will_close:
+                        conn.close()
+                    url = codificar_url(urllib.parse.urljoin(url, resp.getheader("Location", "")))
+                    continue
+                try:
+                    yield resp
+                finally:
+                    if resp.will_close or not resp.isclosed():
+                        conn.close()
+                return
+
+    def cerrar(self):
+        with self._lock:
+            for libres in self._libres.values():
+                for conn in libres:
+                    conn.close()
+            self._libres.clear()
+
+
+TROZO_DESCARGA = 1 << 16
+
+
+def ruta_registro(pdf: Path) -> Path:
+    """<slug>.pdf.json: SHA-256, tamaño y origen del PDF bajado (para verificarlo después)."""
+    return pdf.with_name(pdf.name + ".json")
+
+
+def leer_registro(pdf: Path) -> dict | None:
+    try:
+        return json.loads(ruta_registro(pdf).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def guardar_registro(pdf: Path, registro: dict):
+    ruta = ruta_registro(pdf)
+    tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(registro, ensure_ascii=False, indent=1))
+    os.replace(tmp, ruta)
+
+
+def sha256_pdf(pdf: Path) -> str:
+    """SHA-256 registrado al bajar el PDF si el tamaño coincide; si no, se calcula."""
+    registro = leer_registro(pdf)
+    if registro and registro.get("bytes") == pdf.stat().st_size:
+        return registro["sha256"]
+    return sha256_archivo(pdf)
+
+
+def parece_pdf_completo(pdf: Path) -> bool:
+    """PDF bajado antes de existir el registro: encabezado %PDF y marca %%EOF al final (no truncado)."""
+    tam = pdf.stat().st_size
+    if tam <= 10_000:
+        return False
+    with open(pdf, "rb") as f:
+        inicio = f.read(5)
+        f.seek(max(0, tam - 2048))
+        return inicio.startswith(b"%PDF") and b"%%EOF" in f.read()
+
+
+def _bajar_a_parcial(pool: PoolConexiones, url: str, parcial: Path) -> tuple[str, int, bool] | int:
+    """
+    Baja url a `parcial` por trozos calculando el SHA-256 al vuelo. Si ya hay
+    una parte bajada con validador (ETag / Last-Modified), pide solo lo que falta
+    (Range + If-Range); si el servidor responde 200 (cambió o no soporta rangos)
+    empieza de cero. Devuelve (sha256, bytes, reanudada) o el status HTTP si no
+    es 200/206. Una transferencia cortada deja la parte en disco y lanza OSError.
+    """
+    meta = parcial.with_name(parcial.name + ".json")
+    desde = parcial.stat().st_size if parcial.exists() else 0
+    validador = None
+    if desde and meta.exists():
+        validador = json.loads(meta.read_text()).get("validador")
+    encabezados = {"Range": f"bytes={desde}-", "If-Range": validador} if desde and validador else {}
+
+    with pool.abrir(url, encabezados) as resp:
+        h = hashlib.sha256()
+        if resp.status == 206 and encabezados:
+            if not (resp.getheader("Content-Range") or "").startswith(f"bytes {desde}-"):
+                parcial.unlink()
+                raise OSError(f"Content-Range inesperado: {resp.getheader('Content-Range')}")
+            with open(parcial, "rb") as f:
+                for bloque in iter(lambda: f.read(1 << 20), b""):
+                    h.update(bloque)
+            modo = "ab"
+        elif resp.status == 200:
+            desde, modo = 0, "wb"
+            etag = resp.getheader("ETag")
+            validador = etag if etag and not etag.startswith("W/") else resp.getheader("Last-Modified")
+            meta.write_text(json.dumps({"url": url, "validador": validador}))
+        else:
+            if resp.status == 416:
+                parcial.unlink(missing_ok=True)
+            return resp.status
+        largo = resp.getheader("Content-Length")
+        esperado = desde + int(largo) if largo and largo.isdigit() else None
+        with open(parcial, modo) as f:
+            while trozo := resp.read(TROZO_DESCARGA):
+                f.write(trozo)
+                h.update(trozo)
+            f.flush()
+            os.fsync(f.fileno())
+        total = parcial.stat().st_size
+        if esperado is not None and total != esperado:
+            # dentro del with: la conexión cortada se cierra en lugar de volver al pool
+            raise OSError(f"transferencia incompleta ({total} de {esperado} bytes)")
+    return h.hexdigest(), total, desde > 0
+
+
+def descargar(url: str, destino: Path, pool: PoolConexiones | None = None,
+              reintentos: int = 3, espera: float = 1.0, verificar: bool = False) -> str:
+    """
+    Baja el PDF a <destino>.part por trozos (reanudable con Range tras un corte)
+    y lo renombra a destino solo completo; el SHA-256 calculado durante la
+    transferencia queda en <destino>.json. Un PDF ya bajado se acepta si su
+    tamaño coincide con el registrado (con verificar=True, también su SHA-256).
+    """
     try:
-        req = urllib.request.Request(codificar_url(url), headers=UA)
-        with urllib.request.urlopen(req, timeout=60, context=CTX_SSL) as r:
-            datos = r.read()
-        if len(datos) < 10_000 or not datos[:5].startswith(b"%PDF"):
-            return f"ERROR: respuesta no es PDF ({len(datos)} bytes)"
-        destino.write_bytes(datos)
-        return f"descargado ({len(datos)//1024} KB)"
+        if destino.exists():
+            registro = leer_registro(destino)
+            if registro is not None:
+                if registro.get("bytes") == destino.stat().st_size and (
+                        not verificar or sha256_archivo(destino) == registro.get("sha256")):
+                    return "ya_descargado"
+            elif parece_pdf_completo(destino):
+                guardar_registro(destino, {"url": url, "sha256": sha256_archivo(destino),
+                                           "bytes": destino.stat().st_size, "fecha": None})
+                return "ya_descargado"
+            # truncado, alterado o sin registro ni %%EOF: se vuelve a bajar
+        pool = pool or PoolConexiones(por_host=1)
+        parcial = destino.with_name(destino.name + ".part")
+        error = ""
+        for intento in range(reintentos + 1):
+            if intento:
+                time.sleep(espera * 2 ** (intento - 1))  # backoff exponencial
+            try:
+                resultado = _bajar_a_parcial(pool, codificar_url(url), parcial)
+            except (OSError, http.client.HTTPException) as e:
+                error = str(e) or type(e).__name__
+                continue
+            if not isinstance(resultado, int):
+                break
+            error = f"HTTP {resultado}"
+            if resultado not in HTTP_REINTENTABLES:
+                return f"ERROR: {error}"
+        else:
+            return f"ERROR: {error} (tras {reintentos + 1} intentos)"
+        sha, total, reanudada = resultado
+        with open(parcial, "rb") as f:
+            es_pdf = total >= 10_000 and f.read(5).startswith(b"%PDF")
+        if es_pdf:
+            os.replace(parcial, destino)  # atómico: destino nunca queda a medias
+        else:
+            parcial.unlink()
+        parcial.with_name(parcial.name + ".json").unlink(missing_ok=True)
+        if not es_pdf:
+            return f"ERROR: respuesta no es PDF ({total} bytes)"
+        guardar_registro(destino, {"url": url, "sha256": sha, "bytes": total,
+                                   "fecha": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        return f"descargado ({total // 1024} KB{', reanudada' if reanudada else ''})"
     except Exception as e:
         return f"ERROR: {e}"
 
 
-def extraer_texto(pdf: Path) -> str:
+def descargar_medido(url: str, destino: Path, pool: PoolConexiones | None = None,
+                     reintentos: int = 3, verificar: bool = False) -> dict:
+    """descargar() + tiempo de pared, bytes bajados (0 si ya estaba local o falló) y SHA-256 registrado."""
+    t0 = time.perf_counter()
+    estado = descargar(url, destino, pool, reintentos, verificar=verificar)
+    registro = leer_registro(destino) if destino.exists() else None
+    return {"estado": estado, "seg": round(time.perf_counter() - t0, 3),
+            "bytes": destino.stat().st_size if estado.startswith("descargado") else 0,
+            "sha256": registro["sha256"] if registro else ""}
+
+
+# ============================================================
+# BACKENDS DE TEXTO
+# ============================================================
+
+class PaginasPDF:
+    """PDF abierto con algún backend: len() = páginas, texto(i) = texto de la página i."""
+
+    def __init__(self, paginas, extraer, cerrar=None):
+        self._paginas = paginas
+        self._extraer = extraer
+        self._cerrar = cerrar
+
+    def __len__(self) -> int:
+        return len(self._paginas)
+
+    def texto(self, i: int) -> str:
+        return self._extraer(self._paginas[i]) or ""
+
+    def cerrar(self):
+        if self._cerrar:
+            self._cerrar()
+
+
+def _abrir_pypdf2(pdf: Path) -> PaginasPDF:
+    return PaginasPDF(PdfReader(str(pdf)).pages, lambda p: p.extract_text())
+
+
+def _abrir_pypdf(pdf: Path) -> PaginasPDF:
+    import pypdf
+    return PaginasPDF(pypdf.PdfReader(str(pdf)).pages, lambda p: p.extract_text())
+
+
+def _abrir_pdfplumber(pdf: Path) -> PaginasPDF:
+    import pdfplumber
+    doc = pdfplumber.open(str(pdf))
+    return PaginasPDF(doc.pages, lambda p: p.extract_text(), doc.close)
+
+
+def _abrir_pymupdf(pdf: Path) -> PaginasPDF:
+    import fitz
+    doc = fitz.open(str(pdf))
+    return PaginasPDF(doc, lambda p: p.get_text(), doc.close)
+
+
+def _abrir_pypdfium2(pdf: Path) -> PaginasPDF:
+    import pypdfium2
+    doc = pypdfium2.PdfDocument(str(pdf))
+    return PaginasPDF(doc, lambda p: p.get_textpage().get_text_range(), doc.close)
+
+
+# nombre -> (módulo a importar, distribución en pip, abridor). Solo PyPDF2 es
+# obligatorio; los demás se usan si están instalados.
+BACKENDS = {
+    "pypdf2": ("PyPDF2", "PyPDF2", _abrir_pypdf2),
+    "pypdf": ("pypdf", "pypdf", _abrir_pypdf),
+    "pdfplumber": ("pdfplumber", "pdfplumber", _abrir_pdfplumber),
+    "pymupdf": ("fitz", "PyMuPDF", _abrir_pymupdf),
+    "pypdfium2": ("pypdfium2", "pypdfium2", _abrir_pypdfium2),
+}
+
+
+def backends_disponibles() -> list[str]:
+    return [nombre for nombre, (modulo, _, _) in BACKENDS.items()
+            if nombre == BACKEND_DEFAULT or importlib.util.find_spec(modulo)]
+
+
+@functools.cache
+def clave_backend(backend: str = BACKEND_DEFAULT) -> str:
+    """Identifica backend + versión en la caché de texto y en la huella del _lock.json."""
+    if backend == BACKEND_DEFAULT:
+        return BACKEND_TEXTO
+    return f"{backend}-{importlib.metadata.version(BACKENDS[backend][1])}-v1"
+
+
+def abrir_pdf(pdf: Path, backend: str = BACKEND_DEFAULT) -> PaginasPDF:
+    return BACKENDS[backend][2](pdf)
+
+
+def paginas_pdf(pdf: Path, metricas: dict | None = None, backend: str = BACKEND_DEFAULT):
+    """Genera el texto de cada página sin retener las anteriores."""
+    doc = abrir_pdf(pdf, backend)
+    try:
+        if metricas is not None:
+            metricas["paginas"] = len(doc)
+        for i in range(len(doc)):
+            yield doc.texto(i)
+    finally:
+        doc.cerrar()
+
+
+def extraer_texto(pdf: Path, metricas: dict | None = None, backend: str = BACKEND_DEFAULT) -> str:
     try:
-        reader = PdfReader(str(pdf))
-        paginas = []
-        for p in reader.pages:
-            t = p.extract_text() or ""
-            paginas.append(t)
-        return "\n".join(paginas)
+        return "\n".join(paginas_pdf(pdf, metricas, backend))
     except Exception as e:
         return f"__ERROR_LECTURA__ {e}"
 
 
+# ============================================================
+# PRE-CHEQUEO: ¿PDF ESCANEADO (solo imágenes)?
+# ============================================================
+
+# Fin del diccionario de un objeto stream; el diccionario empieza en el "obj" anterior
+_INICIO_STREAM = re.compile(rb">>\s*stream\r?\n")
+_SUBTIPO_IMAGEN = re.compile(rb"/Subtype\s*/Image\b")
+# Streams que NO son contenido de página: imágenes, fuentes incrustadas, XMP, índices
+_NO_CONTENIDO = re.compile(rb"/Subtype\s*/(?!Form\b)|/Length[123]\b|/Type\s*/(ObjStm|XRef|Metadata|EmbeddedFile)\b")
+_OPERADOR_TEXTO = re.compile(rb"\bBT\b[\s\S]*?(?:T[jJ]|['\"])(?![A-Za-z])")
+_IMAGEN_EN_LINEA = re.compile(rb"\bBI\b[\s\S]*?\bID\b")
+MUESTRA_STREAMS = 8
+
+
+def clasificar_pdf(pdf: Path, muestra: int = MUESTRA_STREAMS) -> dict:
+    """
+    Pre-chequeo barato, sin backend de texto: recorre los bytes del PDF, cuenta
+    las imágenes (XObject /Image) y descomprime unos cuantos streams de
+    contenido repartidos por el documento buscando operadores de texto (BT … Tj).
+
+    tipo = "texto"       algún stream de la muestra dibuja texto
+           "escaneado"   hay imágenes y ningún stream de la muestra dibuja texto
+           "desconocido" cifrado, filtros no Flate o sin streams: se extrae normal
+    """
+    datos = pdf.read_bytes()
+    clase = {"tipo": "desconocido", "imagenes": 0, "streams_muestra": 0, "streams_con_texto": 0}
+    if b"/Encrypt" in datos:
+        return clase
+    contenidos = []
+    for m in _INICIO_STREAM.finditer(datos):
+        inicio_obj = datos.rfind(b" obj", 0, m.start())
+        dic = datos[inicio_obj:m.start()] if inicio_obj >= 0 else b""
+        if _SUBTIPO_IMAGEN.search(dic):
+            clase["imagenes"] += 1
+        elif not _NO_CONTENIDO.search(dic):
+            contenidos.append((m.end(), dic))
+    paso = max(1, len(contenidos) // muestra)
+    for inicio, dic in contenidos[::paso][:muestra]:
+        fin = datos.find(b"endstream", inicio)
+        crudo = datos[inicio:fin if fin >= 0 else len(datos)]
+        if b"/Filter" in dic:
+            if not re.search(rb"/Filter\s*\[?\s*/FlateDecode\s*\]?", dic):
+                continue
+            try:
+                crudo = zlib.decompressobj().decompress(crudo, 1 << 18)
+            except zlib.error:
+                continue
+        clase["streams_muestra"] += 1
+        if _OPERADOR_TEXTO.search(crudo):
+            clase["streams_con_texto"] += 1
+        elif _IMAGEN_EN_LINEA.search(crudo):
+            clase["imagenes"] += 1
+    if clase["streams_con_texto"]:
+        clase["tipo"] = "texto"
+    elif clase["streams_muestra"] and clase["imagenes"]:
+        clase["tipo"] = "escaneado"
+    return clase
+
+
+class DocumentoPerezoso:
+    """
+    PDF cuyas páginas se extraen bajo demanda y una sola vez.
+    prefijo(n) equivale a extraer_texto() sobre las primeras n páginas, así que
+    el texto completo siempre empieza con cualquier prefijo ya leído.
+    """
+
+    def __init__(self, pdf: Path, backend: str = BACKEND_DEFAULT):
+        self.doc = abrir_pdf(pdf, backend)
+        self.n_paginas = len(self.doc)
+        self._paginas: list[str] = []
+
+    @property
+    def extraidas(self) -> int:
+        return len(self._paginas)
+
+    def pagina(self, i: int) -> str:
+        while len(self._paginas) <= i:
+            self._paginas.append(self.doc.texto(len(self._paginas)))
+        return self._paginas[i]
+
+    def prefijo(self, n: int) -> str:
+        n = min(n, self.n_paginas)
+        if n:
+            self.pagina(n - 1)
+        return "\n".join(self._paginas[:n])
+
+    def texto_completo(self) -> str:
+        return self.prefijo(self.n_paginas)
+
+    def cerrar(self):
+        self.doc.cerrar()
+
+
+def sha256_archivo(ruta: Path) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def ruta_cache_texto(sha: str, backend: str = BACKEND_DEFAULT) -> Path:
+    clave = f"{sha}--{clave_backend(backend)}"
+    return DIR_CACHE_TEXTO / clave[:2] / f"{clave}.txt.gz"
+
+
+def leer_cache_texto(sha: str, backend: str = BACKEND_DEFAULT) -> str | None:
+    ruta = ruta_cache_texto(sha, backend)
+    if ruta.exists():
+        try:
+            return gzip.decompress(ruta.read_bytes()).decode("utf-8", "surrogatepass")
+        except (OSError, EOFError, UnicodeDecodeError):
+            pass  # entrada corrupta: se regenera
+    return None
+
+
+def guardar_cache_texto(sha: str, texto: str, backend: str = BACKEND_DEFAULT):
+    if texto.startswith("__ERROR_LECTURA__"):
+        return
+    ruta = ruta_cache_texto(sha, backend)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(gzip.compress(texto.encode("utf-8", "surrogatepass"), compresslevel=6))
+    os.replace(tmp, ruta)  # atómico: otro worker puede estar escribiendo la misma clave
+
+
+def texto_con_cache(pdf: Path, usar_cache: bool = True, sha: str = "", metricas: dict | None = None,
+                    backend: str = BACKEND_DEFAULT) -> str:
+    """
+    extraer_texto() con caché persistente direccionada por contenido:
+    data/pdfs_dgb/.texto/<sha[:2]>/<sha256>--<backend>.txt.gz
+    Dos entradas del manifiesto con el mismo PDF comparten la misma entrada.
+    Si se pasa `metricas`, anota de dónde salió el texto ("cache"/"pdf").
+    """
+    metricas = {} if metricas is None else metricas
+    metricas["texto_origen"] = "pdf"
+    if not usar_cache:
+        return extraer_texto(pdf, metricas, backend)
+    sha = sha or sha256_archivo(pdf)
+    texto = leer_cache_texto(sha, backend)
+    if texto is None:
+        texto = extraer_texto(pdf, metricas, backend)
+        guardar_cache_texto(sha, texto, backend)
+    else:
+        metricas["texto_origen"] = "cache"
+    return texto
+
+
+def escribir_si_cambia(ruta: Path, contenido: str) -> bool:
+    """Escribe solo si el contenido difiere: no toca el mtime ni genera ruido en git."""
+    datos = contenido.encode("utf-8")
+    if ruta.exists() and ruta.read_bytes() == datos:
+        return False
+    ruta.write_bytes(datos)
+    return True
+
+
 def limpiar(t: str) -> str:
     t = re.sub(r"[ \t]+", " ", t)
     t = re.sub(r"\n{3,}", "\n\n", t)
     return t.strip()
 
 
-def cortar_en_fin_de_seccion(texto: str, max_chars: int) -> str:
-    """Recorta el fragmento donde empiece el siguiente encabezado de sección."""
-    m = FIN_SECCION.search(texto, 40)  # ignora las primeras posiciones (es el propio título)
-    if m:
-        texto = texto[: m.start()]
-    return limpiar(texto)[:max_chars]
+# Secciones que lee parsear(): (patrones en orden de preferencia, max_chars)
+SECCION_PROPOSITO = ([
+    r"PROP[ÓO]SITO\s+FORMATIVO(?:\s+DE\s+LA\s+UAC)?",
+    r"PROP[ÓO]SITO\s+DE\s+LA\s+UAC",
+    r"PROP[ÓO]SITO\s+GENERAL",
+    r"\bPROP[ÓO]SITO\b",
+], 1200)
+SECCION_PROGRESIONES = ([
+    r"PROGRESIONES\s+DE(?:L)?\s+APRENDIZAJE",
+    r"PROGRESIONES\s+Y\s+METAS",
+    r"\bPROGRESIONES\b",
+], 60000)
+SECCION_METAS = ([r"METAS\s+DE\s+APRENDIZAJE"], 6000)
+SECCION_CONTENIDOS = ([
+    r"CONTENIDOS\s+FORMATIVOS",
+    r"CONTENIDOS\s+CENTRALES",
+    r"\bCONTENIDOS\b",
+    r"TEM[ÁA]TICAS",
+], 8000)
+
+
+_TABLA_METAS = re.compile(r"METAS\s+(?:CATEGOR[ÍI]A|CONCEPTOS)")
+_TEMA_METAS = re.compile(r"Tema:\s*[^\n]+\n\s*METAS")
+_PROGRESION_N = re.compile(r"Progresi[óo]n\s+(\d{1,2})[\.:]?\s*")
+_NUMERADO = re.compile(r"(?:^|\n)\s*(\d{1,2})[\.\)]\s+")
+_LINEA_BLANCA = re.compile(r"\n\s*\n")
+# Fin de la tabla anterior en el formato tabla: fila S# o número de página
+# suelto, r"(?:\bS\d{1,2}\s[^\n]{0,60}\n)|(?:\n\s*\d{1,3}\s*\n)" partido en
+# sus dos ramas (ver _cortes_tabla)
+_FILA_S = re.compile(r"\bS\d{1,2}\s[^\n]{0,60}\n")
+_SALTO = re.compile(r"\n\s*+")
+_NUM_PAGINA = re.compile(r"\d{1,3}+\s*\n")
+# "PROGRESIONES DE APRENDIZAJE" / "CONCEPTO CENTRAL" tal como quedan tras
+# limpiar(…replace("\n", " ")): cualquier tramo de [ \t\n] vale por un espacio
+_ENCABEZADO_PROGRESIONES = re.compile(r"PROGRESIONES[ \t\n]+DE[ \t\n]+APRENDIZAJE", re.IGNORECASE)
+_CONCEPTO_CENTRAL = re.compile(r"CONCEPTO[ \t\n]+CENTRAL")
+_RESIDUO_TABLA = re.compile(r"^(?:C[TC]?\d{1,2}\.?\s+[^.]{0,80}\.\s*)+")
+_INICIO_RESIDUO = re.compile(r"C[TC]?\d")
+_MARCA_META = re.compile(r"[MC](\d{1,2})\s")
+_ESPACIOS = re.compile(r"\s*")
+
+
+def _cortes_tabla(texto: str, pos: int = 0, endpos: int | None = None) -> list[tuple[int, int]]:
+    """
+    Spans de re.finditer(r"(?:\bS\d{1,2}\s[^\n]{0,60}\n)|(?:\n\s*\d{1,3}\s*\n)",
+    texto, pos, endpos), en tiempo lineal. Con la regex original, un tramo
+    largo de líneas vacías sin número de página se re-barre desde cada salto
+    de línea (cuadrático). Pero desde cualquier salto del tramo el \s* llega
+    al mismo final, así que el número se prueba una vez por tramo.
+    """
+    endpos = len(texto) if endpos is None else endpos
+    cortes = []
+    fila = _FILA_S.search(texto, pos, endpos)
+    salto = _SALTO.search(texto, pos, endpos)
+    pagina = None
+    while True:
+        # siguiente número de página: primer tramo de espacios con salto cuyo final abre "12\n"
+        while salto and pagina is None:
+            pagina = _NUM_PAGINA.match(texto, salto.end(), endpos)
+            if pagina is None:
+                salto = _SALTO.search(texto, salto.end(), endpos)
+        if fila and (pagina is None or fila.start() < salto.start()):
+            span = fila.span()
+        elif pagina is not None:
+            span = (salto.start(), pagina.end())
+        else:
+            return cortes
+        cortes.append(span)
+        pos = span[1]
+        fila = _FILA_S.search(texto, pos, endpos)
+        if salto and salto.start() < pos:
+            salto, pagina = _SALTO.search(texto, pos, endpos), None
+
+
+def _fines_seccion(texto: str, pos: int = 0, endpos: int | None = None):
+    """
+    Matches de FIN_SECCION.finditer(texto, pos, endpos), en tiempo lineal. Con
+    la regex sola, la rama r"\n\s*[IVX]…" re-barre un tramo largo de líneas
+    vacías desde cada salto de línea (cuadrático, como en _cortes_tabla).
+    Desde cualquier salto del tramo el \s* llega al mismo final, así que el
+    numeral se prueba una vez por tramo; solo el match que sí ocurre se vuelve
+    a pedir a FIN_SECCION, desde el primer salto (el mismo span).
+    """
+    endpos = len(texto) if endpos is None else endpos
+    palabra = _FIN_PALABRA.search(texto, pos, endpos)
+    salto = _SALTO.search(texto, pos, endpos)
+    romano = None
+    while True:
+        # siguiente encabezado romano: primer tramo de espacios con salto cuyo final abre "II. X"
+        while salto and romano is None:
+            if _FIN_ROMANO.match(texto, salto.end(), endpos):
+                romano = FIN_SECCION.match(texto, salto.start(), endpos)
+            else:
+                salto = _SALTO.search(texto, salto.end(), endpos)
+        if palabra and (romano is None or palabra.start() < romano.start()):
+            m = palabra
+        elif romano is not None:
+            m = romano
+        else:
+            return
+        yield m
+        pos = m.end()
+        if palabra and palabra.start() < pos:
+            palabra = _FIN_PALABRA.search(texto, pos, endpos)
+        if salto and salto.start() < pos:
+            salto, romano = _SALTO.search(texto, pos, endpos), None
+
+
+class _Barrido:
+    """finditer() que avanza solo hasta donde se le pregunta y recuerda lo visto."""
+
+    def __init__(self, iterador):
+        self._it = iterador
+        self.vistos: list = []
+        self.frontera = 0          # todo match que empiece antes de aquí ya está en `vistos`
+        self.agotado = False
+
+    def hasta(self, pos: int):
+        while not self.agotado and self.frontera <= pos:
+            m = next(self._it, None)
+            if m is None:
+                self.agotado = True
+                self.frontera = float("inf")
+            else:
+                self.vistos.append(m)
+                self.frontera = m.start()
+
+
+class IndiceDocumento:
+    """
+    Índice de un texto compartido por todas las estrategias de parsear(), en
+    lugar de que cada una vuelva a recorrerlo con su propia regex:
+      - primera aparición de cada patrón de SECCION_* (buscar_seccion)
+      - inicios de FIN_SECCION (cortar_en_fin_de_seccion)
+      - tablas "METAS CATEGORÍA", bloques "Tema: … METAS", "Progresión N"
+      - arranques numerados y bloques separados por líneas en blanco
+    Cada familia se recorre a lo más una vez por texto y solo hasta donde se
+    consulta. Cada consulta devuelve exactamente lo mismo que el
+    re.search/finditer al que sustituye.
+    """
 
+    # Palabra clave con la que empieza cada patrón de SECCION_*: todos los
+    # patrones de una familia comparten el mismo barrido de candidatos.
+    _FAMILIAS = {"PROP": r"PROP[ÓO]SITO", "PROG": r"PROGRESIONES", "META": r"METAS",
+                 "CONT": r"CONTENIDOS", "TEM[": r"TEM[ÁA]TICAS"}
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self._familias: dict[str, _Barrido] = {}
+        self._primeros: dict[str, tuple[int, int] | None] = {}
+        self._fines = _Barrido(_fines_seccion(texto))
+        self._inicios_fin: list[int] = []
+        self._spans_fin: dict[int, int] = {}
+        self._n_fin = 0
+
+    # --- encabezados de sección ---------------------------------------------
+    def primero(self, patron: str) -> tuple[int, int] | None:
+        """(inicio, fin) de la primera aparición, como re.search(patron, texto, IGNORECASE)."""
+        if patron not in self._primeros:
+            regex = re.compile(patron, re.IGNORECASE)
+            clave = patron.removeprefix("\\b")[:4]
+            if patron not in _PATRONES_INDEXADOS or clave not in self._FAMILIAS:
+                m = regex.search(self.texto)
+                self._primeros[patron] = m.span() if m else None
+                return self._primeros[patron]
+            if clave not in self._familias:
+                self._familias[clave] = _Barrido(re.finditer(self._FAMILIAS[clave], self.texto, re.IGNORECASE))
+            barrido, k, span = self._familias[clave], 0, None
+            while span is None:
+                if k == len(barrido.vistos):
+                    if barrido.agotado:
+                        break
+                    barrido.hasta(barrido.frontera)
+                    continue
+                m = regex.match(self.texto, barrido.vistos[k].start())
+                span = m.span() if m else None
+                k += 1
+            self._primeros[patron] = span
+        return self._primeros[patron]
+
+    # --- fin de sección -------------------------------------------------------
+    def _registrar_fines(self, pos: int):
+        """Avanza el barrido de FIN_SECCION hasta `pos`. finditer no traslapa:
+        dentro de un encabezado romano ("\n\nII. EVALUACIÓN") pueden empezar
+        otros matches (otro "\n", o la palabra tras el numeral); se agregan."""
+        self._fines.hasta(pos)
+        for m in self._fines.vistos[self._n_fin:]:
+            self._spans_fin[m.start()] = m.end()
+            if m.group(0).startswith("\n"):
+                # FIN_SECCION.match en cada salto interior, una vez por tramo de espacios
+                tramo, romano = -1, None
+                for q in range(m.start() + 1, m.end()):
+                    if self.texto[q] == "\n":
+                        if q >= tramo:
+                            tramo = _SALTO.match(self.texto, q).end()
+                            romano = _FIN_ROMANO.match(self.texto, tramo)
+                        if romano:
+                            self._spans_fin[q] = romano.end()
+                    elif q == m.end() - 1 and (f := FIN_SECCION.match(self.texto, q)):
+                        self._spans_fin[q] = f.end()
+        self._n_fin = len(self._fines.vistos)
+        self._inicios_fin = sorted(self._spans_fin)
+
+    def fin_de_seccion(self, desde: int, hasta: int) -> int | None:
+        """Inicio del primer FIN_SECCION en texto[desde:hasta], como FIN_SECCION.search(texto, desde, hasta)."""
+        if self._fines.frontera <= hasta:
+            self._registrar_fines(hasta)
+        inicios = self._inicios_fin
+        for k in range(bisect.bisect_left(inicios, desde), len(inicios)):
+            if inicios[k] >= hasta:
+                break
+            if self._spans_fin[inicios[k]] <= hasta:
+                return inicios[k]
+        return None
+
+    # --- marcas de las estrategias -------------------------------------------
+    @functools.cached_property
+    def tablas_metas(self) -> list[int]:
+        return [m.start() for m in _TABLA_METAS.finditer(self.texto)]
+
+    @functools.cached_property
+    def temas_metas(self) -> list[int]:
+        return [m.start() for m in _TEMA_METAS.finditer(self.texto)]
+
+    @functools.cached_property
+    def progresiones_n(self) -> list[tuple[int, int, int]]:
+        return [(m.start(), m.end(), int(m.group(1))) for m in _PROGRESION_N.finditer(self.texto)]
+
+    @functools.cached_property
+    def cortes_tabla(self) -> list[tuple[int, int]]:
+        return _cortes_tabla(self.texto)
+
+    @functools.cached_property
+    def encabezados_progresiones(self) -> list[tuple[int, int]]:
+        return [m.span() for m in _ENCABEZADO_PROGRESIONES.finditer(self.texto)]
+
+    @functools.cached_property
+    def conceptos_centrales(self) -> list[tuple[int, int]]:
+        return [m.span() for m in _CONCEPTO_CENTRAL.finditer(self.texto)]
+
+    @functools.cached_property
+    def numerados(self) -> list[tuple[int, int]]:
+        return [(m.start(), int(m.group(1))) for m in _NUMERADO.finditer(self.texto)]
+
+    @functools.cached_property
+    def lineas_blancas(self) -> list[tuple[int, int]]:
+        return [m.span() for m in _LINEA_BLANCA.finditer(self.texto)]
+
+    def bloques(self, inicio: int, fin: int) -> list[str]:
+        """
+        re.split(r"\n\s*\n", texto[inicio:fin]). Exacto cuando los bordes no
+        caen dentro de un tramo de espacios (caso de los bloques "Tema:").
+        """
+        blancas = self.lineas_blancas
+        piezas, cursor = [], inicio
+        for k in range(bisect.bisect_left(blancas, (inicio, -1)), len(blancas)):
+            a, b = blancas[k]
+            if b > fin:
+                break
+            piezas.append(self.texto[cursor:a])
+            cursor = b
+        piezas.append(self.texto[cursor:fin])
+        return piezas
 
-def buscar_seccion(texto: str, patrones: list[str], max_chars: int = 4000) -> str:
+
+_PATRONES_INDEXADOS = {p for patrones, _ in (SECCION_PROPOSITO, SECCION_PROGRESIONES, SECCION_METAS, SECCION_CONTENIDOS)
+                       for p in patrones}
+
+
+def cortar_en_fin_de_seccion(texto: str, max_chars: int, inicio: int = 0, fin: int | None = None,
+                             indice: IndiceDocumento | None = None) -> str:
+    """
+    Recorta texto[inicio:fin] donde empiece el siguiente encabezado de sección.
+    Trabaja con posiciones sobre el texto del documento: solo se copia el
+    fragmento final, no el tramo intermedio.
+    """
+    fin = len(texto) if fin is None else fin
+    # ignora las primeras posiciones (es el propio título)
+    if indice is not None:
+        corte = indice.fin_de_seccion(inicio + 40, fin)
+    else:
+        m = next(_fines_seccion(texto, inicio + 40, fin), None)
+        corte = m.start() if m else None
+    if corte is not None:
+        fin = corte
+    return limpiar(texto[inicio:fin])[:max_chars]
+
+
+def buscar_seccion(texto: str, patrones: list[str], max_chars: int = 4000,
+                   indice: IndiceDocumento | None = None) -> str:
     for pat in patrones:
-        m = re.search(pat, texto, re.IGNORECASE)
-        if m:
-            return cortar_en_fin_de_seccion(texto[m.end(): m.end() + max_chars + 500], max_chars)
+        if indice is not None:
+            span = indice.primero(pat)
+        else:
+            m = re.search(pat, texto, re.IGNORECASE)
+            span = m.span() if m else None
+        if span:
+            fin = span[1]
+            return cortar_en_fin_de_seccion(texto, max_chars, fin, min(len(texto), fin + max_chars + 500), indice)
     return ""
 
 
-def extraer_numerados(fragmento: str, minimo_chars: int = 25) -> list[dict]:
+def extraer_numerados(fragmento: str, minimo_chars: int = 25, indice: IndiceDocumento | None = None) -> list[dict]:
     """Divide un fragmento en items numerados: '1. ...' o '1) ...'"""
     items = []
     # posiciones de cada arranque numerado al inicio de línea (o tras punto)
-    arranques = [(m.start(), int(m.group(1))) for m in re.finditer(r"(?:^|\n)\s*(\d{1,2})[\.\)]\s+", fragmento)]
+    arranques = (indice or IndiceDocumento(fragmento)).numerados
     for i, (pos, num) in enumerate(arranques):
         fin = arranques[i + 1][0] if i + 1 < len(arranques) else len(fragmento)
         cuerpo = limpiar(re.sub(r"^\s*\d{1,2}[\.\)]\s+", "", fragmento[pos:fin]))
@@ -138,60 +967,144 @@ def extraer_numerados(fragmento: str, minimo_chars: int = 25) -> list[dict]:
     return items
 
 
-def extraer_formato_tabla_metas(frag: str) -> tuple[list[dict], list[str]]:
+def _parrafo_tabla(frag: str, indice: IndiceDocumento, inicio: int, h: int) -> str:
+    """
+    Párrafo de una progresión del formato tabla: frag[inicio:h] aplanado, sin
+    el encabezado "PROGRESIONES DE APRENDIZAJE", sin la línea "CONCEPTO
+    CENTRAL: …" (formato CNEyT) y sin residuos de tabla (filas CT/M/S/C sueltas).
+
+    Los cortes (último encabezado, primer CONCEPTO CENTRAL) se toman del índice
+    en vez de buscarlos con regex sobre el tramo aplanado, y solo se aplana la
+    ventana necesaria para los 1200 caracteres que se conservan: el costo no
+    depende de qué tan atrás quede `inicio`.
+    """
+    a = inicio
+    # último encabezado dentro del tramo (equivale a ^.*PROGRESIONES DE APRENDIZAJE\s*)
+    encabezados = indice.encabezados_progresiones
+    k = bisect.bisect_right(encabezados, h, key=lambda span: span[1]) - 1
+    if k >= 0 and encabezados[k][0] >= inicio:
+        a = _ESPACIOS.match(frag, encabezados[k][1], h).end()
+    # primer "CONCEPTO CENTRAL" después: de ahí al final se descarta
+    conceptos = indice.conceptos_centrales
+    k = bisect.bisect_left(conceptos, (a, -1))
+    fin = conceptos[k][0] if k < len(conceptos) and conceptos[k][1] <= h else h
+
+    ventana = 4096
+    while True:
+        b = min(fin, a + ventana)
+        plano = limpiar(frag[a:b].replace("\n", " "))
+        m = _RESIDUO_TABLA.match(plano)
+        corte = m.end() if m else 0
+        parrafo = plano[corte:].strip()
+        # con la ventana recortada el resultado vale si los residuos terminan
+        # antes del final (lo que sigue no puede iniciar otra fila CT#) y
+        # alcanza para los 1200 caracteres que se conservan
+        if b == fin or (len(parrafo) >= 1200 and not _INICIO_RESIDUO.match(plano, corte)):
+            return parrafo
+        ventana *= 4
+
+
+def _metas_tabla(tabla: str) -> list[str]:
+    """
+    Metas M1..Mn de una tabla aplanada. Equivale a
+      re.finditer(r"M(\d{1,2})\s+(.{20,300}?)(?=M\d{1,2}\s|C\d{1,2}\s|$)", tabla)
+    pero en un solo barrido: las marcas M#/C# se ubican una vez y cada cuerpo
+    termina en la primera marca a 20-300 caracteres (o en el final), en vez
+    de probar la anticipación carácter por carácter.
+    """
+    marcas = list(_MARCA_META.finditer(tabla))
+    fines = [m.start() for m in marcas] + [len(tabla)]
+    metas, pos = [], 0
+    for m in marcas:
+        if m.group(0)[0] != "M" or m.start() < pos:
+            continue
+        w0 = m.end(1)
+        w1 = _ESPACIOS.match(tabla, w0).end()
+        # \s+ es codicioso: primero el cuerpo tras todos los espacios, luego cediendo uno a uno
+        for b in range(w1, w0, -1):
+            k = bisect.bisect_left(fines, b + 20)
+            if k < len(fines) and fines[k] <= b + 300:
+                metas.append(limpiar(tabla[b:fines[k]])[:350])
+                pos = fines[k]
+                break
+    return metas
+
+
+def extraer_formato_tabla_metas(frag: str, indice: IndiceDocumento | None = None) -> tuple[list[dict], list[str]]:
     """
     Formato de los programas fundamentales 2023-2026:
     cada progresión es un PÁRRAFO (sin número) seguido de una tabla
     'METAS  CATEGORÍA  SUBCATEGORÍA' con items M1..Mn / C1 / S1..Sn.
+    Un solo barrido: los cortes de tabla se indexan una vez para todo `frag`.
     """
+    indice = indice or IndiceDocumento(frag)
     # Dos variantes de tabla: "METAS CATEGORÍA(S)" (mayoría) y
     # "METAS CONCEPTOS TRANSVERSALES" (UACs de CNEyT)
-    headers = [m.start() for m in re.finditer(r"METAS\s+(?:CATEGOR[ÍI]A|CONCEPTOS)", frag)]
+    headers = indice.tablas_metas
     if len(headers) < 2:
         return [], []
 
+    cortes = indice.cortes_tabla
+    fines_corte = [fin for _, fin in cortes]
     progresiones = []
     for idx, h in enumerate(headers):
-        antes = frag[:h]
         # El párrafo de la progresión es lo que hay DESPUÉS del final de la
-        # tabla anterior (última fila S# o número de página suelto).
-        cortes = [m.end() for m in re.finditer(r"(?:\bS\d{1,2}\s[^\n]{0,60}\n)|(?:\n\s*\d{1,3}\s*\n)", antes)]
-        inicio = cortes[-1] if cortes else max(0, h - 1500)
-        parrafo = limpiar(antes[inicio:].replace("\n", " "))
-        # limpiar restos de encabezado de sección y la línea "CONCEPTO CENTRAL: ..." (formato CNEyT)
-        parrafo = re.sub(r"^.*PROGRESIONES DE APRENDIZAJE\s*", "", parrafo, flags=re.IGNORECASE)
-        parrafo = re.sub(r"CONCEPTO CENTRAL\s*:?.*$", "", parrafo).strip()
-        # descartar residuos de tablas (filas CT/M/S/C sueltas)
-        parrafo = re.sub(r"^(?:C[TC]?\d{1,2}\.?\s+[^.]{0,80}\.\s*)+", "", parrafo).strip()
+        # tabla anterior (última fila S# o número de página suelto) antes de h.
+        # Un corte que cruza h se vuelve a probar contra frag[:h], como antes.
+        k = bisect.bisect_right(fines_corte, h)
+        ultimo = fines_corte[k - 1] if k else None
+        if k < len(cortes) and cortes[k][0] < h:
+            cola = _cortes_tabla(frag, cortes[k][0], h)
+            ultimo = cola[-1][1] if cola else ultimo
+        inicio = ultimo if ultimo is not None else max(0, h - 1500)
+        parrafo = _parrafo_tabla(frag, indice, inicio, h)
         if len(parrafo) >= 60:
             progresiones.append({"id": idx + 1, "descripcion": parrafo[:1200]})
 
     # Metas de la primera tabla (se repiten en todas): M1..Mn
-    metas = []
-    primera_tabla = frag[headers[0]: headers[0] + 2500]
-    for m in re.finditer(r"M(\d{1,2})\s+(.{20,300}?)(?=M\d{1,2}\s|C\d{1,2}\s|$)", primera_tabla.replace("\n", " ")):
-        metas.append(limpiar(m.group(2))[:350])
+    metas = _metas_tabla(frag[headers[0]: headers[0] + 2500].replace("\n", " "))
 
     return progresiones, metas
 
 
-def extraer_formato_tema_metas(texto: str) -> tuple[list[dict], list[str]]:
+def _bloque_metas_tema(ventana: str) -> str | None:
+    """
+    Texto entre "METAS" y "CATEGOR…". Equivale a
+      re.search(r"METAS\s*\n(.{50,1500}?)CATEGOR", ventana, re.DOTALL).group(1)
+    ubicando una sola vez las apariciones de CATEGOR en vez de probarla
+    carácter por carácter con el cuantificador perezoso.
+    """
+    categorias = [m.start() for m in re.finditer("CATEGOR", ventana)]
+    for m in re.finditer("METAS", ventana):
+        w1 = _ESPACIOS.match(ventana, m.end()).end()
+        # \s*\n codicioso: primero el último salto de línea del tramo de espacios
+        for n in range(w1 - 1, m.end() - 1, -1):
+            if ventana[n] != "\n":
+                continue
+            b = n + 1
+            k = bisect.bisect_left(categorias, b + 50)
+            if k < len(categorias) and categorias[k] <= b + 1500:
+                return ventana[b:categorias[k]]
+    return None
+
+
+def extraer_formato_tema_metas(texto: str, indice: IndiceDocumento | None = None) -> tuple[list[dict], list[str]]:
     """
     Formato de las UAC de Humanidades (2023-2026):
     párrafo de la progresión → línea 'Tema: X/Y' → 'METAS' →
     tabla CATEGORÍA / SUBCATEGORÍAS / DIMENSIONES.
     """
-    headers = [m.start() for m in re.finditer(r"Tema:\s*[^\n]+\n\s*METAS", texto)]
+    indice = indice or IndiceDocumento(texto)
+    headers = indice.temas_metas
     if len(headers) < 3:
         return [], []
 
     progresiones = []
     limites = [0] + headers
     for idx, h in enumerate(headers):
-        chunk = texto[limites[idx]:h]
         # El párrafo de la progresión es el último bloque de texto "corrido"
         # (separado por líneas en blanco) antes de la línea "Tema:"
-        piezas = [p for p in re.split(r"\n\s*\n", chunk)]
+        piezas = indice.bloques(limites[idx], h)
         parrafo = ""
         for pieza in reversed(piezas):
             plano = limpiar(pieza.replace("\n", " "))
@@ -205,9 +1118,9 @@ def extraer_formato_tema_metas(texto: str) -> tuple[list[dict], list[str]]:
 
     # Metas del primer bloque (texto entre METAS y CATEGORÍA)
     metas = []
-    m = re.search(r"METAS\s*\n(.{50,1500}?)CATEGOR", texto[headers[0]:headers[0] + 2500], re.DOTALL)
-    if m:
-        for linea in re.split(r"\n\s*\n", m.group(1)):
+    bloque = _bloque_metas_tema(texto[headers[0]:headers[0] + 2500])
+    if bloque is not None:
+        for linea in re.split(r"\n\s*\n", bloque):
             plano = limpiar(linea.replace("\n", " "))
             if len(plano) >= 40:
                 metas.append(plano[:350])
@@ -215,74 +1128,159 @@ def extraer_formato_tema_metas(texto: str) -> tuple[list[dict], list[str]]:
     return progresiones, metas
 
 
-def parsear(texto: str) -> dict:
-    texto = texto.replace("\r", "\n")
+def _progresiones_sueltas(texto: str, indice: IndiceDocumento) -> list[dict]:
+    """Fallback: patrón "Progresión 1." repartido por el documento."""
+    progresiones = []
+    sueltas = indice.progresiones_n
+    for (_, fin, num), sig in zip(sueltas, sueltas[1:] + [(len(texto), 0, 0)]):
+        cuerpo = cortar_en_fin_de_seccion(texto, 1200, fin, sig[0], indice)
+        if len(cuerpo) >= 25:
+            progresiones.append({"id": num, "descripcion": cuerpo})
+    return progresiones
+
+
+def clasificar_formato(frag_prog: str, indice_prog: IndiceDocumento,
+                       indice: IndiceDocumento) -> tuple[str | None, dict]:
+    """
+    Elige de antemano la estrategia de parsear() con señales baratas: arranques
+    numerados y tablas "METAS CATEGORÍA" en la sección de progresiones, tablas
+    en todo el documento, bloques "Tema: … METAS" y marcas "Progresión N". Son
+    las mismas listas del índice que usan las estrategias, así que contarlas no
+    repite barridos; se cuentan en orden y solo hasta decidir.
+
+    Cada conteo es una cota del número de progresiones de su estrategia. Solo
+    se elige una cuando las anteriores de la cascada no pueden llegar a 3 ni
+    dejar metas: si la elegida da ≥ 3, el resultado es el de la cascada.
+    Devuelve (estrategia o None si no hay certeza, señales contadas).
+    """
+    senales = {"numerados": len(indice_prog.numerados)}
+    if senales["numerados"] >= 3:
+        return "numerada", senales
+    senales["tablas_seccion"] = len(indice_prog.tablas_metas) if frag_prog else 0
+    if senales["tablas_seccion"] >= 3:
+        return "tabla", senales
+    if senales["tablas_seccion"] == 2:  # no gana, pero sus metas pasan al resultado
+        return None, senales
+    senales["tablas_documento"] = len(indice.tablas_metas)
+    if senales["tablas_documento"] >= 3:
+        return "tabla_documento", senales
+    if senales["tablas_documento"] == 2:
+        return None, senales
+    senales["temas"] = len(indice.temas_metas)
+    if senales["temas"] >= 3:
+        return "tema", senales
+    if senales["numerados"]:  # 1-2 progresiones numeradas le ganarían a "Progresión N"
+        return None, senales
+    senales["progresion_n"] = len(indice.progresiones_n)
+    return ("progresion_n" if senales["progresion_n"] else "ninguna"), senales
+
+
+def parsear(texto: str, tiempos: dict | None = None) -> dict:
+    """
+    Las progresiones salen de la estrategia que elige clasificar_formato();
+    solo si no hay certeza, o la elegida no basta, se corre la cascada
+    numerada → tabla → tabla_documento → tema → progresion_n. La decisión
+    queda en r["clasificador"].
+
+    Si se pasa `tiempos`, acumula ahí los segundos de cada etapa (secciones,
+    cada estrategia intentada, metas, contenidos): sirve para el reporte de
+    métricas y se puede reutilizar entre llamadas (parsear_perezoso).
+    """
+    t_previo = time.perf_counter()
+
+    def etapa(nombre: str):
+        nonlocal t_previo
+        ahora = time.perf_counter()
+        if tiempos is not None:
+            tiempos[nombre] = tiempos.get(nombre, 0.0) + ahora - t_previo
+        t_previo = ahora
 
-    proposito = buscar_seccion(texto, [
-        r"PROP[ÓO]SITO\s+FORMATIVO(?:\s+DE\s+LA\s+UAC)?",
-        r"PROP[ÓO]SITO\s+DE\s+LA\s+UAC",
-        r"PROP[ÓO]SITO\s+GENERAL",
-        r"\bPROP[ÓO]SITO\b",
-    ], max_chars=1200)
-
-    frag_prog = buscar_seccion(texto, [
-        r"PROGRESIONES\s+DE(?:L)?\s+APRENDIZAJE",
-        r"PROGRESIONES\s+Y\s+METAS",
-        r"\bPROGRESIONES\b",
-    ], max_chars=60000)
-    progresiones = extraer_numerados(frag_prog)
-    metas_tabla: list[str] = []
-
-    # Estrategia 2: formato "párrafo + tabla METAS/CATEGORÍA/SUBCATEGORÍA"
-    if len(progresiones) < 3 and frag_prog:
-        prog_tabla, metas_tabla = extraer_formato_tabla_metas(frag_prog)
-        if len(prog_tabla) > len(progresiones):
-            progresiones = prog_tabla
-
-    # Estrategia 2b: mismas tablas pero buscadas en TODO el documento
-    # (varios programas no tienen el encabezado "PROGRESIONES DE APRENDIZAJE")
-    if len(progresiones) < 3:
-        prog_tabla, metas2 = extraer_formato_tabla_metas(texto)
-        if len(prog_tabla) > len(progresiones):
-            progresiones = prog_tabla
-            if metas2 and not metas_tabla:
-                metas_tabla = metas2
-
-    # Estrategia 2c: formato Humanidades (párrafo → "Tema:" → METAS)
-    if len(progresiones) < 3:
-        prog_tema, metas3 = extraer_formato_tema_metas(texto)
-        if len(prog_tema) > len(progresiones):
-            progresiones = prog_tema
-            if metas3 and not metas_tabla:
-                metas_tabla = metas3
-
-    # Fallback: patrón "Progresión 1." repartido por el documento
-    if not progresiones:
-        sueltas = re.split(r"Progresi[óo]n\s+(\d{1,2})[\.:]?\s*", texto)
-        if len(sueltas) > 2:
-            progresiones = []
-            for j in range(1, len(sueltas) - 1, 2):
-                num = int(sueltas[j])
-                cuerpo = cortar_en_fin_de_seccion(sueltas[j + 1], 1200)
-                if len(cuerpo) >= 25:
-                    progresiones.append({"id": num, "descripcion": cuerpo})
-
-    frag_metas = buscar_seccion(texto, [r"METAS\s+DE\s+APRENDIZAJE"], max_chars=6000)
+    texto = texto.replace("\r", "\n")
+    indice = IndiceDocumento(texto)
+
+    proposito = buscar_seccion(texto, *SECCION_PROPOSITO, indice=indice)
+
+    frag_prog = buscar_seccion(texto, *SECCION_PROGRESIONES, indice=indice)
+    etapa("secciones")
+    indice_prog = IndiceDocumento(frag_prog)
+    formato, senales = clasificar_formato(frag_prog, indice_prog, indice)
+    etapa("clasificador")
+
+    hechas: dict[str, tuple[list[dict], list[str]]] = {}
+
+    def correr_estrategia(nombre: str) -> tuple[list[dict], list[str]]:
+        """Corre una estrategia una sola vez (la del clasificador se reutiliza si hay que caer a la cascada)."""
+        if nombre not in hechas:
+            if nombre == "numerada":
+                hechas[nombre] = extraer_numerados(frag_prog, indice=indice_prog), []
+            elif nombre == "tabla":
+                hechas[nombre] = extraer_formato_tabla_metas(frag_prog, indice_prog)
+            elif nombre == "tabla_documento":
+                hechas[nombre] = extraer_formato_tabla_metas(texto, indice)
+            elif nombre == "tema":
+                hechas[nombre] = extraer_formato_tema_metas(texto, indice)
+            else:
+                hechas[nombre] = _progresiones_sueltas(texto, indice), []
+            etapa(nombre)
+        return hechas[nombre]
+
+    # El clasificador acierta si su estrategia basta (≥ 3 progresiones, o es
+    # la última de la cascada): el resultado es el mismo que el de la cascada
+    acierto = None
+    if formato is not None:
+        progresiones, metas_tabla = correr_estrategia(formato) if formato != "ninguna" else ([], [])
+        estrategia = formato
+        acierto = formato in ("progresion_n", "ninguna") or len(progresiones) >= 3
+
+    if not acierto:
+        progresiones, _ = correr_estrategia("numerada")
+        estrategia = "numerada"
+        metas_tabla = []
+
+        # Estrategia 2: formato "párrafo + tabla METAS/CATEGORÍA/SUBCATEGORÍA"
+        if len(progresiones) < 3 and frag_prog:
+            prog_tabla, metas_tabla = correr_estrategia("tabla")
+            if len(prog_tabla) > len(progresiones):
+                progresiones = prog_tabla
+                estrategia = "tabla"
+
+        # Estrategia 2b: mismas tablas pero buscadas en TODO el documento
+        # (varios programas no tienen el encabezado "PROGRESIONES DE APRENDIZAJE")
+        if len(progresiones) < 3:
+            prog_tabla, metas2 = correr_estrategia("tabla_documento")
+            if len(prog_tabla) > len(progresiones):
+                progresiones = prog_tabla
+                estrategia = "tabla_documento"
+                if metas2 and not metas_tabla:
+                    metas_tabla = metas2
+
+        # Estrategia 2c: formato Humanidades (párrafo → "Tema:" → METAS)
+        if len(progresiones) < 3:
+            prog_tema, metas3 = correr_estrategia("tema")
+            if len(prog_tema) > len(progresiones):
+                progresiones = prog_tema
+                estrategia = "tema"
+                if metas3 and not metas_tabla:
+                    metas_tabla = metas3
+
+        # Fallback: patrón "Progresión 1." repartido por el documento
+        if not progresiones:
+            progresiones, _ = correr_estrategia("progresion_n")
+            estrategia = "progresion_n"
+
+    frag_metas = buscar_seccion(texto, *SECCION_METAS, indice=indice)
     metas = [it["descripcion"][:400] for it in extraer_numerados(frag_metas)] if frag_metas else []
     if not metas and metas_tabla:
         metas = metas_tabla
+    etapa("metas")
 
-    frag_cont = buscar_seccion(texto, [
-        r"CONTENIDOS\s+FORMATIVOS",
-        r"CONTENIDOS\s+CENTRALES",
-        r"\bCONTENIDOS\b",
-        r"TEM[ÁA]TICAS",
-    ], max_chars=8000)
+    frag_cont = buscar_seccion(texto, *SECCION_CONTENIDOS, indice=indice)
     contenidos_items = extraer_numerados(frag_cont, minimo_chars=10)
     contenidos = [it["descripcion"][:300] for it in contenidos_items]
     if not contenidos and frag_cont:
         # sin numeración: guardar el bloque como un solo texto
         contenidos = [frag_cont[:1500]]
+    etapa("contenidos")
 
     return {
         "proposito": proposito,
@@ -290,9 +1288,76 @@ def parsear(texto: str) -> dict:
         "metas_aprendizaje": metas,
         "contenidos": contenidos,
         "chars_texto_total": len(texto),
+        "estrategia": estrategia if progresiones else "ninguna",
+        "clasificador": {"formato": formato, "acierto": acierto, "senales": senales},
     }
 
 
+# Encabezados de las secciones finales del programa: una sección que no
+# apareció antes de ellos ya no aparece (parsear_perezoso)
+_CIERRE_DOCUMENTO = re.compile(r"ORIENTACIONES|BIBLIOGRAF[ÍI]A|REFERENCIAS|ANEXOS|GLOSARIO")
+# Cola del prefijo que se vuelve a buscar con cada página nueva: un encabezado
+# partido entre dos páginas, o uno que quedó muy cerca del corte
+SOLAPE_PAGINAS = 400
+# Un match que termina a más de esto del final del prefijo ya no cambia con más páginas
+MARGEN_CORTE = 80
+
+
+def parsear_perezoso(doc: DocumentoPerezoso, tiempos: dict | None = None) -> tuple[dict, str | None]:
+    """
+    parsear() leyendo solo las páginas necesarias. Devuelve (resultado,
+    texto completo o None si no hizo falta extraerlo todo).
+
+    buscar_seccion() se queda con la PRIMERA aparición del patrón preferido, así
+    que no se pueden saltar páginas intermedias: el prefijo crece página a
+    página, pero cada página se busca una sola vez (con una cola de la
+    anterior) y el prefijo solo se une para el parsear() final, así que leer
+    el documento cuesta lineal en páginas. Se corta en cuanto:
+      - la sección de progresiones tiene su patrón preferido en el prefijo y
+        su fragmento completo: hasta el siguiente FIN_SECCION, como
+        cortar_en_fin_de_seccion(), o max_chars + 500;
+      - cada una de las otras secciones, igual, o bien no apareció antes del
+        primer encabezado de cierre (orientaciones, bibliografía…) posterior a
+        las progresiones: se da por ausente sin leer el resto del documento;
+      - las progresiones salen de la sección (estrategias 1/2), sin llegar a
+        las estrategias que recorren todo el documento (2b, 2c, "Progresión N").
+    """
+    secciones = (SECCION_PROPOSITO, SECCION_PROGRESIONES, SECCION_METAS, SECCION_CONTENIDOS)
+    preferidos = [re.compile(patrones[0], re.IGNORECASE) for patrones, _ in secciones]
+    encabezados: dict[int, int] = {}   # sección → fin de su encabezado preferido en el prefijo
+    completas: set[int] = set()        # secciones con todo su fragmento en el prefijo
+    cierre = None
+    cola, largo = "", 0
+    for n in range(1, doc.n_paginas):
+        ventana = cola + ("\n" if n > 1 else "") + doc.pagina(n - 1).replace("\r", "\n")
+        # el primer carácter de la cola ya se buscó: solo da contexto a los \b
+        base, desde = largo - len(cola), 1 if cola else 0
+        largo = base + len(ventana)
+        lejos = largo - MARGEN_CORTE
+        for k, (regex, (_, max_chars)) in enumerate(zip(preferidos, secciones)):
+            if k not in encabezados and (m := regex.search(ventana, desde)) and base + m.end() < lejos:
+                encabezados[k] = base + m.end()
+            if k in encabezados and k not in completas:
+                tope = encabezados[k] + max_chars + 500
+                f = next(_fines_seccion(ventana, max(desde, encabezados[k] + 40 - base), tope - base), None)
+                if (f and base + f.end() < lejos) or largo > tope:
+                    completas.add(k)
+        if cierre is None and 1 in encabezados:
+            m = _CIERRE_DOCUMENTO.search(ventana, max(desde, encabezados[1] + 40 - base))
+            cierre = base + m.start() if m and base + m.end() < lejos else None
+        cola = ventana[-SOLAPE_PAGINAS:]
+        if 1 not in completas or len(completas) < len(encabezados):
+            continue
+        if len(encabezados) < len(secciones) and cierre is None:
+            continue
+        r = parsear(doc.prefijo(n), tiempos)
+        if r["estrategia"] in ("numerada", "tabla") and len(r["progresiones"]) >= 3:
+            return {**r, "paginas_extraidas": n}, None
+        break
+    texto = doc.texto_completo()
+    return {**parsear(texto, tiempos), "paginas_extraidas": doc.n_paginas}, texto
+
+
 def calidad(r: dict) -> str:
     n = len(r["progresiones"])
     if r["chars_texto_total"] < 1000:
@@ -306,6 +1371,24 @@ def calidad(r: dict) -> str:
     return "FALLIDA"
 
 
+# de peor a mejor, para comparar backends
+ORDEN_CALIDAD = ["SIN_TEXTO(escaneado?)", "FALLIDA", "PARCIAL", "MEDIA", "BUENA"]
+
+
+def elegir_backend(resultados: dict) -> str:
+    """
+    El backend más rápido que no baja la calidad ni el número de progresiones
+    respecto al default (PyPDF2). Si el default no se pudo medir, se queda.
+    """
+    ref = resultados.get(BACKEND_DEFAULT)
+    if not ref or ref["error"]:
+        return BACKEND_DEFAULT
+    iguales = [(r["seg"], nombre) for nombre, r in resultados.items()
+               if not r["error"] and ORDEN_CALIDAD.index(r["calidad"]) >= ORDEN_CALIDAD.index(ref["calidad"])
+               and r["n_prog"] >= ref["n_prog"]]
+    return min(iguales)[1]
+
+
 def a_markdown(prog: dict, r: dict) -> str:
     md = [f"# {prog['nombre']}", "",
           f"- **Generación:** {prog['generacion']}  |  **Componente:** {prog['componente']}",
@@ -325,12 +1408,461 @@ def a_markdown(prog: dict, r: dict) -> str:
     return "\n".join(md)
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--filtro", default="", help="Procesar solo programas cuyo nombre contenga este texto")
-    ap.add_argument("--limite", type=int, default=0, help="Procesar máximo N programas")
-    ap.add_argument("--solo-parsear", action="store_true", help="No descargar; re-parsear PDFs ya locales")
-    args = ap.parse_args()
+def contenido_extraido(r: dict, slug: str = "") -> dict:
+    """Lo que va al JSON de salida, con las progresiones en la forma del modelo compartido
+    (la que integrar_extraccion.cjs lleva al catálogo)."""
+    progresiones = [Progresion.desde_dict(p, f"{slug}.progresiones[{k}]").a_dict()
+                    for k, p in enumerate(r["progresiones"])]
+    return {"proposito": r["proposito"], "progresiones": progresiones,
+            "metas_aprendizaje": r["metas_aprendizaje"], "contenidos": r["contenidos"]}
+
+
+def analizar(trabajo: dict) -> dict:
+    """Extrae y parsea el PDF de un trabajo. Vive a nivel de módulo para que
+    pueda enviarse a los procesos del pool (--workers)."""
+    # tracemalloc y cProfile son por proceso: con --workers cada worker mide su
+    # documento y deja su .prof en trabajo["perfil"] para que main() los junte
+    memoria, perfil = trabajo.get("memoria"), None
+    if trabajo.get("perfil"):
+        perfil = cProfile.Profile()
+        perfil.enable()
+    if memoria:
+        tracemalloc.start()
+    try:
+        t = _analizar(trabajo)
+        pico = tracemalloc.get_traced_memory()[1] if memoria else None
+    finally:
+        if memoria:
+            tracemalloc.stop()
+        if perfil:
+            perfil.disable()
+            perfil.dump_stats(Path(trabajo["perfil"]) / f"{trabajo['slug']}.prof")
+    if pico is None:
+        return t
+    return {**t, "pico_kb": pico // 1024}
+
+
+def _analizar(trabajo: dict) -> dict:
+    pdf = Path(trabajo["pdf"])
+    if trabajo.get("sin_cambios") or not pdf.exists():
+        return {**trabajo, "r": None}
+    usar_cache = trabajo.get("cache", True)
+    backend = trabajo.get("backend", BACKEND_DEFAULT)
+    m = {"paginas": None, "texto_origen": "cache", "parseo": {}}
+    t0 = time.perf_counter()
+    sha = trabajo.get("sha") or sha256_archivo(pdf)
+    if trabajo.get("prechequeo"):
+        clase = clasificar_pdf(pdf)
+        m["prechequeo_s"] = time.perf_counter() - t0
+        if clase["tipo"] == "escaneado":
+            # solo imágenes: ni se extrae el texto ni se guarda en caché; va a la cola de OCR
+            m["texto_origen"] = "escaneado"
+            r = parsear("", m["parseo"])
+            m["parseo_s"] = sum(m["parseo"].values())
+            m["texto_s"] = time.perf_counter() - t0 - m["parseo_s"]
+            return {**trabajo, "r": r, "metricas": m, "escaneado": clase}
+    if not trabajo.get("perezoso"):
+        r = parsear(texto_con_cache(pdf, usar_cache, sha, m, backend), m["parseo"])
+    else:
+        texto = leer_cache_texto(sha, backend) if usar_cache else None
+        if texto is not None:
+            r = parsear(texto, m["parseo"])
+        else:
+            m["texto_origen"] = "pdf_perezoso"
+            try:
+                doc = DocumentoPerezoso(pdf, backend)
+                m["paginas"] = doc.n_paginas
+                try:
+                    r, texto = parsear_perezoso(doc, m["parseo"])
+                finally:
+                    doc.cerrar()
+            except Exception as e:
+                r = parsear(f"__ERROR_LECTURA__ {e}", m["parseo"])
+            if texto is not None and usar_cache:
+                guardar_cache_texto(sha, texto, backend)
+    # lo que no es parseo es obtener el texto: hash, caché, PyPDF2
+    m["parseo_s"] = sum(m["parseo"].values())
+    m["texto_s"] = time.perf_counter() - t0 - m["parseo_s"]
+    return {**trabajo, "r": r, "metricas": m}
+
+
+def comparar_backends(trabajo: dict) -> dict:
+    """Extrae (sin caché) y parsea un PDF con cada backend de trabajo["backends"]."""
+    pdf = Path(trabajo["pdf"])
+    resultados = {}
+    for backend in trabajo["backends"]:
+        m = {}
+        t0 = time.perf_counter()
+        texto = extraer_texto(pdf, m, backend)
+        seg = time.perf_counter() - t0
+        r = parsear(texto)
+        paginas = m.get("paginas")
+        resultados[backend] = {"seg": round(seg, 3), "paginas": paginas,
+                               "ms_pagina": round(1000 * seg / paginas, 2) if paginas else None,
+                               "calidad": calidad(r), "n_prog": len(r["progresiones"]),
+                               "error": texto.startswith("__ERROR_LECTURA__")}
+    return {**trabajo, "resultados": resultados, "elegido": elegir_backend(resultados)}
+
+
+def mapear_en_orden(fn, trabajos, workers: int, en_vuelo: int):
+    """
+    Como map(fn, trabajos) pero repartido en un pool de procesos.
+    - Entrega los resultados en el MISMO orden de entrada (orden del manifiesto).
+    - Nunca hay más de `en_vuelo` documentos pendientes: acota la memoria y
+      deja que `trabajos` (generador que descarga) avance al ritmo del pool.
+    """
+    if workers <= 1:
+        yield from map(fn, trabajos)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pendientes = deque()
+        for t in trabajos:
+            if len(pendientes) >= en_vuelo:
+                yield pendientes.popleft().result()
+            pendientes.append(pool.submit(fn, t))
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+def comparar_corpus(programas: list[dict], slugs: list[str], ruta: Path, workers: int, en_vuelo: int):
+    """
+    --comparar-backends: corre cada backend instalado sobre los PDFs locales y
+    guarda por programa los tiempos, la calidad y el backend elegido en
+    _backends.json (lo que usa --backend auto), más una tabla en _backends.md.
+    """
+    backends = backends_disponibles()
+    print(f"🔬 Backends instalados: {', '.join(backends)}")
+    elegidos = json.loads(ruta.read_text()) if ruta.exists() else {}
+    trabajos = ({"slug": slug, "pdf": str(DIR_PDFS / f"{slug}.pdf"), "backends": backends}
+                for slug in slugs if (DIR_PDFS / f"{slug}.pdf").exists())
+    for t in mapear_en_orden(comparar_backends, trabajos, workers, en_vuelo):
+        elegidos[t["slug"]] = {"elegido": t["elegido"], "resultados": t["resultados"]}
+        tiempos = "  ".join(f"{b} {r['seg']:.2f}s/{r['calidad']}" for b, r in t["resultados"].items())
+        print(f"  {t['slug']} → {t['elegido']}   ({tiempos})", flush=True)
+
+    ruta.write_text(json.dumps(elegidos, ensure_ascii=False, indent=1, sort_keys=True))
+    lineas = ["# Comparación de backends de texto", "",
+              "| Programa | Elegido | " + " | ".join(f"{b} ms/pág · calidad" for b in backends) + " |",
+              "|---|---|" + "---|" * len(backends)]
+    for slug, e in sorted(elegidos.items()):
+        celdas = []
+        for b in backends:
+            r = e["resultados"].get(b)
+            celdas.append("—" if r is None else
+                          f"{r['ms_pagina'] if r['ms_pagina'] is not None else '?'} · {'ERROR' if r['error'] else r['calidad']}")
+        lineas.append(f"| {slug} | {e['elegido']} | " + " | ".join(celdas) + " |")
+    conteo = {}
+    for e in elegidos.values():
+        conteo[e["elegido"]] = conteo.get(e["elegido"], 0) + 1
+    lineas += ["", "## Elegidos", ""] + [f"- **{k}**: {v}" for k, v in sorted(conteo.items())]
+    escribir_si_cambia(ruta.with_suffix(".md"), "\n".join(lineas))
+    print(f"Comparación: {ruta}  (usar con --backend auto)")
+
+
+def _correr_aislado(fn, trabajo: dict, conexion, limite_mb: int):
+    """Cuerpo del proceso hijo de mapear_aislado(): aplica el tope de memoria, corre fn y envía el resultado."""
+    if limite_mb:
+        # macOS suele rechazar RLIMIT_AS y algunos contenedores no dejan tocarlo:
+        # sin tope de memoria, pero el documento se analiza igual
+        try:
+            import resource  # solo Unix
+            _, duro = resource.getrlimit(resource.RLIMIT_AS)
+            blando = limite_mb << 20 if duro == resource.RLIM_INFINITY else min(limite_mb << 20, duro)
+            resource.setrlimit(resource.RLIMIT_AS, (blando, duro))
+        except (ImportError, ValueError, OSError) as e:
+            print(f"   ⚠️  {trabajo.get('slug', '')}: sin tope de memoria ({type(e).__name__}: {e})", flush=True)
+    try:
+        resultado = fn(trabajo)
+    except MemoryError:
+        resultado = {**trabajo, "r": None, "fallo": "MEMORIA", "detalle": f"más de {limite_mb} MB"}
+    except Exception as e:
+        resultado = {**trabajo, "r": None, "fallo": "ERROR", "detalle": f"{type(e).__name__}: {e}"}
+    conexion.send(resultado)
+    conexion.close()
+
+
+def mapear_aislado(fn, trabajos, workers: int, en_vuelo: int, limite_s: float = 0, limite_mb: int = 0):
+    """
+    Como mapear_en_orden() pero cada documento corre en su propio proceso, con
+    tope de tiempo de pared (limite_s) y de memoria (limite_mb, RLIMIT_AS).
+    Un PDF que cuelga a PdfReader o una regex se mata al vencer su plazo y se
+    entrega como {"fallo": "TIMEOUT"}; lo mismo con "MEMORIA" o "ERROR". La
+    corrida sigue con el resto.
+    """
+    ctx = multiprocessing.get_context()
+    fuente = iter(trabajos)
+    pendientes = deque()  # en orden de entrada; cada uno: trabajo, proceso, conexión, plazo, resultado
+    agotado = False
+
+    def fallo(p: dict, tipo: str, detalle: str) -> dict:
+        return {**p["trabajo"], "r": None, "fallo": tipo, "detalle": detalle}
+
+    while True:
+        while not agotado and len(pendientes) < en_vuelo:
+            try:
+                pendientes.append({"trabajo": next(fuente), "proceso": None, "resultado": None})
+            except StopIteration:
+                agotado = True
+        if not pendientes:
+            return
+        if pendientes[0]["resultado"] is not None:
+            yield pendientes.popleft()["resultado"]
+            continue
+
+        corriendo = [p for p in pendientes if p["proceso"] is not None and p["resultado"] is None]
+        for p in pendientes:
+            if len(corriendo) >= workers:
+                break
+            if p["proceso"] is None and p["trabajo"].get("sin_cambios"):
+                p["resultado"] = {**p["trabajo"], "r": None}  # nada que analizar: no vale un proceso
+                continue
+            if p["proceso"] is None:
+                lectura, escritura = ctx.Pipe(duplex=False)
+                p["proceso"] = ctx.Process(target=_correr_aislado, args=(fn, p["trabajo"], escritura, limite_mb), daemon=True)
+                p["proceso"].start()
+                escritura.close()  # solo el hijo escribe: si muere sin responder, la lectura ve EOF
+                p["conexion"], p["plazo"] = lectura, time.monotonic() + limite_s
+                corriendo.append(p)
+        if not corriendo:
+            continue
+
+        espera = max(0.0, min(p["plazo"] for p in corriendo) - time.monotonic()) if limite_s else None
+        listos = multiprocessing.connection.wait([p["conexion"] for p in corriendo], timeout=espera)
+        for p in corriendo:
+            if p["conexion"] in listos:
+                try:
+                    p["resultado"] = p["conexion"].recv()
+                except EOFError:
+                    p["proceso"].join()
+                    p["resultado"] = fallo(p, "ERROR", f"el proceso terminó sin responder (código {p['proceso'].exitcode})")
+            elif limite_s and time.monotonic() >= p["plazo"]:
+                p["proceso"].kill()
+                p["resultado"] = fallo(p, "TIMEOUT", f"más de {limite_s:g} s")
+            else:
+                continue
+            p["proceso"].join()
+            p["conexion"].close()
+
+
+# ============================================================
+# DIARIO DE LA CORRIDA (reanudable)
+# ============================================================
+
+# Opciones que cambian qué se procesa o cómo: otra combinación es otra corrida
+ARGUMENTOS_DIARIO = ("filtro", "limite", "solo_parsear", "incremental", "sin_cache", "perezoso", "backend",
+                     "sin_prechequeo", "verificar")
+
+
+class Diario:
+    """
+    Diario append-only de la corrida en curso: una línea JSON por etapa
+    terminada de cada programa (descarga, analisis, escritura o fallo); la
+    primera guarda la huella de los parámetros y del manifiesto.
+
+    Si la corrida muere, la siguiente con la misma huella toma del diario los
+    programas ya escritos o fallidos (fila del reporte, métricas, entrada del
+    lock) y sigue con el resto, así que el _reporte.md final sale completo.
+    Al terminar la corrida el diario se borra.
+    """
+
+    def __init__(self, ruta: Path, parametros: dict, desde_cero: bool = False):
+        self.ruta = ruta
+        huella = hashlib.sha256(json.dumps(parametros, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+        entradas = []
+        if ruta.exists() and not desde_cero:
+            for linea in ruta.read_text(encoding="utf-8").splitlines():
+                try:
+                    entradas.append(json.loads(linea))
+                except ValueError:
+                    continue  # línea a medias: el proceso murió escribiéndola
+        self.hechos: dict[str, dict] = {}
+        self._candado = threading.Lock()
+        if entradas and entradas[0].get("huella") == huella:
+            self.hechos = {e["slug"]: e for e in entradas[1:] if e.get("etapa") in ("escritura", "fallo")}
+            completo = ruta.read_bytes().endswith(b"\n")
+            self._archivo = open(ruta, "a", encoding="utf-8")
+            if not completo:
+                self._archivo.write("\n")
+        else:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            self._archivo = open(ruta, "w", encoding="utf-8")
+            self._escribir({"huella": huella, "inicio": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+    def _escribir(self, entrada: dict):
+        with self._candado:
+            self._archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            self._archivo.flush()  # que sobreviva a que maten el proceso
+
+    def anotar(self, slug: str, etapa: str, **datos):
+        self._escribir({"slug": slug, "etapa": etapa, **datos})
+
+    def cerrar(self):
+        self._archivo.close()
+        self.ruta.unlink(missing_ok=True)
+
+
+# ============================================================
+# MODO --vigilar: PARSER CALIENTE + SOCKET LOCAL
+# ============================================================
+
+class _AtenderDocumento(socketserver.StreamRequestHandler):
+    """
+    Una línea JSON por petición, una línea JSON por respuesta:
+      → {"pdf": "/ruta/al.pdf", "backend": "pypdf2", "cache": true}
+      ← {"ok": true, "calidad_extraccion", "estrategia", "proposito", "progresiones", ..., "ms"}
+      ← {"ok": false, "error": "...", "fallo": "TIMEOUT" | "MEMORIA" | "ERROR" (si lo hubo)}
+    Con --limite-s/--limite-mb cada documento corre aislado, como en la
+    corrida por lotes (mapear_aislado): un PDF patológico no cuelga el hilo
+    ni se come la memoria del proceso que vigila.
+    """
+
+    def handle(self):
+        for linea in self.rfile:
+            if not linea.strip():
+                continue
+            t0 = time.perf_counter()
+            try:
+                peticion = json.loads(linea)
+                pdf = Path(peticion["pdf"])
+                if not pdf.is_file():
+                    raise FileNotFoundError(f"no existe {pdf}")
+                backend = peticion.get("backend", BACKEND_DEFAULT)
+                if backend not in BACKENDS:
+                    raise ValueError(f"backend desconocido: {backend}")
+                trabajo = {"slug": pdf.stem, "pdf": str(pdf), "backend": backend,
+                           "cache": peticion.get("cache", True), "prechequeo": True}
+                if self.server.limite_s or self.server.limite_mb:
+                    t = next(mapear_aislado(analizar, [trabajo], 1, 1, self.server.limite_s, self.server.limite_mb))
+                else:
+                    t = analizar(trabajo)
+                if t.get("fallo"):
+                    respuesta = {"ok": False, "error": t["detalle"], "fallo": t["fallo"]}
+                else:
+                    r = t["r"]
+                    respuesta = {"ok": True, **contenido_extraido(r, pdf.stem), "calidad_extraccion": calidad(r),
+                                 "estrategia": r["estrategia"], "escaneado": t.get("escaneado")}
+            except Exception as e:
+                respuesta = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            respuesta["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            self.wfile.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ServidorExtraccion(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    limite_s: float = 0
+    limite_mb: int = 0
+
+
+def abrir_socket(ruta: Path, limite_s: float = 0, limite_mb: int = 0) -> ServidorExtraccion:
+    """
+    Atiende el socket en un hilo, con los topes por documento de la corrida.
+    Un socket que quedó de un proceso muerto se reemplaza.
+    """
+    if ruta.exists():
+        try:
+            with socket.socket(socket.AF_UNIX) as prueba:
+                prueba.connect(str(ruta))
+        except OSError:
+            ruta.unlink()
+        else:
+            sys.exit(f"❌ Ya hay un extractor atendiendo {ruta}")
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    servidor = ServidorExtraccion(str(ruta), _AtenderDocumento)
+    servidor.limite_s, servidor.limite_mb = limite_s, limite_mb
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def firma_pdfs() -> dict[str, tuple[int, int]]:
+    """slug → (mtime_ns, tamaño) de cada PDF completo (no .part ni temporales) en DIR_PDFS."""
+    firmas = {}
+    with os.scandir(DIR_PDFS) as entradas:
+        for e in entradas:
+            if e.name.endswith(".pdf") and e.is_file():
+                st = e.stat()
+                firmas[e.name[:-4]] = (st.st_mtime_ns, st.st_size)
+    return firmas
+
+
+def programas_por_slug() -> dict[str, dict]:
+    return {f"{slugify(p['nombre'])}--{p['generacion']}": p for p in json.loads(MANIFIESTO.read_text())["programas"]}
+
+
+def distintos(antes: dict, despues: dict) -> set[str]:
+    return {k for k in antes.keys() | despues.keys() if antes.get(k) != despues.get(k)}
+
+
+def vigilar(args):
+    """
+    --vigilar: una corrida incremental y luego, cada `intervalo` segundos,
+    revisa el manifiesto y DIR_PDFS. Los programas cuya entrada o PDF cambió
+    se re-procesan con correr(args, solo=...) cuando pasa una revisión sin
+    cambios nuevos (un PDF que se está copiando no se lee a medias). Este
+    proceso ya tiene PyPDF2 y las regex cargados: sin costo de arranque.
+    """
+    args.incremental = True
+    for d in (DIR_PDFS, DIR_JSON, DIR_MD):
+        d.mkdir(parents=True, exist_ok=True)
+    servidor = abrir_socket(Path(args.socket), args.limite_s, args.limite_mb) if args.socket else None
+    try:
+        programas, pdfs = programas_por_slug(), firma_pdfs()
+        correr(args)
+        pendientes: set[str] = set()
+        print(f"👀 Vigilando {MANIFIESTO.name} y {DIR_PDFS}" + (f"; socket {args.socket}" if servidor else ""),
+              flush=True)
+        while True:
+            time.sleep(args.intervalo)
+            try:
+                nuevos = programas_por_slug()
+            except (OSError, ValueError, KeyError):
+                continue  # manifiesto a medio guardar: se revisa en la siguiente vuelta
+            firmas = firma_pdfs()
+            cambios = distintos(programas, nuevos) | distintos(pdfs, firmas)
+            programas, pdfs = nuevos, firmas
+            if cambios:
+                pendientes |= cambios
+                continue
+            solo = pendientes & programas.keys()  # los que salieron del manifiesto solo dejan de reportarse
+            if not pendientes:
+                continue
+            pendientes = set()
+            if solo:
+                print(f"\n🔄 {len(solo)} programa(s) cambiaron: {', '.join(sorted(solo))}", flush=True)
+            correr(args, solo)
+            # lo que escribió la corrida misma (PDFs bajados) no es un cambio nuevo
+            firmas = firma_pdfs()
+            pendientes = {k for k in distintos(pdfs, firmas) if k not in solo}
+            pdfs = firmas
+    except KeyboardInterrupt:
+        print("\n👋 Fin del modo --vigilar")
+    finally:
+        if servidor:
+            servidor.shutdown()
+            servidor.server_close()
+            Path(args.socket).unlink(missing_ok=True)
+
+
+def correr(args, solo: set[str] | None = None):
+    """
+    Una corrida sobre el manifiesto, en etapas que se solapan: descarga (hilos)
+    → extracción y parseo (procesos) → escritura (un hilo), unidas por colas
+    acotadas. Cada etapa terminada se anota en el Diario; una corrida cortada
+    se reanuda donde quedó.
+
+    Con `solo` (modo --vigilar) solo se descargan y analizan esos slugs; el
+    resto entra al reporte con lo que registró _lock.json, sin abrir su PDF.
+    """
+    workers = args.workers or os.cpu_count() or 1
+    aislar = bool(args.limite_s or args.limite_mb)
+    en_vuelo = args.en_vuelo or 2 * workers
+    t_corrida = time.perf_counter()
+    perfil, dir_perfiles = None, ""
+    if args.perfil:
+        perfil = cProfile.Profile()
+        perfil.enable()
+        if workers > 1 or aislar:  # los workers no los ve el perfil de este proceso: dejan un .prof por documento
+            dir_perfiles = tempfile.mkdtemp(prefix="perfil-")
 
     for d in (DIR_PDFS, DIR_JSON, DIR_MD):
         d.mkdir(parents=True, exist_ok=True)
@@ -341,29 +1873,207 @@ def main():
     if args.limite:
         programas = programas[: args.limite]
 
-    reporte = []
-    for i, prog in enumerate(programas, 1):
-        slug = f"{slugify(prog['nombre'])}--{prog['generacion']}"
-        pdf = DIR_PDFS / f"{slug}.pdf"
+    slugs = [f"{slugify(p['nombre'])}--{p['generacion']}" for p in programas]
+    ruta_backends = RAIZ / "data" / "extraccion" / "_backends.json"
+    if args.comparar_backends:
+        comparar_corpus(programas, slugs, ruta_backends, workers, en_vuelo)
+        return
+    disponibles = backends_disponibles()
+    elegidos = json.loads(ruta_backends.read_text()) if ruta_backends.exists() else {}
+
+    def backend_de(prog: dict, slug: str) -> str:
+        if args.backend and args.backend != "auto":
+            return args.backend
+        if prog.get("backend"):
+            return prog["backend"]
+        elegido = elegidos.get(slug, {}).get("elegido") if args.backend == "auto" else None
+        return elegido if elegido in disponibles else BACKEND_DEFAULT
+
+    ruta_lock = RAIZ / "data" / "extraccion" / "_lock.json"
+    lock = json.loads(ruta_lock.read_text()) if ruta_lock.exists() else {}
+    # Cola de PDFs escaneados (solo imágenes) pendientes de OCR, acumulada entre corridas
+    ruta_escaneados = RAIZ / "data" / "extraccion" / "_escaneados.json"
+    escaneados = json.loads(ruta_escaneados.read_text()) if ruta_escaneados.exists() else {}
+
+    # Diario de la corrida: lo que terminó una corrida interrumpida con los
+    # mismos parámetros no se vuelve a bajar, analizar ni escribir
+    diario = None
+    if solo is None:
+        diario = Diario(RAIZ / "data" / "extraccion" / "_diario.jsonl", {"argumentos": {k: getattr(args, k) for k in ARGUMENTOS_DIARIO},
+                                      "programas": programas, "parser": VERSION_PARSER}, args.desde_cero)
+        if diario.hechos:
+            print(f"↺ Reanudando la corrida interrumpida: {len(diario.hechos)} de {len(programas)} programas "
+                  f"ya terminados ({diario.ruta.name})", flush=True)
+    hechos = diario.hechos if diario else {}
+
+    def huella(prog: dict, sha: str, backend: str) -> dict:
+        return {"manifiesto": prog, "sha256_pdf": sha, "parser": VERSION_PARSER, "texto": clave_backend(backend)}
+
+    # Etapa de descarga: pool de hilos con conexiones keep-alive compartidas.
+    # Se lanzan en orden del manifiesto y nunca más de `adelanto` por delante
+    # del análisis: la red corre en paralelo al CPU sin adelantarse sin límite.
+    pool_http = PoolConexiones(por_host=args.por_host)
+    hilos = ThreadPoolExecutor(max_workers=max(1, args.descargas))
+    adelanto = 2 * max(1, args.descargas) + en_vuelo
+
+    def descargas():
+        ventana = deque()
+        for prog, slug in zip(programas, slugs):
+            bajar = not (args.solo_parsear or slug in hechos or (solo is not None and slug not in solo))
+            ventana.append((prog, slug, hilos.submit(descargar_medido, prog["url"], DIR_PDFS / f"{slug}.pdf",
+                                                     pool_http, args.reintentos, args.verificar) if bajar else None))
+            if len(ventana) > adelanto:
+                yield ventana.popleft()
+        yield from ventana
+
+    # Etapas de extracción y parseo: trabajos() → analizar() en el pool de procesos (mapear_*)
+    def trabajos():
+        for prog, slug, fut in descargas():
+            if slug in hechos:
+                yield {"prog": prog, "slug": slug, "pdf": "", "sin_cambios": True, "hecho": hechos[slug]}
+                continue
+            dl = {"estado": "local", "seg": 0.0, "bytes": 0, "sha256": ""} if fut is None else fut.result()
+            if fut is not None and diario:
+                diario.anotar(slug, "descarga", estado=dl["estado"], sha256=dl["sha256"])
+            pdf = DIR_PDFS / f"{slug}.pdf"
+            previo = lock.get(slug, {})
+            backend = backend_de(prog, slug)
+            salidas = (DIR_JSON / f"{slug}.json").exists() and (DIR_MD / f"{slug}.md").exists()
+            if solo is not None and slug not in solo and previo and salidas:
+                sha, sin_cambios = previo["huella"]["sha256_pdf"], True
+            else:
+                if not pdf.exists():
+                    sha = ""
+                elif solo is not None:  # el PDF pudo cambiar sin cambiar de tamaño: no vale el registro
+                    sha = dl["sha256"] if dl["estado"].startswith("descargado") else sha256_archivo(pdf)
+                else:
+                    sha = dl["sha256"] or sha256_pdf(pdf)
+                sin_cambios = (args.incremental and sha and previo.get("huella") == huella(prog, sha, backend)
+                               and salidas)
+            yield {"prog": prog, "slug": slug, "pdf": str(pdf), "estado_dl": dl["estado"], "descarga": dl,
+                   "cache": not args.sin_cache, "perezoso": args.perezoso, "memoria": args.memoria, "perfil": dir_perfiles,
+                   "backend": backend, "sha": sha, "sin_cambios": bool(sin_cambios),
+                   "prechequeo": not args.sin_prechequeo}
+
+    # Etapa de escritura: un hilo escribe el JSON y el .md de cada programa
+    # mientras el análisis sigue con el siguiente. La cola acotada frena al
+    # análisis si el disco se queda atrás; lo escrito se anota en el diario.
+    cola_escritura: queue.Queue = queue.Queue(maxsize=en_vuelo)
+    escritura = {"escritos": 0, "error": None}
+
+    def escribir():
+        while (pendiente := cola_escritura.get()) is not None:
+            slug, salida, md, registro = pendiente
+            if escritura["error"] is not None:
+                continue  # se sigue vaciando la cola para no trabar al análisis
+            try:
+                t0 = time.perf_counter()
+                escritura["escritos"] += escribir_si_cambia(DIR_JSON / f"{slug}.json",
+                                                            json.dumps(salida, ensure_ascii=False, indent=1))
+                escritura["escritos"] += escribir_si_cambia(DIR_MD / f"{slug}.md", md)
+                registro["metricas"]["escritura_s"] = round(time.perf_counter() - t0, 4)
+                if diario:
+                    diario.anotar(slug, "escritura", **registro)
+            except Exception as e:  # disco lleno, permisos...: la corrida termina con el error
+                escritura["error"] = e
+
+    hilo_escritura = threading.Thread(target=escribir, daemon=True)
+    hilo_escritura.start()
 
-        estado_dl = "local" if args.solo_parsear else descargar(prog["url"], pdf)
-        if not pdf.exists():
+    reporte = []
+    metricas = []
+    if aislar:
+        resultados = mapear_aislado(analizar, trabajos(), workers, en_vuelo, args.limite_s, args.limite_mb)
+    else:
+        resultados = mapear_en_orden(analizar, trabajos(), workers, en_vuelo)
+    for i, t in enumerate(resultados, 1):
+        if t.get("hecho"):
+            # terminado por la corrida interrumpida: tal como quedó en el diario
+            hecho, slug = t["hecho"], t["slug"]
+            reporte.append(hecho["reporte"])
+            metricas.append(hecho["metricas"])
+            if "lock" in hecho:
+                lock[slug] = hecho["lock"]
+                if hecho.get("escaneado"):
+                    escaneados[slug] = hecho["escaneado"]
+                else:
+                    escaneados.pop(slug, None)
+            continue
+        prog, slug, estado_dl, r = t["prog"], t["slug"], t["estado_dl"], t["r"]
+        fila = {"slug": slug, "descarga": t["descarga"]}
+        metricas.append(fila)
+        if t.get("fallo"):
+            # TIMEOUT / MEMORIA / ERROR: sin salidas ni entrada en el lock, se reintenta en la siguiente corrida
+            fila.update({"estado": t["fallo"], "detalle": t["detalle"]})
+            reporte.append({"nombre": prog["nombre"], "gen": prog["generacion"], "calidad": t["fallo"],
+                            "detalle": t["detalle"], "n_prog": 0})
+            if diario:
+                diario.anotar(slug, "fallo", reporte=reporte[-1], metricas=fila)
+            print(f"[{i}/{len(programas)}] ✗ {prog['nombre']} → {t['fallo']} ({t['detalle']})", flush=True)
+            continue
+        if t["sin_cambios"]:
+            previo = lock[slug]
+            fila["estado"] = "SIN_CAMBIOS"
+            reporte.append({"nombre": prog["nombre"], "gen": prog["generacion"], "calidad": previo["calidad"],
+                            "detalle": estado_dl, "n_prog": previo["n_prog"], "clasificador": previo.get("clasificador")})
+            if solo is None or slug in solo:
+                print(f"[{i}/{len(programas)}] = {prog['nombre']} → sin cambios ({previo['calidad']})", flush=True)
+            continue
+        if r is None:
+            fila["estado"] = "SIN_PDF"
             reporte.append({"nombre": prog["nombre"], "gen": prog["generacion"], "calidad": "SIN_PDF", "detalle": estado_dl, "n_prog": 0})
             print(f"[{i}/{len(programas)}] ✗ {prog['nombre']} → {estado_dl}", flush=True)
             continue
 
-        texto = extraer_texto(pdf)
-        r = parsear(texto)
         q = calidad(r)
-
-        salida = {**prog, "slug": slug, **{k: r[k] for k in ("proposito", "progresiones", "metas_aprendizaje", "contenidos")},
-                  "calidad_extraccion": q, "extraido_con": "extraer_progresiones.py v1"}
-        (DIR_JSON / f"{slug}.json").write_text(json.dumps(salida, ensure_ascii=False, indent=1))
-        (DIR_MD / f"{slug}.md").write_text(a_markdown(prog, r))
+        m = t["metricas"]
+        detalle = estado_dl
+        if t.get("escaneado"):
+            clase = t["escaneado"]
+            escaneados[slug] = {"nombre": prog["nombre"], "url": prog["url"], "sha256": t["sha"], **clase}
+            detalle = f"escaneado: {clase['imagenes']} imágenes, sin texto en {clase['streams_muestra']} streams"
+        else:
+            escaneados.pop(slug, None)
+        # con el texto en caché no se abre el PDF: el número de páginas viene de la corrida anterior
+        paginas = m["paginas"] if m["paginas"] is not None else lock.get(slug, {}).get("paginas")
+
+        salida = {**prog, "slug": slug, **contenido_extraido(r, slug),
+                  "calidad_extraccion": q, "extraido_con": f"extraer_progresiones.py v{VERSION_PARSER}"}
+        clasificador = {k: r["clasificador"][k] for k in ("formato", "acierto")}
+        lock[slug] = {"huella": huella(prog, t["sha"], t["backend"]), "calidad": q, "n_prog": len(r["progresiones"]),
+                      "paginas": paginas, "clasificador": clasificador}
+        fila.update({"estado": q, "estrategia": r["estrategia"], "clasificador": r["clasificador"],
+                     "backend": t["backend"], "paginas": paginas,
+                     "texto_origen": m["texto_origen"], "texto_s": round(m["texto_s"], 4),
+                     "parseo_s": round(m["parseo_s"], 4), "parseo": {k: round(v, 4) for k, v in m["parseo"].items()},
+                     "pico_kb": t.get("pico_kb")})
+        if "prechequeo_s" in m:
+            fila["prechequeo_s"] = round(m["prechequeo_s"], 4)
 
         reporte.append({"nombre": prog["nombre"], "gen": prog["generacion"], "calidad": q,
-                        "detalle": estado_dl, "n_prog": len(r["progresiones"])})
-        print(f"[{i}/{len(programas)}] {'✓' if q in ('BUENA','MEDIA') else '△'} {prog['nombre']} → {q} ({len(r['progresiones'])} progresiones)", flush=True)
+                        "detalle": detalle, "n_prog": len(r["progresiones"]), "pico_kb": t.get("pico_kb"),
+                        "clasificador": clasificador})
+        if diario:
+            diario.anotar(slug, "analisis", calidad=q, estrategia=r["estrategia"], texto_origen=m["texto_origen"])
+        cola_escritura.put((slug, salida, a_markdown(prog, r),
+                            {"reporte": reporte[-1], "metricas": fila, "lock": lock[slug], "escaneado": escaneados.get(slug)}))
+        memoria = f" [pico {t['pico_kb'] / 1024:.1f} MB]" if "pico_kb" in t else ""
+        print(f"[{i}/{len(programas)}] {'✓' if q in ('BUENA','MEDIA') else '△'} {prog['nombre']} → {q} ({len(r['progresiones'])} progresiones){memoria}", flush=True)
+
+    hilos.shutdown()
+    pool_http.cerrar()
+    cola_escritura.put(None)
+    hilo_escritura.join()
+    if escritura["error"] is not None:
+        raise escritura["error"]  # el diario queda: la siguiente corrida reanuda desde lo escrito
+    escritos = escritura["escritos"]
+
+    # Métricas por etapa de cada programa (JSON, junto al reporte)
+    ruta_metricas = RAIZ / "data" / "extraccion" / "_metricas.json"
+    ruta_metricas.write_text(json.dumps({
+        "total_s": round(time.perf_counter() - t_corrida, 3), "workers": workers, "perezoso": args.perezoso,
+        "cache": not args.sin_cache, "memoria": args.memoria, "programas": metricas,
+    }, ensure_ascii=False, indent=1))
 
     # Reporte global
     lineas = ["# Reporte de extracción DGB", "", "| Programa | Gen | Calidad | Progresiones |", "|---|---|---|---|"]
@@ -373,12 +2083,101 @@ def main():
     for r in reporte:
         resumen[r["calidad"]] = resumen.get(r["calidad"], 0) + 1
     lineas += ["", "## Resumen", ""] + [f"- **{k}**: {v}" for k, v in sorted(resumen.items())]
-    (RAIZ / "data" / "extraccion" / "_reporte.md").write_text("\n".join(lineas))
+    # Decisiones del clasificador de formato: acierto = su estrategia bastó, sin correr la cascada
+    decisiones: dict[str, list[int]] = {}
+    for r in reporte:
+        if r.get("clasificador"):
+            formato = r["clasificador"]["formato"] or "(cascada)"
+            d = decisiones.setdefault(formato, [0, 0])
+            d[0] += 1
+            d[1] += bool(r["clasificador"]["acierto"])
+    if decisiones:
+        lineas += ["", "## Clasificador de formato", "", "| Formato elegido | Programas | Aciertos | Tasa |", "|---|---|---|---|"]
+        for formato, (n, aciertos) in sorted(decisiones.items()):
+            tasa = "—" if formato == "(cascada)" else f"{aciertos / n:.0%}"
+            lineas.append(f"| {formato} | {n} | {aciertos if formato != '(cascada)' else '—'} | {tasa} |")
+        n_elegidos = sum(n for f, (n, _) in decisiones.items() if f != "(cascada)")
+        aciertos = sum(a for f, (_, a) in decisiones.items() if f != "(cascada)")
+        total = sum(n for n, _ in decisiones.values())
+        lineas += ["", f"Eligió estrategia en {n_elegidos}/{total} programas; acertó en {aciertos}"
+                       f" ({aciertos / n_elegidos:.0%})." if n_elegidos else f"Sin certeza en los {total} programas."]
+    escribir_si_cambia(RAIZ / "data" / "extraccion" / "_reporte.md", "\n".join(lineas))
+    escribir_si_cambia(ruta_lock, json.dumps(lock, ensure_ascii=False, indent=1, sort_keys=True))
+    escribir_si_cambia(ruta_escaneados, json.dumps(escaneados, ensure_ascii=False, indent=1, sort_keys=True))
+    if diario:
+        diario.cerrar()  # corrida completa: el reporte y el lock ya tienen todo
 
     print("\n" + "=" * 50)
     for k, v in sorted(resumen.items()):
         print(f"  {k}: {v}")
-    print(f"Reporte completo: data/extraccion/_reporte.md")
+    print(f"Archivos reescritos: {escritos}")
+    if escaneados:
+        print(f"🖼  {len(escaneados)} PDFs escaneados en la cola de OCR: data/extraccion/_escaneados.json")
+    lentos = sorted((f for f in metricas if "parseo_s" in f), key=lambda f: f["texto_s"] + f["parseo_s"], reverse=True)
+    for f in lentos[:5]:
+        print(f"  ⏱  {f['slug']}: texto {f['texto_s']:.2f}s ({f['texto_origen']}), parseo {f['parseo_s']:.2f}s ({f['estrategia']})")
+    print(f"Reporte completo: data/extraccion/_reporte.md  (métricas: data/extraccion/_metricas.json)")
+
+    if perfil:
+        perfil.disable()
+        stats = pstats.Stats(perfil)
+        if dir_perfiles:
+            for prof in sorted(Path(dir_perfiles).glob("*.prof")):
+                stats.add(str(prof))
+            shutil.rmtree(dir_perfiles, ignore_errors=True)
+        stats.dump_stats(args.perfil)
+        print(f"Perfil: {args.perfil}  (snakeviz {args.perfil})")
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--filtro", default="", help="Procesar solo programas cuyo nombre contenga este texto")
+    ap.add_argument("--limite", type=int, default=0, help="Procesar máximo N programas")
+    ap.add_argument("--solo-parsear", action="store_true", help="No descargar; re-parsear PDFs ya locales")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Saltar programas cuyo manifiesto, PDF y versión de parser no cambiaron (según _lock.json)")
+    ap.add_argument("--sin-cache", action="store_true", help="Ignorar la caché de texto extraído")
+    ap.add_argument("--perezoso", action="store_true",
+                    help="Extraer solo las páginas que necesita el parser (PDFs largos); mismo resultado")
+    ap.add_argument("--memoria", action="store_true",
+                    help="Medir el pico de memoria de extracción+parseo de cada documento (más lento)")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Procesos para extraer/parsear en paralelo (0 = todos los núcleos)")
+    ap.add_argument("--en-vuelo", type=int, default=0,
+                    help="Máximo de documentos pendientes a la vez (default: 2 × workers)")
+    ap.add_argument("--descargas", type=int, default=8, help="Descargas simultáneas (hilos)")
+    ap.add_argument("--por-host", type=int, default=4, help="Máximo de conexiones simultáneas por host")
+    ap.add_argument("--reintentos", type=int, default=3, help="Reintentos por PDF ante fallas de red/5xx")
+    ap.add_argument("--sin-prechequeo", action="store_true",
+                    help="No detectar PDFs escaneados antes de extraer el texto (se extraen completos)")
+    ap.add_argument("--verificar", action="store_true",
+                    help="Recalcular el SHA-256 de los PDFs ya bajados y volver a bajar los que no coinciden")
+    ap.add_argument("--perfil", nargs="?", const=str(RAIZ / "data" / "extraccion" / "_perfil.prof"), default="",
+                    help="Guardar un perfil cProfile de la corrida (pstats; snakeviz/flameprof/gprof2dot)")
+    ap.add_argument("--backend", choices=["auto", *BACKENDS], default=None,
+                    help="Extractor de texto para todos los programas; 'auto' = el elegido por --comparar-backends "
+                         "(default: el campo 'backend' del manifiesto, o pypdf2)")
+    ap.add_argument("--comparar-backends", action="store_true",
+                    help="Medir cada backend instalado sobre los PDFs locales (tiempo/página y calidad) y elegir uno por programa")
+    ap.add_argument("--limite-s", type=float, default=300,
+                    help="Tiempo máximo por documento; cada uno corre en su propio proceso y se mata al pasarse "
+                         "(0 = sin límite ni aislamiento)")
+    ap.add_argument("--desde-cero", action="store_true",
+                    help="No reanudar la corrida interrumpida de _diario.jsonl; empezar una nueva")
+    ap.add_argument("--vigilar", action="store_true",
+                    help="Quedarse corriendo: re-procesar los programas cuyo PDF o entrada del manifiesto cambie "
+                         "y atender el socket local")
+    ap.add_argument("--intervalo", type=float, default=0.25, help="Segundos entre revisiones en --vigilar")
+    ap.add_argument("--socket", default=str(RUTA_SOCKET),
+                    help="Socket Unix del modo --vigilar para analizar un PDF suelto ('' = sin socket)")
+    ap.add_argument("--limite-mb", type=int, default=0,
+                    help="Memoria máxima por documento, en MB (espacio de direcciones, solo Unix); como --limite-s, "
+                         "cada documento corre en su propio proceso (0 = sin límite)")
+    args = ap.parse_args(argv)
+    if args.vigilar:
+        vigilar(args)
+    else:
+        correr(args)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,9 @@
-import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import RUTA_CATALOGO  # noqa: E402
+from modelo import ErrorModelo, guardar_catalogo, programas_desde_json  # noqa: E402
 
 # ==========================================
 # CATÁLOGO OFICIAL MCCEMS - PROGRESIONES REALES
@@ -310,8 +315,11 @@ catalogo.append({
     ]
 })
 
-# Guardar archivo oficial
-with open("data/programas_sep.json", "w", encoding="utf-8") as f:
-    json.dump(catalogo, f, ensure_ascii=False, indent=2)
+# Validar contra el modelo y guardar archivo oficial
+try:
+    programas = programas_desde_json(catalogo, "generar_oficial")
+except ErrorModelo as e:
+    sys.exit(f"❌ {e}")
+guardar_catalogo(programas, RUTA_CATALOGO)
 
 print(f"✅ Catálogo OFICIAL generado: {len(catalogo)} materias completas.")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Índice invertido BM25 sobre las extracciones DGB (data/extraccion/json/*.json):
+propósito, progresiones, metas de aprendizaje y contenidos, sin distinguir
+acentos ni mayúsculas (misma normalización que catalogo.normalizar()).
+
+Cada propósito / progresión / meta / contenido es un documento. Los pesos BM25
+de cada (término, documento) se calculan al construir, así que una consulta
+solo suma pesos de las listas de sus términos: submilisegundo en el corpus
+completo.
+
+Salidas:
+  data/extraccion/_busqueda.json.gz   (índice persistido)
+
+Uso:
+  python3 scripts/indice_busqueda.py --construir
+  python3 scripts/indice_busqueda.py "probabilidad condicional"
+  python3 scripts/indice_busqueda.py "huella digital" -k 5 --campo progresion
+
+Desde Python:
+  from indice_busqueda import IndiceBusqueda
+  indice = IndiceBusqueda.cargar()
+  indice.buscar("probabilidad condicional", k=10)
+"""
+
+import argparse
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import DIR_EXTRACCION, RAIZ, cargar_extracciones, normalizar  # noqa: E402
+
+RUTA_INDICE = RAIZ / "data" / "extraccion" / "_busqueda.json.gz"
+VERSION_INDICE = 1
+K1, B = 1.2, 0.75
+
+# Palabras vacías del español (ya normalizadas: sin acentos)
+VACIAS = frozenset("""
+a al algo como con cual cuales de del desde donde el ella ellas ellos en entre era es esta estan este esto
+estos ha han hay la las le les lo los mas mediante o para pero por que se segun ser si sin sobre son su sus
+tambien u un una uno unos unas y ya
+""".split())
+
+CAMPOS = ("proposito", "progresion", "meta", "contenido")
+
+
+def tokenizar(texto: str) -> list[str]:
+    return [t for t in normalizar(texto).split() if len(t) > 1 and t not in VACIAS]
+
+
+def huella_fuentes(directorio: Path = DIR_EXTRACCION) -> str:
+    h = hashlib.sha256()
+    for f in sorted(directorio.glob("*.json")):
+        h.update(f.name.encode())
+        h.update(hashlib.sha256(f.read_bytes()).digest())
+    return h.hexdigest()
+
+
+class IndiceBusqueda:
+    """
+    docs[i] = (slug, nombre, campo, id, texto)
+    terminos[t] = (ids de documento, pesos BM25), ya ordenadas por id
+    """
+
+    def __init__(self, docs: list, terminos: dict, fuentes: str = ""):
+        self.docs = docs
+        self.terminos = terminos
+        self.fuentes = fuentes
+
+    @classmethod
+    def construir(cls, extracciones: list[dict], fuentes: str = "") -> "IndiceBusqueda":
+        docs = []
+        for e in extracciones:
+            piezas = [("proposito", None, e.get("proposito") or "")]
+            piezas += [("progresion", p.get("id"), p["descripcion"]) for p in e.get("progresiones") or []]
+            piezas += [("meta", i, m) for i, m in enumerate(e.get("metas_aprendizaje") or [], 1)]
+            piezas += [("contenido", i, c) for i, c in enumerate(e.get("contenidos") or [], 1)]
+            docs += [(e["slug"], e["nombre"], campo, ident, texto) for campo, ident, texto in piezas if texto.strip()]
+
+        frecuencias: dict[str, dict[int, int]] = {}
+        largos = []
+        for i, doc in enumerate(docs):
+            tokens = tokenizar(doc[4])
+            largos.append(len(tokens))
+            for t in tokens:
+                por_doc = frecuencias.setdefault(t, {})
+                por_doc[i] = por_doc.get(i, 0) + 1
+
+        n = len(docs)
+        promedio = sum(largos) / n if n else 0.0
+        terminos = {}
+        for t, por_doc in frecuencias.items():
+            idf = math.log(1 + (n - len(por_doc) + 0.5) / (len(por_doc) + 0.5))
+            ids = sorted(por_doc)
+            pesos = [round(idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * largos[i] / promedio)), 4)
+                     for i in ids for tf in (por_doc[i],)]
+            terminos[t] = (ids, pesos)
+        return cls(docs, terminos, fuentes)
+
+    def guardar(self, ruta: Path = RUTA_INDICE):
+        datos = json.dumps({"version": VERSION_INDICE, "fuentes": self.fuentes,
+                            "docs": self.docs, "terminos": self.terminos},
+                           ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(gzip.compress(datos, compresslevel=6))
+        os.replace(tmp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_INDICE) -> "IndiceBusqueda":
+        datos = json.loads(gzip.decompress(ruta.read_bytes()))
+        if datos.get("version") != VERSION_INDICE:
+            raise ValueError(f"{ruta}: índice versión {datos.get('version')}, se esperaba {VERSION_INDICE}; reconstruir")
+        return cls(datos["docs"], datos["terminos"], datos.get("fuentes", ""))
+
+    def buscar(self, consulta: str, k: int = 10, campos: tuple[str, ...] | None = None) -> list[dict]:
+        puntajes: dict[int, float] = {}
+        for t in set(tokenizar(consulta)):
+            lista = self.terminos.get(t)
+            if lista is None:
+                continue
+            for i, peso in zip(*lista):
+                puntajes[i] = puntajes.get(i, 0.0) + peso
+        if campos:
+            puntajes = {i: s for i, s in puntajes.items() if self.docs[i][2] in campos}
+        mejores = heapq.nlargest(k, puntajes.items(), key=lambda par: par[1])
+        return [{"puntaje": round(s, 3), "slug": self.docs[i][0], "nombre": self.docs[i][1],
+                 "campo": self.docs[i][2], "id": self.docs[i][3], "texto": self.docs[i][4]}
+                for i, s in mejores]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("consulta", nargs="?", default="")
+    ap.add_argument("-k", type=int, default=10, help="Número de resultados")
+    ap.add_argument("--campo", action="append", choices=CAMPOS, help="Limitar a estos campos (repetible)")
+    ap.add_argument("--construir", action="store_true", help="Reconstruir el índice aunque esté al día")
+    ap.add_argument("--indice", default=str(RUTA_INDICE))
+    ap.add_argument("--extracciones", default=str(DIR_EXTRACCION))
+    args = ap.parse_args()
+
+    ruta, dir_ext = Path(args.indice), Path(args.extracciones)
+    fuentes = huella_fuentes(dir_ext)
+    indice = None
+    if ruta.exists() and not args.construir:
+        try:
+            indice = IndiceBusqueda.cargar(ruta)
+        except ValueError as e:
+            print(f"⚠️  {e}")
+        if indice and indice.fuentes != fuentes:
+            print("ℹ️  Las extracciones cambiaron: reconstruyendo el índice")
+            indice = None
+    if indice is None:
+        t0 = time.perf_counter()
+        indice = IndiceBusqueda.construir(cargar_extracciones(dir_ext), fuentes)
+        indice.guardar(ruta)
+        print(f"💾 {ruta}  ({len(indice.docs)} documentos, {len(indice.terminos)} términos) "
+              f"en {time.perf_counter() - t0:.2f}s")
+
+    if not args.consulta:
+        return
+    t0 = time.perf_counter()
+    resultados = indice.buscar(args.consulta, args.k, tuple(args.campo) if args.campo else None)
+    ms = (time.perf_counter() - t0) * 1000
+    for r in resultados:
+        ident = f" #{r['id']}" if r["id"] is not None else ""
+        print(f"  {r['puntaje']:6.2f}  {r['nombre']} [{r['campo']}{ident}]  {r['texto'][:110]}")
+    print(f"🔎 {len(resultados)} resultados en {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
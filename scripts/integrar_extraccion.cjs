@@ -8,19 +8,29 @@
  *  - Al integrar: reemplaza progresiones/metas/propósito, marca estado "oficial",
  *    corrige modelo según la generación oficial (2023-2026 → "2024",
  *    2025-2028 → "2025") y actualiza url_fuente/fecha.
- *  - NO agrega materias nuevas (los no emparejados se listan para revisión).
- *  - Respaldo automático del catálogo antes de escribir.
+ *  - NO agrega materias nuevas (los no emparejados se listan para revisión,
+ *    con la sugerencia de scripts/emparejar_catalogo.py si existe
+ *    data/extraccion/_emparejamiento.json). Con --difuso también integra los
+ *    no emparejados cuya sugerencia tiene confianza "alta", pero solo en la
+ *    entrada sugerida (misma materia, semestre y modelo) y sin cambiarle el
+ *    modelo.
+ *  - Versiona el catálogo antes y después de escribir (deltas en
+ *    data/versiones_catalogo/, ver scripts/versiones_catalogo.py); sin Python,
+ *    respaldo completo como antes.
  *
- * Uso: node scripts/integrar_extraccion.cjs [--dry]
+ * Uso: node scripts/integrar_extraccion.cjs [--dry] [--difuso]
  */
 
 const fs = require('fs');
 const path = require('path');
+const { execFileSync } = require('child_process');
 
 const RAIZ = path.join(__dirname, '..');
 const RUTA_CATALOGO = path.join(RAIZ, 'data', 'programas_sep.json');
 const DIR_EXTRACCION = path.join(RAIZ, 'data', 'extraccion', 'json');
+const RUTA_EMPAREJAMIENTO = path.join(RAIZ, 'data', 'extraccion', '_emparejamiento.json');
 const DRY = process.argv.includes('--dry');
+const DIFUSO = process.argv.includes('--difuso');
 
 const normalizar = (s) => s
     .toLowerCase()
@@ -43,6 +53,11 @@ catalogo.forEach((p, i) => {
     indice.get(key).push(i);
 });
 
+// Sugerencias de scripts/emparejar_catalogo.py (opcional)
+const emparejamientos = fs.existsSync(RUTA_EMPAREJAMIENTO)
+    ? JSON.parse(fs.readFileSync(RUTA_EMPAREJAMIENTO, 'utf8')).emparejamientos
+    : {};
+
 const archivos = fs.readdirSync(DIR_EXTRACCION).filter(f => f.endsWith('.json'));
 let integrados = 0;
 const sinMatch = [];
@@ -60,10 +75,22 @@ for (const archivo of archivos) {
     // El nombre del manifiesto puede traer sufijos aclaratorios: "(área)", "(progresiones)"
     let key = normalizar(ext.nombre.replace(/\((área|progresiones)\)/gi, ''));
     key = ALIAS[key] || key;
-    const posiciones = indice.get(key);
+    let posiciones = indice.get(key);
+    const sugerencia = emparejamientos[ext.slug]?.candidatos?.[0];
+    const confianza = emparejamientos[ext.slug]?.confianza;
+    const difuso = !posiciones && DIFUSO && confianza === 'alta';
 
-    if (!posiciones) {
-        sinMatch.push(`${ext.nombre} [${ext.generacion}/${ext.componente}] → ${ext.progresiones.length} prog listas en data/extraccion/`);
+    if (difuso) {
+        // Solo la entrada que eligió el emparejador, no las homónimas de otros semestres/generaciones
+        posiciones = (indice.get(normalizar(sugerencia.materia)) || []).filter(i =>
+            catalogo[i].semestre === sugerencia.semestre && (catalogo[i].modelo ?? null) === sugerencia.modelo);
+        if (posiciones.length) {
+            console.log(`≈ ${ext.nombre} → ${sugerencia.materia} (S${sugerencia.semestre}, ${sugerencia.modelo}; puntaje ${sugerencia.puntaje})`);
+        }
+    }
+    if (!posiciones?.length) {
+        const pista = sugerencia ? ` (¿${sugerencia.materia}? ${confianza} ${sugerencia.puntaje})` : '';
+        sinMatch.push(`${ext.nombre} [${ext.generacion}/${ext.componente}] → ${ext.progresiones.length} prog listas en data/extraccion/${pista}`);
         continue;
     }
 
@@ -82,8 +109,8 @@ for (const archivo of archivos) {
                 metas: ext.metas_aprendizaje || [],
                 tematicas: ext.contenidos?.slice(0, 6) || []
             })),
-            // La generación oficial manda sobre la heurística anterior
-            modelo: ext.generacion === '2025-2028' ? '2025' : '2024',
+            // La generación oficial manda sobre la heurística anterior (salvo en un emparejamiento difuso)
+            modelo: difuso ? prev.modelo : ext.generacion === '2025-2028' ? '2025' : '2024',
             estado: 'oficial',
             url_fuente: ext.url,
             fecha_extraccion: new Date().toISOString(),
@@ -101,11 +128,28 @@ sinMatch.forEach(s => console.log('  · ' + s));
 console.log(`\nDescartados por calidad insuficiente (${descartados.length}):`);
 descartados.forEach(s => console.log('  · ' + s));
 
+// Registra el catálogo en disco como versión (delta); false si no hay Python
+const versionar = (mensaje) => {
+    try {
+        execFileSync('python3', [path.join(__dirname, 'versiones_catalogo.py'), '--registrar', '-m', mensaje],
+            { stdio: 'inherit' });
+        return true;
+    } catch (e) {
+        console.warn(`⚠️  No se pudo versionar el catálogo (${e.message.split('\n')[0]})`);
+        return false;
+    }
+};
+
 if (!DRY && integrados > 0) {
-    const respaldo = RUTA_CATALOGO.replace('.json', `.backup-integracion-${new Date().toISOString().slice(0, 10)}.json`);
-    fs.copyFileSync(RUTA_CATALOGO, respaldo);
+    let respaldo = 'data/versiones_catalogo/';
+    if (!versionar('antes de integrar_extraccion')) {
+        respaldo = RUTA_CATALOGO.replace('.json', `.backup-integracion-${new Date().toISOString().slice(0, 10)}.json`);
+        fs.copyFileSync(RUTA_CATALOGO, respaldo);
+        respaldo = path.basename(respaldo);
+    }
     fs.writeFileSync(RUTA_CATALOGO, JSON.stringify(catalogo, null, 2));
-    console.log(`\n💾 Catálogo actualizado (respaldo: ${path.basename(respaldo)})`);
+    versionar(`integrar_extraccion: ${integrados} programas`);
+    console.log(`\n💾 Catálogo actualizado (respaldo: ${respaldo})`);
 } else {
     console.log('\n(dry-run: no se escribió nada)');
 }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Modelo de datos del catálogo (data/programas_sep.json) compartido por
+generar_oficial.py, extractor_mccems.py y extraer_progresiones.py.
+
+  Programa     una materia de un semestre (materia, semestre, metadata,
+               organizador curricular, progresiones, fuente y etiquetas)
+  Progresion   id, descripcion, metas (opcionales) y temáticas
+  Meta         texto de una meta con la progresión a la que pertenece
+               (None = meta del programa); ver Programa.metas()
+
+Todas son dataclasses con __slots__. Las listas de texto se guardan como
+tuplas y las que se repiten dentro del catálogo (p. ej. las metas del programa
+copiadas en cada progresión por integrar_extraccion.cjs) son el mismo objeto.
+
+desde_dict() valida tipos y campos obligatorios y lanza ErrorModelo con la
+ruta del dato inválido; a_dict() devuelve la forma JSON del catálogo (la que
+espera src/services/programasSEPService.ts). Las claves que el modelo no
+conoce se conservan tal cual: las de primer nivel (orientaciones_didacticas,
+bibliografia, ...) en Programa.extra y las de organizador_curricular
+(subcategorias, ...) en Programa.organizador_extra.
+
+Las rutas y la lectura del JSON son las de catalogo.py; este módulo solo
+convierte esos dicts en objetos del modelo (cargar_programas) y escribe el
+catálogo (guardar_catalogo).
+
+Uso:
+  from modelo import Programa, Progresion, cargar_programas, guardar_catalogo
+  programas = cargar_programas()
+  guardar_catalogo(programas, Path("/tmp/programas_sep.json"))
+
+  python3 scripts/modelo.py                  # valida data/programas_sep.json
+  python3 scripts/modelo.py otro_catalogo.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import RUTA_CATALOGO, cargar_catalogo  # noqa: E402
+
+MODELOS = ("2024", "2025")
+ESTADOS = ("oficial", "borrador")
+
+
+class ErrorModelo(ValueError):
+    """Dato del catálogo con tipo o forma inválidos; el mensaje incluye su ruta."""
+
+
+def _texto(valor, ruta: str, vacio: bool = False) -> str:
+    if not isinstance(valor, str) or (not vacio and not valor.strip()):
+        raise ErrorModelo(f"{ruta}: se esperaba texto{'' if vacio else ' no vacío'}, hay {valor!r:.60}")
+    return valor
+
+
+def _entero(valor, ruta: str) -> int:
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise ErrorModelo(f"{ruta}: se esperaba un entero, hay {valor!r:.60}")
+    return valor
+
+
+def _textos(valor, ruta: str, compartidas: dict | None) -> tuple[str, ...] | None:
+    """Lista de textos → tupla (None si falta). Con `compartidas`, tuplas iguales son el mismo objeto."""
+    if valor is None:
+        return None
+    if not isinstance(valor, list) or not all(isinstance(t, str) for t in valor):
+        raise ErrorModelo(f"{ruta}: se esperaba una lista de textos, hay {valor!r:.60}")
+    tupla = tuple(valor)
+    return tupla if compartidas is None else compartidas.setdefault(tupla, tupla)
+
+
+def _opcion(valor, ruta: str, opciones: tuple[str, ...]) -> str | None:
+    if valor is not None and valor not in opciones:
+        raise ErrorModelo(f"{ruta}: {valor!r} no es uno de {'/'.join(opciones)}")
+    return valor
+
+
+@dataclass(slots=True, frozen=True)
+class Meta:
+    texto: str
+    progresion: int | None = None
+
+
+@dataclass(slots=True)
+class Progresion:
+    id: int
+    descripcion: str
+    metas: tuple[str, ...] | None = None
+    tematicas: tuple[str, ...] | None = None
+
+    @classmethod
+    def desde_dict(cls, d: dict, ruta: str = "progresion", compartidas: dict | None = None) -> "Progresion":
+        if not isinstance(d, dict):
+            raise ErrorModelo(f"{ruta}: se esperaba un objeto, hay {d!r:.60}")
+        return cls(_entero(d.get("id"), f"{ruta}.id"),
+                   _texto(d.get("descripcion"), f"{ruta}.descripcion"),
+                   _textos(d.get("metas"), f"{ruta}.metas", compartidas),
+                   _textos(d.get("tematicas"), f"{ruta}.tematicas", compartidas))
+
+    def a_dict(self) -> dict:
+        d = {"id": self.id, "descripcion": self.descripcion}
+        if self.metas is not None:
+            d["metas"] = list(self.metas)
+        if self.tematicas is not None:
+            d["tematicas"] = list(self.tematicas)
+        return d
+
+
+@dataclass(slots=True)
+class Programa:
+    materia: str
+    semestre: int
+    metadata: dict = field(default_factory=dict)
+    progresiones: tuple[Progresion, ...] = ()
+    # organizador_curricular (None en todos = el programa no lo trae)
+    categorias: tuple[str, ...] | None = None
+    metas_aprendizaje: tuple[str, ...] | None = None
+    propositos_formativos: tuple[str, ...] | None = None
+    url_fuente: str | None = None
+    fecha_extraccion: str | None = None
+    modelo: str | None = None
+    estado: str | None = None
+    extraccion: str | None = None
+    extra: dict = field(default_factory=dict)
+    organizador_extra: dict = field(default_factory=dict)
+
+    CLAVES = ("materia", "semestre", "metadata", "organizador_curricular", "progresiones",
+              "url_fuente", "fecha_extraccion", "modelo", "estado", "extraccion")
+    CLAVES_ORGANIZADOR = ("categorias", "metas_aprendizaje", "propositos_formativos")
+
+    @classmethod
+    def desde_dict(cls, d: dict, ruta: str = "programa", compartidas: dict | None = None) -> "Programa":
+        if not isinstance(d, dict):
+            raise ErrorModelo(f"{ruta}: se esperaba un objeto, hay {d!r:.60}")
+        semestre = _entero(d.get("semestre"), f"{ruta}.semestre")
+        if not 1 <= semestre <= 6:
+            raise ErrorModelo(f"{ruta}.semestre: {semestre} fuera de 1..6")
+        metadata = d.get("metadata", {})
+        if not isinstance(metadata, dict):
+            raise ErrorModelo(f"{ruta}.metadata: se esperaba un objeto, hay {metadata!r:.60}")
+        org = d.get("organizador_curricular", {})
+        if not isinstance(org, dict):
+            raise ErrorModelo(f"{ruta}.organizador_curricular: se esperaba un objeto, hay {org!r:.80}")
+        progresiones = d.get("progresiones")
+        if not isinstance(progresiones, list):
+            raise ErrorModelo(f"{ruta}.progresiones: se esperaba una lista, hay {progresiones!r:.60}")
+        opcionales = {k: d.get(k) for k in ("url_fuente", "fecha_extraccion", "extraccion")}
+        for k, v in opcionales.items():
+            if v is not None:
+                _texto(v, f"{ruta}.{k}", vacio=True)
+        return cls(
+            materia=_texto(d.get("materia"), f"{ruta}.materia"),
+            semestre=semestre,
+            metadata=metadata,
+            # primero las del programa: las progresiones que las copian reutilizan la misma tupla
+            metas_aprendizaje=_textos(org.get("metas_aprendizaje"), f"{ruta}.organizador_curricular.metas_aprendizaje",
+                                      compartidas),
+            categorias=_textos(org.get("categorias"), f"{ruta}.organizador_curricular.categorias", compartidas),
+            propositos_formativos=_textos(org.get("propositos_formativos"),
+                                          f"{ruta}.organizador_curricular.propositos_formativos", compartidas),
+            progresiones=tuple(Progresion.desde_dict(p, f"{ruta}.progresiones[{i}]", compartidas)
+                               for i, p in enumerate(progresiones)),
+            modelo=_opcion(d.get("modelo"), f"{ruta}.modelo", MODELOS),
+            estado=_opcion(d.get("estado"), f"{ruta}.estado", ESTADOS),
+            extra={k: v for k, v in d.items() if k not in cls.CLAVES},
+            organizador_extra={k: v for k, v in org.items() if k not in cls.CLAVES_ORGANIZADOR},
+            **opcionales,
+        )
+
+    def a_dict(self) -> dict:
+        d = {"materia": self.materia, "semestre": self.semestre, "metadata": self.metadata}
+        org = {k: list(v) for k in self.CLAVES_ORGANIZADOR if (v := getattr(self, k)) is not None}
+        org.update(self.organizador_extra)
+        if org:
+            d["organizador_curricular"] = org
+        d["progresiones"] = [p.a_dict() for p in self.progresiones]
+        d.update(self.extra)
+        for k in ("fecha_extraccion", "url_fuente", "modelo", "estado", "extraccion"):
+            if (v := getattr(self, k)) is not None:
+                d[k] = v
+        return d
+
+    def metas(self) -> Iterator[Meta]:
+        """Metas del programa y luego las de cada progresión, sin repetir las copiadas del programa."""
+        propias = self.metas_aprendizaje or ()
+        yield from (Meta(t) for t in propias)
+        for p in self.progresiones:
+            if p.metas and p.metas != propias:
+                yield from (Meta(t, p.id) for t in p.metas)
+
+
+def programas_desde_json(datos: list, origen: str = "catalogo") -> list[Programa]:
+    if not isinstance(datos, list):
+        raise ErrorModelo(f"{origen}: se esperaba una lista de programas")
+    compartidas: dict = {}
+    return [Programa.desde_dict(d, f"{origen}[{i}]", compartidas) for i, d in enumerate(datos)]
+
+
+def cargar_programas(ruta: Path = RUTA_CATALOGO) -> list[Programa]:
+    return programas_desde_json(cargar_catalogo(ruta), ruta.name)
+
+
+def guardar_catalogo(programas: list[Programa], ruta: Path = RUTA_CATALOGO, indent: int | None = 2):
+    """Escribe el catálogo (temporal + rename: la app nunca lee uno a medias)."""
+    texto = json.dumps([p.a_dict() for p in programas], ensure_ascii=False, indent=indent)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    tmp.write_text(texto, encoding="utf-8")
+    os.replace(tmp, ruta)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("catalogo", nargs="?", default=str(RUTA_CATALOGO))
+    args = ap.parse_args()
+
+    ruta = Path(args.catalogo)
+    t0 = time.perf_counter()
+    try:
+        programas = cargar_programas(ruta)
+    except ErrorModelo as e:
+        print(f"❌ {e}")
+        return 1
+    ms = (time.perf_counter() - t0) * 1000
+    n_prog = sum(len(p.progresiones) for p in programas)
+    print(f"✅ {ruta.name}: {len(programas)} programas, {n_prog} progresiones válidos ({ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
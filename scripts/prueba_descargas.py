@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Prueba de PoolConexiones y descargar() contra un servidor HTTP local (sin
+red): un PDF de más de 10 KB servido con ETag y soporte de Range/If-Range.
+
+  1. dos descargas seguidas por el mismo pool usan UNA sola conexión (keep-alive)
+  2. una transferencia cortada a la mitad se reanuda con Range + If-Range
+     y el PDF final es idéntico al original (SHA-256 incluido)
+  3. si el PDF cambió entre el corte y el reintento (otro ETag), el servidor
+     responde 200 y la descarga empieza de cero
+
+Uso:
+  python3 scripts/prueba_descargas.py
+"""
+
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from extraer_progresiones import PoolConexiones, descargar, leer_registro  # noqa: E402
+
+fallos = 0
+
+
+def comprobar(nombre: str, condicion: bool, detalle: str = ""):
+    global fallos
+    if condicion:
+        print(f"  ✅ {nombre}")
+    else:
+        print(f"  ❌ {nombre} {detalle}")
+        fallos += 1
+
+
+def pdf_falso(semilla: bytes, kb: int = 200) -> bytes:
+    cuerpo = b"".join(hashlib.sha256(semilla + str(i).encode()).digest() for i in range(kb * 32))
+    return b"%PDF-1.4\n" + cuerpo + b"\n%%EOF\n"
+
+
+class Servidor(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), AtenderPDF)
+        self.contenido = pdf_falso(b"v1")
+        self.etag = '"v1"'
+        self.cortar = False        # la siguiente respuesta completa se corta a la mitad
+        self.conexiones = 0
+        self.peticiones: list[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class AtenderPDF(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.conexiones += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        s = self.server
+        s.peticiones.append({"ruta": self.path, "range": self.headers.get("Range"),
+                             "if_range": self.headers.get("If-Range")})
+        contenido, desde = s.contenido, 0
+        rango = self.headers.get("Range")
+        # If-Range que no coincide con el ETag actual: se ignora el Range (200 completo)
+        if rango and self.headers.get("If-Range") in (None, s.etag):
+            desde = int(rango.removeprefix("bytes=").split("-")[0])
+        if desde:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {desde}-{len(contenido) - 1}/{len(contenido)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", s.etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(contenido) - desde))
+        self.end_headers()
+        if s.cortar and not desde:
+            s.cortar = False
+            self.wfile.write(contenido[:len(contenido) // 2])
+            self.wfile.flush()
+            self.close_connection = True  # el cliente ve la conexión cerrada a media transferencia
+            return
+        self.wfile.write(contenido[desde:])
+
+
+print("\nDescargas con keep-alive y reanudación\n")
+
+servidor = Servidor()
+threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+with tempfile.TemporaryDirectory() as tmp:
+    dir_pdfs = Path(tmp)
+
+    # 1. Keep-alive: dos PDFs por el mismo pool, una conexión
+    pool = PoolConexiones(por_host=1)
+    a = descargar(f"{servidor.url}/a.pdf", dir_pdfs / "a.pdf", pool, espera=0)
+    b = descargar(f"{servidor.url}/b.pdf", dir_pdfs / "b.pdf", pool, espera=0)
+    comprobar("las dos descargas terminan", a.startswith("descargado") and b.startswith("descargado"), f"({a}; {b})")
+    comprobar("la conexión se reutiliza", servidor.conexiones == 1, f"(abrió {servidor.conexiones})")
+    pool.cerrar()
+
+    # 2. Corte a la mitad: el reintento pide solo lo que falta
+    servidor.peticiones.clear()
+    servidor.cortar = True
+    destino = dir_pdfs / "c.pdf"
+    estado = descargar(f"{servidor.url}/c.pdf", destino, PoolConexiones(por_host=1), espera=0)
+    reintento = servidor.peticiones[-1]
+    comprobar("la descarga cortada se reanuda", "reanudada" in estado, f"({estado})")
+    comprobar("el reintento usa Range + If-Range con el ETag",
+              bool(reintento["range"]) and reintento["range"] != "bytes=0-" and reintento["if_range"] == '"v1"',
+              f"({reintento})")
+    comprobar("el PDF reanudado es idéntico al original", destino.read_bytes() == servidor.contenido)
+    registro = leer_registro(destino) or {}
+    comprobar("el SHA-256 registrado es el del PDF completo",
+              registro.get("sha256") == hashlib.sha256(servidor.contenido).hexdigest())
+    comprobar("no quedan .part ni su validador",
+              not any(f.name.endswith((".part", ".part.json")) for f in dir_pdfs.iterdir()))
+
+    # 3. El PDF cambia entre el corte y el reintento: If-Range no coincide, se baja completo
+    servidor.peticiones.clear()
+    servidor.cortar = True
+    destino = dir_pdfs / "d.pdf"
+    ya_pidio = threading.Event()
+
+    class PoolQueCambia(PoolConexiones):
+        """Cambia el PDF del servidor justo antes del reintento."""
+
+        def abrir(self, url, encabezados=None, max_redirecciones=5):
+            if ya_pidio.is_set():
+                servidor.contenido, servidor.etag = pdf_falso(b"v2"), '"v2"'
+            ya_pidio.set()
+            return super().abrir(url, encabezados, max_redirecciones)
+
+    estado = descargar(f"{servidor.url}/d.pdf", destino, PoolQueCambia(por_host=1), espera=0)
+    reintento = servidor.peticiones[-1]
+    comprobar("el reintento manda el validador viejo", reintento["if_range"] == '"v1"', f"({reintento})")
+    comprobar("con otro validador empieza de cero", estado.startswith("descargado") and "reanudada" not in estado,
+              f"({estado})")
+    comprobar("el PDF es el nuevo, completo", destino.read_bytes() == servidor.contenido
+              and os.path.getsize(destino) == len(pdf_falso(b"v2")))
+    registro = leer_registro(destino) or {}
+    comprobar("el SHA-256 registrado es el del PDF nuevo",
+              registro.get("sha256") == hashlib.sha256(servidor.contenido).hexdigest())
+
+servidor.shutdown()
+print(f"\n{'✅ Todo bien' if not fallos else f'❌ {fallos} fallo(s)'}\n")
+sys.exit(1 if fallos else 0)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Prueba de la limpieza de exportar_shards.py: el escenario real es exportar con
+--salida apuntando a un directorio que ya tiene otros archivos (data/, public/).
+La limpieza solo debe borrar shards de exportaciones anteriores, nunca lo ajeno.
+
+Uso:
+  python3 scripts/prueba_exportar_shards.py
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent / "exportar_shards.py"
+
+fallos = 0
+
+
+def comprobar(nombre: str, condicion: bool, detalle: str = ""):
+    global fallos
+    if condicion:
+        print(f"  ✅ {nombre}")
+    else:
+        print(f"  ❌ {nombre} {detalle}")
+        fallos += 1
+
+
+def exportar(catalogo: Path, salida: Path, *extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(SCRIPT), "--catalogo", str(catalogo), "--salida", str(salida), *extra],
+                          capture_output=True, text=True)
+
+
+def programa(materia: str, semestre: int, progresiones: int) -> dict:
+    return {"materia": materia, "semestre": semestre, "modelo": "2024", "estado": "oficial",
+            "progresiones": [{"id": i + 1, "descripcion": f"Progresión {i + 1}"} for i in range(progresiones)]}
+
+
+print("\nLimpieza de exportar_shards.py\n")
+
+with tempfile.TemporaryDirectory() as tmp:
+    salida = Path(tmp)
+    # --salida data: el catálogo y otros JSON viven en el mismo directorio que los shards
+    catalogo = salida / "programas_sep.json"
+    catalogo.write_text(json.dumps([programa("Inglés I", 1, 3), programa("Inglés II", 2, 2)]), encoding="utf-8")
+    ajenos = {
+        salida / "config.json": "{}",
+        salida / "notas.json.gz": "x",
+        salida / "semestre" / "apuntes.json": "{}",
+        salida / "materia" / "ingles-i.borrador.json": "{}",
+        salida / "extraccion" / "lista.abcdef012345.json": "[]",
+    }
+    for ruta, contenido in ajenos.items():
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(contenido, encoding="utf-8")
+
+    # 1. Primera exportación: no hay nada propio que borrar
+    r = exportar(catalogo, salida)
+    comprobar("la primera exportación termina bien", r.returncode == 0, r.stderr[-400:])
+    comprobar("el catálogo de origen sigue ahí", catalogo.exists())
+    perdidos = [str(p.relative_to(salida)) for p in ajenos if not p.exists()]
+    comprobar("no se borra ningún archivo ajeno", not perdidos, f"(borró {perdidos})")
+    primero = json.loads((salida / "manifiesto.json").read_text(encoding="utf-8"))["shards"]
+
+    # 2. Cambia una materia: su shard viejo (y su .gz) se borra, lo ajeno no
+    catalogo.write_text(json.dumps([programa("Inglés I", 1, 4), programa("Inglés II", 2, 2)]), encoding="utf-8")
+    r = exportar(catalogo, salida)
+    comprobar("la segunda exportación termina bien", r.returncode == 0, r.stderr[-400:])
+    viejo = salida / primero["materia/ingles-i"]["ruta"]
+    comprobar("el shard obsoleto se borra", not viejo.exists() and not viejo.with_name(viejo.name + ".gz").exists())
+    comprobar("el shard que no cambió se conserva", (salida / primero["materia/ingles-ii"]["ruta"]).exists())
+    perdidos = [str(p.relative_to(salida)) for p in ajenos if not p.exists()]
+    comprobar("siguen sin borrarse los archivos ajenos", not perdidos, f"(borró {perdidos})")
+
+    # 3. Shards sueltos con el esquema de nombres (p. ej. de un --conservar) también son propios
+    suelto = salida / "semestre" / "9.0123456789ab.json"
+    suelto.write_text("[]", encoding="utf-8")
+    exportar(catalogo, salida)
+    comprobar("un shard huérfano con el esquema de nombres se borra", not suelto.exists())
+
+print(f"\n{'✅ Todo bien' if not fallos else f'❌ {fallos} fallo(s)'}\n")
+sys.exit(1 if fallos else 0)
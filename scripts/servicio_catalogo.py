@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Servicio HTTP/JSON local de consulta del catálogo (data/programas_sep.json) y
+de las extracciones DGB (data/extraccion/json/*.json), para la app web y los
+scripts de administración: cargan una materia o un semestre sin leer y
+recorrer el catálogo completo cada vez.
+
+Carga todo una sola vez y arma índices en memoria (materia, semestre, modelo
+y estado del catálogo; generación, componente y calidad de las extracciones).
+Un filtro es la intersección de las listas de sus índices. Las respuestas
+renderizadas (JSON minificado, y su .gz si el cliente lo acepta) quedan en una
+caché LRU; cada una lleva ETag (el de la variante gzip termina en "-gz"), y un
+If-None-Match que coincide con el de la variante servida recibe 304 sin
+cuerpo. Si cambian los archivos fuente, se recargan y la caché se vacía.
+
+Rutas (solo GET/HEAD):
+  /salud                                    conteos, huella de las fuentes, aciertos de la caché
+  /programas?semestre=3&modelo=2025&estado=oficial&materia=<slug>
+                                            proyección para listas (slug, n_progresiones, ...)
+  /programas?...&campos=materia,progresiones  solo esos campos (campos=* = programas completos)
+  /programas/<slug>                         todas las entradas de una materia (admite los filtros)
+  /extracciones?generacion=2025-2028&componente=fundamental&calidad=BUENA&campos=...
+  /extracciones/<slug>                      una extracción completa
+
+Uso:
+  python3 scripts/servicio_catalogo.py                     # → http://127.0.0.1:8787
+  python3 scripts/servicio_catalogo.py --puerto 9000 --cache 512
+  curl -s 'http://127.0.0.1:8787/programas?semestre=3&modelo=2025'
+  python3 scripts/carga_servicio.py                        # prueba de carga (p50/p99)
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import sys
+import time
+import urllib.parse
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import DIR_EXTRACCION, RUTA_CATALOGO, cargar_catalogo, cargar_extracciones  # noqa: E402
+from exportar_shards import CAMPOS_LISTA, minificar, slug_materia  # noqa: E402
+
+PUERTO = 8787
+TAMANO_CACHE = 256
+MINIMO_GZIP = 1024  # bytes: por debajo, comprimir no paga
+REVISION_FUENTES_S = 1.0
+
+CAMPOS_LISTA_EXTRACCION = ("slug", "nombre", "generacion", "componente", "calidad_extraccion")
+
+ESTADOS_HTTP = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def indexar(registros: list[dict], claves: dict) -> dict[str, dict[str, list[int]]]:
+    """campo → valor (texto) → posiciones de los registros con ese valor, en orden."""
+    indices = {campo: {} for campo in claves}
+    for i, r in enumerate(registros):
+        for campo, clave in claves.items():
+            indices[campo].setdefault(str(clave(r)), []).append(i)
+    return indices
+
+
+def filtrar(indices: dict, filtros: dict[str, str], total: int) -> list[int]:
+    """Posiciones que cumplen todos los filtros: intersección empezando por la lista más corta."""
+    if not filtros:
+        return list(range(total))
+    listas = sorted((indices[campo].get(valor, []) for campo, valor in filtros.items()), key=len)
+    comunes = set(listas[0])
+    for lista in listas[1:]:
+        comunes.intersection_update(lista)
+    return sorted(comunes)
+
+
+def huella_fuentes(catalogo: Path, extracciones: Path) -> tuple:
+    """(mtime_ns, tamaño) del catálogo y de cada extracción: cambia si se reescribe cualquiera."""
+    archivos = [catalogo, *sorted(extracciones.glob("*.json"))]
+    return tuple((f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in archivos if f.exists())
+
+
+class CacheLRU:
+    """Respuestas renderizadas por (ruta, consulta normalizada); descarta la menos usada."""
+
+    def __init__(self, capacidad: int):
+        self.capacidad = capacidad
+        self.entradas: OrderedDict = OrderedDict()
+        self.aciertos = self.fallos = 0
+
+    def obtener(self, clave):
+        entrada = self.entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        self.entradas.move_to_end(clave)
+        return entrada
+
+    def guardar(self, clave, entrada):
+        if self.capacidad <= 0:
+            return
+        self.entradas[clave] = entrada
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+
+    def vaciar(self):
+        self.entradas.clear()
+
+
+class Respuesta:
+    __slots__ = ("estado", "cuerpo", "etag", "_gz")
+
+    def __init__(self, estado: int, datos):
+        self.estado = estado
+        self.cuerpo = minificar(datos)
+        self.etag = f'"{hashlib.sha256(self.cuerpo).hexdigest()[:16]}"'
+        self._gz = None
+
+    @property
+    def etag_gz(self) -> str:
+        """El cuerpo gzip es otra representación: un ETag fuerte no puede ser el mismo."""
+        return self.etag[:-1] + '-gz"'
+
+    def gz(self) -> bytes:
+        if self._gz is None:
+            self._gz = gzip.compress(self.cuerpo, compresslevel=6, mtime=0)
+        return self._gz
+
+
+class ServicioCatalogo:
+    def __init__(self, ruta_catalogo: Path = RUTA_CATALOGO, dir_extracciones: Path = DIR_EXTRACCION,
+                 tamano_cache: int = TAMANO_CACHE):
+        self.ruta_catalogo = ruta_catalogo
+        self.dir_extracciones = dir_extracciones
+        self.cache = CacheLRU(tamano_cache)
+        self.huella = None
+        self.revisado = 0.0
+        self.peticiones = 0
+        self.cargar()
+
+    def cargar(self):
+        t0 = time.perf_counter()
+        self.huella = huella_fuentes(self.ruta_catalogo, self.dir_extracciones)
+        self.programas = cargar_catalogo(self.ruta_catalogo)
+        self.extracciones = cargar_extracciones(self.dir_extracciones) if self.dir_extracciones.exists() else []
+        self.indices_programas = indexar(self.programas, {
+            "materia": lambda p: slug_materia(p["materia"]),
+            "semestre": lambda p: p["semestre"],
+            "modelo": lambda p: p.get("modelo"),
+            "estado": lambda p: p.get("estado"),
+        })
+        self.indices_extracciones = indexar(self.extracciones, {
+            "slug": lambda e: e["slug"],
+            "generacion": lambda e: e.get("generacion"),
+            "componente": lambda e: e.get("componente"),
+            "calidad": lambda e: e.get("calidad_extraccion"),
+        })
+        self.version = hashlib.sha256(repr(self.huella).encode()).hexdigest()[:12]
+        self.cache.vaciar()
+        self.carga_ms = (time.perf_counter() - t0) * 1000
+
+    def revisar_fuentes(self):
+        """A lo más una vez por segundo: si cambió algún archivo fuente, recarga."""
+        ahora = time.monotonic()
+        if ahora - self.revisado < REVISION_FUENTES_S:
+            return
+        self.revisado = ahora
+        if huella_fuentes(self.ruta_catalogo, self.dir_extracciones) != self.huella:
+            self.cargar()
+            print(f"🔄 Fuentes recargadas (versión {self.version})", flush=True)
+
+    # --- rutas ----------------------------------------------------------------
+    def resolver(self, objetivo: str) -> Respuesta:
+        self.peticiones += 1
+        self.revisar_fuentes()
+        partes = urllib.parse.urlsplit(objetivo)
+        consulta = dict(urllib.parse.parse_qsl(partes.query))
+        if partes.path == "/salud":  # no se cachea: lleva contadores
+            return Respuesta(200, {
+                "version": self.version, "programas": len(self.programas), "extracciones": len(self.extracciones),
+                "carga_ms": round(self.carga_ms, 1), "peticiones": self.peticiones,
+                "cache": {"entradas": len(self.cache.entradas), "capacidad": self.cache.capacidad,
+                          "aciertos": self.cache.aciertos, "fallos": self.cache.fallos}})
+        clave = (partes.path, tuple(sorted(consulta.items())))
+        respuesta = self.cache.obtener(clave)
+        if respuesta is None:
+            respuesta = self._renderizar(partes.path, consulta)
+            self.cache.guardar(clave, respuesta)
+        return respuesta
+
+    def _renderizar(self, ruta: str, consulta: dict) -> Respuesta:
+        segmentos = [urllib.parse.unquote(s) for s in ruta.strip("/").split("/")]
+        campos = consulta.pop("campos", None)
+        if segmentos[0] == "programas" and len(segmentos) <= 2:
+            registros, indices = self.programas, self.indices_programas
+            proyectar = self._proyectar_programa
+            if len(segmentos) == 2:
+                consulta["materia"] = segmentos[1]
+        elif segmentos[0] == "extracciones" and len(segmentos) <= 2:
+            registros, indices = self.extracciones, self.indices_extracciones
+            proyectar = self._proyectar_extraccion
+            if len(segmentos) == 2:
+                consulta["slug"] = segmentos[1]
+        else:
+            return Respuesta(404, {"error": f"ruta desconocida: {ruta}",
+                                   "rutas": ["/salud", "/programas", "/programas/<slug>",
+                                             "/extracciones", "/extracciones/<slug>"]})
+        desconocidos = sorted(set(consulta) - set(indices))
+        if desconocidos:
+            return Respuesta(400, {"error": f"filtro desconocido: {', '.join(desconocidos)}",
+                                   "filtros": [*indices, "campos"]})
+
+        encontrados = [registros[i] for i in filtrar(indices, consulta, len(registros))]
+        if len(segmentos) == 2:
+            if not encontrados:
+                return Respuesta(404, {"error": f"no hay {segmentos[0]} con slug {segmentos[1]}"})
+            # una extracción por slug: el objeto; una materia: sus entradas (una por modelo)
+            if segmentos[0] == "extracciones":
+                return Respuesta(200, self._campos(encontrados[0], campos) if campos else encontrados[0])
+            return Respuesta(200, [self._campos(r, campos) for r in encontrados] if campos else encontrados)
+        if campos:
+            return Respuesta(200, [self._campos(r, campos) for r in encontrados])
+        return Respuesta(200, [proyectar(r) for r in encontrados])
+
+    @staticmethod
+    def _campos(registro: dict, campos: str) -> dict:
+        if campos == "*":
+            return registro
+        return {c: registro.get(c) for c in campos.split(",") if c}
+
+    @staticmethod
+    def _proyectar_programa(p: dict) -> dict:
+        slug = slug_materia(p["materia"])
+        return {**{k: p.get(k) for k in CAMPOS_LISTA}, "slug": slug,
+                "n_progresiones": len(p.get("progresiones") or []), "ruta": f"/programas/{slug}"}
+
+    @staticmethod
+    def _proyectar_extraccion(e: dict) -> dict:
+        return {**{k: e.get(k) for k in CAMPOS_LISTA_EXTRACCION},
+                "n_progresiones": len(e.get("progresiones") or []), "ruta": f"/extracciones/{e['slug']}"}
+
+    # --- HTTP/1.1 con keep-alive ----------------------------------------------
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, objetivo, version = linea.decode("latin-1").split()
+                except ValueError:
+                    await self._enviar(escritor, Respuesta(400, {"error": "línea de petición inválida"}), False, {})
+                    break
+                encabezados = {}
+                while (h := await lector.readline()) not in (b"\r\n", b"\n", b""):
+                    nombre, _, valor = h.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+                largo = encabezados.get("content-length") or "0"
+                if not (largo.isascii() and largo.isdigit()):
+                    await self._enviar(escritor, Respuesta(400, {"error": "Content-Length inválido"}), False, {})
+                    break
+                if int(largo):
+                    await lector.readexactly(int(largo))  # GET con cuerpo: se descarta
+                conexion = encabezados.get("connection", "").lower()
+                mantener = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+
+                if metodo not in ("GET", "HEAD"):
+                    respuesta = Respuesta(405, {"error": f"método {metodo} no soportado"})
+                else:
+                    respuesta = self.resolver(objetivo)
+                await self._enviar(escritor, respuesta, mantener, encabezados, metodo == "HEAD")
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _enviar(escritor: asyncio.StreamWriter, respuesta: Respuesta, mantener: bool, encabezados: dict,
+                      sin_cuerpo: bool = False):
+        estado, cuerpo = respuesta.estado, respuesta.cuerpo
+        comprimir = len(cuerpo) >= MINIMO_GZIP and "gzip" in encabezados.get("accept-encoding", "")
+        etag = respuesta.etag_gz if comprimir else respuesta.etag
+        extra = [f"ETag: {etag}", "Cache-Control: no-cache"]
+        if estado == 200 and etag in encabezados.get("if-none-match", "").replace(" ", "").split(","):
+            estado, cuerpo = 304, b""
+        elif comprimir:
+            cuerpo = respuesta.gz()
+            extra.append("Content-Encoding: gzip")
+        cabecera = [f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Content-Length: {len(cuerpo)}",
+                    "Access-Control-Allow-Origin: *",
+                    "Vary: Accept-Encoding",
+                    f"Connection: {'keep-alive' if mantener else 'close'}", *extra]
+        escritor.write(("\r\n".join(cabecera) + "\r\n\r\n").encode("latin-1"))
+        if cuerpo and not sin_cuerpo and estado != 304:
+            escritor.write(cuerpo)
+        await escritor.drain()
+
+
+async def servir(servicio: ServicioCatalogo, host: str, puerto: int):
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    print(f"🌐 http://{host}:{puerto}  ({len(servicio.programas)} programas, {len(servicio.extracciones)} "
+          f"extracciones, cargados en {servicio.carga_ms:.0f} ms; caché LRU de {servicio.cache.capacidad})", flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--puerto", type=int, default=PUERTO)
+    ap.add_argument("--cache", type=int, default=TAMANO_CACHE, help="Respuestas en la caché LRU (0 = sin caché)")
+    ap.add_argument("--catalogo", default=str(RUTA_CATALOGO))
+    ap.add_argument("--extracciones", default=str(DIR_EXTRACCION))
+    args = ap.parse_args()
+
+    servicio = ServicioCatalogo(Path(args.catalogo), Path(args.extracciones), args.cache)
+    try:
+        asyncio.run(servir(servicio, args.host, args.puerto))
+    except KeyboardInterrupt:
+        print("\n👋 Servicio detenido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Historial del catálogo (data/programas_sep.json) por deltas, en lugar de
+copias completas "programas_sep.backup-*.json" de ~2 MB por integración.
+
+Cada versión guarda solo lo que cambió respecto a la anterior, por programa
+(materia|semestre) y por progresión (id): programas agregados / eliminados,
+campos modificados y progresiones agregadas / eliminadas / modificadas, más el
+orden cuando cambia. Cada CADA_COMPLETA versiones se guarda una copia completa
+para que reconstruir cualquier versión aplique pocos deltas. Reconstruir
+produce el archivo byte a byte (se verifica contra el SHA-256 registrado).
+
+Salidas:
+  data/versiones_catalogo/indice.json        versiones: fecha, mensaje, sha256, resumen
+  data/versiones_catalogo/NNNN.json.gz       delta (o copia completa) de cada versión
+
+Uso:
+  python3 scripts/versiones_catalogo.py --registrar -m "integración DGB"
+  python3 scripts/versiones_catalogo.py                       # lista las versiones
+  python3 scripts/versiones_catalogo.py --diferencias 3 5     # qué cambió entre dos versiones
+  python3 scripts/versiones_catalogo.py --reconstruir 3 --salida /tmp/v3.json
+  python3 scripts/versiones_catalogo.py --restaurar 3         # rollback (queda como versión nueva)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalogo import RAIZ, RUTA_CATALOGO  # noqa: E402
+
+DIR_VERSIONES = RAIZ / "data" / "versiones_catalogo"
+CADA_COMPLETA = 20
+
+
+def serializar(catalogo: list[dict]) -> str:
+    """Forma en disco del catálogo (la misma de JSON.stringify(x, null, 2) en los scripts .cjs)."""
+    return json.dumps(catalogo, ensure_ascii=False, indent=2)
+
+
+def sha256_texto(texto: str) -> str:
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def distintos(a, b) -> bool:
+    """Como a != b, pero también distingue el orden de las claves (que cambia el archivo en disco)."""
+    return a != b or json.dumps(a, ensure_ascii=False) != json.dumps(b, ensure_ascii=False)
+
+
+def con_claves(elementos: list[dict], clave) -> dict:
+    """clave → elemento; las claves repetidas se distinguen por ocurrencia ('3', '3~2', ...)."""
+    vistos: dict[str, int] = {}
+    resultado = {}
+    for e in elementos:
+        k = clave(e)
+        vistos[k] = vistos.get(k, 0) + 1
+        resultado[k if vistos[k] == 1 else f"{k}~{vistos[k]}"] = e
+    return resultado
+
+
+def clave_programa(p: dict) -> str:
+    return f"{p.get('materia')}|{p.get('semestre')}"
+
+
+def clave_progresion(g: dict) -> str:
+    return str(g.get("id"))
+
+
+def _orden_si_cambia(antes: dict, despues: dict) -> list[str] | None:
+    """El orden nuevo, solo si difiere de 'los que quedan en su orden + los agregados al final'."""
+    esperado = [k for k in antes if k in despues] + [k for k in despues if k not in antes]
+    return list(despues) if esperado != list(despues) else None
+
+
+def delta_elementos(antes: dict, despues: dict) -> dict:
+    """Delta entre dos colecciones clave → dict (agregados, eliminados, modificados completos, orden)."""
+    d = {}
+    if agregados := {k: v for k, v in despues.items() if k not in antes}:
+        d["agregadas"] = agregados
+    if eliminados := [k for k in antes if k not in despues]:
+        d["eliminadas"] = eliminados
+    if modificados := {k: v for k, v in despues.items() if k in antes and distintos(antes[k], v)}:
+        d["modificadas"] = modificados
+    if (orden := _orden_si_cambia(antes, despues)) is not None:
+        d["orden"] = orden
+    return d
+
+
+def aplicar_elementos(antes: dict, d: dict) -> dict:
+    eliminadas = set(d.get("eliminadas", ()))
+    despues = {k: d.get("modificadas", {}).get(k, v) for k, v in antes.items() if k not in eliminadas}
+    despues.update(d.get("agregadas", {}))
+    if "orden" in d:
+        despues = {k: despues[k] for k in d["orden"]}
+    return despues
+
+
+def delta_programa(antes: dict, despues: dict) -> dict:
+    d = {}
+    campos = {k: v for k, v in despues.items()
+              if k != "progresiones" and (k not in antes or distintos(antes[k], v))}
+    if campos:
+        d["campos"] = campos
+    if quitados := [k for k in antes if k not in despues]:
+        d["quitados"] = quitados
+    if list(aplicar_programa(antes, {**d, "progresiones": {}})) != list(despues):
+        d["claves"] = list(despues)
+    g_antes = con_claves(antes.get("progresiones") or [], clave_progresion)
+    g_despues = con_claves(despues.get("progresiones") or [], clave_progresion)
+    if g := delta_elementos(g_antes, g_despues):
+        d["progresiones"] = g
+    return d
+
+
+def aplicar_programa(antes: dict, d: dict) -> dict:
+    p = {k: v for k, v in antes.items() if k not in set(d.get("quitados", ()))}
+    p.update(d.get("campos", {}))
+    if d.get("progresiones"):
+        p["progresiones"] = list(aplicar_elementos(con_claves(antes.get("progresiones") or [], clave_progresion),
+                                                   d["progresiones"]).values())
+    if "claves" in d:
+        p = {k: p[k] for k in d["claves"]}
+    return p
+
+
+def delta_catalogo(antes: list[dict], despues: list[dict]) -> dict:
+    a, b = con_claves(antes, clave_programa), con_claves(despues, clave_programa)
+    d = {}
+    if agregados := {k: v for k, v in b.items() if k not in a}:
+        d["agregados"] = agregados
+    if eliminados := [k for k in a if k not in b]:
+        d["eliminados"] = eliminados
+    if modificados := {k: delta_programa(a[k], v) for k, v in b.items() if k in a and distintos(a[k], v)}:
+        d["modificados"] = modificados
+    if (orden := _orden_si_cambia(a, b)) is not None:
+        d["orden"] = orden
+    return d
+
+
+def aplicar_catalogo(antes: list[dict], d: dict) -> list[dict]:
+    a = con_claves(antes, clave_programa)
+    eliminados = set(d.get("eliminados", ()))
+    b = {k: aplicar_programa(v, d["modificados"][k]) if k in d.get("modificados", {}) else v
+         for k, v in a.items() if k not in eliminados}
+    b.update(d.get("agregados", {}))
+    if "orden" in d:
+        b = {k: b[k] for k in d["orden"]}
+    return list(b.values())
+
+
+def resumen(d: dict) -> dict:
+    """Conteos compactos de un delta: programas y progresiones +agregados -eliminados ~modificados."""
+    prog = {"+": 0, "-": 0, "~": 0}
+    for p in d.get("agregados", {}).values():
+        prog["+"] += len(p.get("progresiones") or [])
+    for cambio in d.get("modificados", {}).values():
+        g = cambio.get("progresiones", {})
+        prog["+"] += len(g.get("agregadas", {}))
+        prog["-"] += len(g.get("eliminadas", []))
+        prog["~"] += len(g.get("modificadas", {}))
+    return {"programas": {"+": len(d.get("agregados", {})), "-": len(d.get("eliminados", [])),
+                          "~": len(d.get("modificados", {}))},
+            "progresiones": prog}
+
+
+def texto_resumen(r: dict) -> str:
+    return "  ".join(f"{nombre} " + " ".join(f"{s}{n}" for s, n in r[nombre].items())
+                     for nombre in ("programas", "progresiones"))
+
+
+class Historial:
+    def __init__(self, directorio: Path = DIR_VERSIONES):
+        self.directorio = directorio
+        self.ruta_indice = directorio / "indice.json"
+        self.versiones = (json.loads(self.ruta_indice.read_text(encoding="utf-8"))
+                          if self.ruta_indice.exists() else [])
+
+    def _ruta(self, n: int) -> Path:
+        return self.directorio / f"{n:04d}.json.gz"
+
+    def _escribir(self, ruta: Path, datos: bytes):
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(datos)
+        os.replace(tmp, ruta)
+
+    def _leer(self, n: int) -> dict:
+        return json.loads(gzip.decompress(self._ruta(n).read_bytes()))
+
+    def reconstruir(self, n: int) -> list[dict]:
+        """Catálogo de la versión n: última copia completa ≤ n y los deltas que siguen."""
+        if not 1 <= n <= len(self.versiones):
+            raise ValueError(f"no existe la versión {n} (hay {len(self.versiones)})")
+        inicio = max(v["version"] for v in self.versiones[:n] if v["completa"])
+        catalogo = self._leer(inicio)["catalogo"]
+        for k in range(inicio + 1, n + 1):
+            catalogo = aplicar_catalogo(catalogo, self._leer(k)["delta"])
+        if sha256_texto(serializar(catalogo)) != self.versiones[n - 1]["sha256"]:
+            raise ValueError(f"la versión {n} reconstruida no coincide con su SHA-256 registrado")
+        return catalogo
+
+    def registrar(self, catalogo: list[dict], mensaje: str = "") -> dict | None:
+        """Agrega el catálogo como versión nueva; None si es idéntico a la última."""
+        sha = sha256_texto(serializar(catalogo))
+        if self.versiones and self.versiones[-1]["sha256"] == sha:
+            return None
+        n = len(self.versiones) + 1
+        completa = (n - 1) % CADA_COMPLETA == 0
+        if completa:
+            contenido, r = {"catalogo": catalogo}, resumen({"agregados": con_claves(catalogo, clave_programa)})
+        else:
+            d = delta_catalogo(self.reconstruir(n - 1), catalogo)
+            contenido, r = {"delta": d}, resumen(d)
+        datos = gzip.compress(json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                              compresslevel=9, mtime=0)
+        self._escribir(self._ruta(n), datos)
+        version = {"version": n, "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                   "mensaje": mensaje, "sha256": sha, "completa": completa, "bytes": len(datos), "resumen": r}
+        self.versiones.append(version)
+        self._escribir(self.ruta_indice, json.dumps(self.versiones, ensure_ascii=False, indent=1).encode("utf-8"))
+        return version
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--registrar", action="store_true", help="Registrar el catálogo actual como versión nueva")
+    ap.add_argument("-m", "--mensaje", default="", help="Descripción de la versión (con --registrar/--restaurar)")
+    ap.add_argument("--diferencias", nargs=2, type=int, metavar=("A", "B"), help="Cambios de la versión A a la B")
+    ap.add_argument("--reconstruir", type=int, metavar="N", help="Escribir la versión N en --salida")
+    ap.add_argument("--restaurar", type=int, metavar="N", help="Volver el catálogo a la versión N")
+    ap.add_argument("--catalogo", default=str(RUTA_CATALOGO))
+    ap.add_argument("--salida", help="Destino de --reconstruir (por omisión, la salida estándar)")
+    ap.add_argument("--directorio", default=str(DIR_VERSIONES))
+    args = ap.parse_args()
+
+    historial = Historial(Path(args.directorio))
+    for n in (args.reconstruir, args.restaurar, *(args.diferencias or ())):
+        if n is not None and not 1 <= n <= len(historial.versiones):
+            sys.exit(f"❌ No existe la versión {n} (hay {len(historial.versiones)})")
+    ruta_catalogo = Path(args.catalogo)
+
+    if args.registrar:
+        v = historial.registrar(json.loads(ruta_catalogo.read_text(encoding="utf-8")), args.mensaje)
+        if v is None:
+            print(f"= {ruta_catalogo.name} sin cambios desde la versión {len(historial.versiones)}")
+        else:
+            tipo = "copia completa" if v["completa"] else "delta"
+            print(f"💾 Versión {v['version']} ({tipo}, {v['bytes'] / 1024:.1f} KB): {texto_resumen(v['resumen'])}")
+    elif args.reconstruir is not None:
+        texto = serializar(historial.reconstruir(args.reconstruir))
+        if args.salida:
+            Path(args.salida).write_text(texto, encoding="utf-8")
+            print(f"💾 Versión {args.reconstruir} → {args.salida}")
+        else:
+            sys.stdout.write(texto)
+    elif args.restaurar is not None:
+        catalogo = historial.reconstruir(args.restaurar)
+        tmp = ruta_catalogo.with_name(f"{ruta_catalogo.name}.{os.getpid()}.tmp")
+        tmp.write_text(serializar(catalogo), encoding="utf-8")
+        os.replace(tmp, ruta_catalogo)
+        v = historial.registrar(catalogo, args.mensaje or f"restaurada la versión {args.restaurar}")
+        print(f"↩️  {ruta_catalogo.name} restaurado a la versión {args.restaurar}"
+              + (f" (registrado como versión {v['version']})" if v else ""))
+    elif args.diferencias:
+        a, b = args.diferencias
+        d = delta_catalogo(historial.reconstruir(a), historial.reconstruir(b))
+        print(f"Versión {a} → {b}: {texto_resumen(resumen(d))}")
+        for k in d.get("agregados", {}):
+            print(f"  + {k}")
+        for k in d.get("eliminados", []):
+            print(f"  - {k}")
+        for k, cambio in d.get("modificados", {}).items():
+            campos = list(cambio.get("campos", {})) + [f"-{c}" for c in cambio.get("quitados", [])]
+            g = cambio.get("progresiones", {})
+            conteos = (("+", len(g.get("agregadas", {}))), ("-", len(g.get("eliminadas", []))),
+                       ("~", len(g.get("modificadas", {}))))
+            prog = " ".join(f"{s}{n}" for s, n in conteos if n)
+            print(f"  ~ {k}: {', '.join(campos) or '—'}" + (f"  progresiones {prog}" if prog else ""))
+    else:
+        if not historial.versiones:
+            print(f"ℹ️  Sin versiones en {historial.directorio}; registra la actual con --registrar")
+        total = 0
+        for v in historial.versiones:
+            total += v["bytes"]
+            tipo = "completa" if v["completa"] else "delta   "
+            print(f"  {v['version']:>4}  {v['fecha']}  {tipo} {v['bytes'] / 1024:7.1f} KB  "
+                  f"{texto_resumen(v['resumen'])}  {v['mensaje']}")
+        if historial.versiones:
+            print(f"📦 {len(historial.versiones)} versiones, {total / 1024:.0f} KB en total")
+
+
+if __name__ == "__main__":
+    main()